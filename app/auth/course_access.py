@@ -1,36 +1,18 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.models import Course, course_students, User
+from app.models import User
+from app.auth.enrollment_index import enrollment_index
 
 
 
 async def check_course_access(course_id: str, current_user: User, db: AsyncSession):
     """Allows access if the user is either enrolled OR the course instructor."""
 
-    # Check if instructor
-    stmt = select(Course).where(
-        Course.id == course_id,
-        Course.instructor_id == current_user.id
-    )
-    result = await db.execute(stmt)
-    course = result.scalar_one_or_none()
-
-    if course:
-        return True  # User is instructor
-
-    # Check if enrolled
-    stmt = select(course_students).where(
-        course_students.c.course_id == course_id,
-        course_students.c.student_id == current_user.id
-    )
-    result = await db.execute(stmt)
-    enrolled = result.first()
-
-    if enrolled:
-        return True  # User is enrolled
+    # Instructor or enrolled student (cached membership sets)
+    if await enrollment_index.has_access(current_user.id, course_id, db):
+        return True
 
     # Neither student nor instructor
     raise HTTPException(
@@ -44,11 +26,5 @@ async def ensure_student_enrolled(
     student_id: UUID,
     db: AsyncSession,
 ):
-    result = await db.execute(
-        select(course_students).where(
-            course_students.c.course_id == course_id,
-            course_students.c.student_id == student_id,
-        )
-    )
-    if not result.first():
-        raise HTTPException(403, "You are not enrolled in this course")
\ No newline at end of file
+    if not await enrollment_index.is_enrolled(student_id, course_id, db):
+        raise HTTPException(403, "You are not enrolled in this course")
@@ -1,28 +1,32 @@
 from fastapi import Depends,HTTPException,status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials 
-from sqlalchemy.ext.asyncio import AsyncSession 
-from sqlalchemy.future import select 
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from jose import JWTError
 import uuid
+import os
 
 
-from app.database import get_db 
+from app.database import get_db
 from app.models import User,UserRole,course_students,Course
 from app.auth.jwt import verify_token
+from app.auth.principal_cache import principal_cache, token_fingerprint, UserSnapshot, Principal
+from app.auth.token_revocation import is_token_revoked, claimed_token_version
 
 
+# Opt-in: satisfy role guards from verified token claims and the user's
+# token_version (short-TTL cached) without loading the full User row
+STATELESS_ROLE_AUTH = os.getenv("STATELESS_ROLE_AUTH", "false").lower() == "true"
+
 bearer_scheme = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+
+def _decode_access_token(token: str) -> tuple[uuid.UUID, dict]:
     """
-    Get the current logged-in User from the JWT access token.
-    Verifies the token, converts user_id to UUID, and fetches the User from DB.
-    Raises 401 if token is invalid, expired, or user not found.
+    Verify the access token and return (user_id, payload).
+    Raises 401 if the token is invalid or expired; revocation is checked
+    against users.token_version by the callers.
     """
-    token = credentials.credentials
     try:
         payload = verify_token(token,expected_type="access")
         user_id_str: str = payload.get("user_id")
@@ -35,15 +39,95 @@ async def get_current_user(
     except (JWTError, ValueError):  # ValueError for invalid UUID string
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    return user_id, payload
+
+
+def _check_token_version(snapshot: UserSnapshot, payload: dict) -> UserSnapshot:
+    if claimed_token_version(payload) != snapshot.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return snapshot
+
+
+async def _load_snapshot(user_id: uuid.UUID, fingerprint: str, db: AsyncSession) -> UserSnapshot:
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+
+    snapshot = UserSnapshot.from_user(user)
+    if not snapshot.is_active:
+        raise HTTPException(status_code=401, detail="User account is deactivated")
+
+    principal_cache.put(fingerprint, snapshot)
+    return snapshot
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> UserSnapshot:
+    """
+    Get the current logged-in User from the JWT access token.
+    Verifies the token, converts user_id to UUID, and returns an immutable
+    snapshot of the User from the principal cache, falling back to the DB.
+    Raises 401 if token is invalid, expired, user not found or deactivated.
+    """
+    token = credentials.credentials
+    user_id, payload = _decode_access_token(token)
+
+    fingerprint = token_fingerprint(token)
+    snapshot = principal_cache.get(user_id, fingerprint)
+    if snapshot is None:
+        snapshot = await _load_snapshot(user_id, fingerprint, db)
+
+    return _check_token_version(snapshot, payload)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal | UserSnapshot:
+    """
+    Lightweight identity for role guards.
+    With STATELESS_ROLE_AUTH enabled the Principal is built from the verified
+    token claims, after checking the token_version claim against the user's
+    current version; otherwise this is the same as get_current_user.
+    """
+    if not STATELESS_ROLE_AUTH:
+        return await get_current_user(credentials, db)
+
+    user_id, payload = _decode_access_token(credentials.credentials)
+    if await is_token_revoked(user_id, payload, db):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    try:
+        role = UserRole(payload.get("role"))
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+    return Principal(id=user_id, role=role)
+
+
+async def load_user_snapshot(
+    principal: Principal | UserSnapshot,
+    db: AsyncSession
+) -> UserSnapshot:
+    """
+    Resolve a principal to the full user snapshot for routes that need
+    profile fields. Served from the principal cache when possible.
+    """
+    if isinstance(principal, UserSnapshot):
+        return principal
+
+    snapshot = principal_cache.get_any(principal.id)
+    if snapshot is not None:
+        return snapshot
+
+    return await _load_snapshot(principal.id, "principal", db)
 
 
 
-async def is_admin(current_user: User = Depends(get_current_user)) -> User:
+async def is_admin(current_user: Principal | UserSnapshot = Depends(get_current_principal)) -> Principal | UserSnapshot:
     """
     Allow only users with ADMIN role.
     """
@@ -55,7 +139,7 @@ async def is_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-async def is_teacher(current_user: User = Depends(get_current_user)) -> User:
+async def is_teacher(current_user: Principal | UserSnapshot = Depends(get_current_principal)) -> Principal | UserSnapshot:
     """
     Allow only users with INSTRUCTOR role.
     """
@@ -67,7 +151,7 @@ async def is_teacher(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-async def is_student(current_user: User = Depends(get_current_user)) -> User:
+async def is_student(current_user: Principal | UserSnapshot = Depends(get_current_principal)) -> Principal | UserSnapshot:
     """
     Allow only users with STUDENT role.
     """
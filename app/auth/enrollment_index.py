@@ -0,0 +1,279 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import engine
+from app.models import Course, course_students
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on staleness if the invalidation listener is down
+ENROLLMENT_CACHE_TTL_SECONDS = float(os.getenv("ENROLLMENT_CACHE_TTL_SECONDS", 300))
+ENROLLMENT_CACHE_MAX_USERS = int(os.getenv("ENROLLMENT_CACHE_MAX_USERS", 50000))
+# Health check of the LISTEN connection, and the wait before reconnecting
+ENROLLMENT_LISTEN_CHECK_SECONDS = float(os.getenv("ENROLLMENT_LISTEN_CHECK_SECONDS", 30))
+ENROLLMENT_LISTEN_RETRY_SECONDS = float(os.getenv("ENROLLMENT_LISTEN_RETRY_SECONDS", 5))
+
+# NOTIFY channel carrying course deletions to every worker
+ENROLLMENT_CHANNEL = "enrollment_changes"
+
+
+def as_uuid(value) -> Optional[UUID]:
+    """
+    Normalize a course/user id given as UUID or string. Returns None if invalid.
+    """
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except (ValueError, TypeError):
+        return None
+
+
+class _CourseIdSets:
+    """
+    Per-user frozenset of course ids with LRU eviction and TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._sets: "OrderedDict[UUID, tuple[float, frozenset[UUID]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[frozenset]:
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is None:
+                return None
+            expires_at, course_ids = entry
+            if expires_at <= time.monotonic():
+                del self._sets[user_id]
+                return None
+            self._sets.move_to_end(user_id)
+            return course_ids
+
+    def put(self, user_id: UUID, course_ids) -> None:
+        with self._lock:
+            self._sets[user_id] = (time.monotonic() + self.ttl_seconds, frozenset(course_ids))
+            self._sets.move_to_end(user_id)
+            while len(self._sets) > self.max_users:
+                self._sets.popitem(last=False)
+
+    def add(self, user_id: UUID, course_id: UUID) -> None:
+        # Only update users that are already loaded; others load fresh on demand
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is not None:
+                self._sets[user_id] = (entry[0], entry[1] | {course_id})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sets.clear()
+
+    def discard_course(self, course_id: UUID) -> None:
+        with self._lock:
+            for user_id, (expires_at, course_ids) in list(self._sets.items()):
+                if course_id in course_ids:
+                    self._sets[user_id] = (expires_at, course_ids - {course_id})
+
+    def __len__(self):
+        return len(self._sets)
+
+
+class EnrollmentIndex:
+    """
+    Answers "is this user enrolled in / teaching this course?" from cached
+    per-user course-id sets. Each set is loaded with one query on first use
+    and kept current by the write paths (enroll, course create/delete).
+    Course deletions in other workers arrive over LISTEN/NOTIFY.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self._enrolled = _CourseIdSets(ttl_seconds, max_users)
+        self._instructed = _CourseIdSets(ttl_seconds, max_users)
+        self.hits = 0
+        self.misses = 0
+        self.notifications = 0
+        self.listening = False
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _load_enrolled(self, user_id: UUID, db: AsyncSession) -> frozenset:
+        self.misses += 1
+        result = await db.execute(
+            select(course_students.c.course_id)
+            .where(course_students.c.student_id == user_id)
+        )
+        course_ids = frozenset(result.scalars().all())
+        self._enrolled.put(user_id, course_ids)
+        return course_ids
+
+    async def _load_instructed(self, user_id: UUID, db: AsyncSession) -> frozenset:
+        self.misses += 1
+        result = await db.execute(
+            select(Course.id).where(Course.instructor_id == user_id)
+        )
+        course_ids = frozenset(result.scalars().all())
+        self._instructed.put(user_id, course_ids)
+        return course_ids
+
+    async def enrolled_course_ids(self, user_id: UUID, db: AsyncSession) -> frozenset:
+        course_ids = self._enrolled.get(user_id)
+        if course_ids is not None:
+            self.hits += 1
+            return course_ids
+        return await self._load_enrolled(user_id, db)
+
+    async def instructed_course_ids(self, user_id: UUID, db: AsyncSession) -> frozenset:
+        course_ids = self._instructed.get(user_id)
+        if course_ids is not None:
+            self.hits += 1
+            return course_ids
+        return await self._load_instructed(user_id, db)
+
+    async def is_enrolled(self, user_id: UUID, course_id, db: AsyncSession) -> bool:
+        course_uuid = as_uuid(course_id)
+        if course_uuid is None:
+            return False
+
+        cached = self._enrolled.get(user_id)
+        if cached is not None and course_uuid in cached:
+            self.hits += 1
+            return True
+
+        # Miss or negative answer: reload once, so an enrollment written by
+        # another worker is never hidden by a stale set.
+        return course_uuid in await self._load_enrolled(user_id, db)
+
+    async def is_instructor(self, user_id: UUID, course_id, db: AsyncSession) -> bool:
+        course_uuid = as_uuid(course_id)
+        if course_uuid is None:
+            return False
+
+        cached = self._instructed.get(user_id)
+        if cached is not None and course_uuid in cached:
+            self.hits += 1
+            return True
+
+        return course_uuid in await self._load_instructed(user_id, db)
+
+    async def has_access(self, user_id: UUID, course_id, db: AsyncSession) -> bool:
+        """
+        True if the user teaches or is enrolled in the course.
+        Both cached sets are consulted before any reload.
+        """
+        course_uuid = as_uuid(course_id)
+        if course_uuid is None:
+            return False
+
+        for cached in (self._instructed.get(user_id), self._enrolled.get(user_id)):
+            if cached is not None and course_uuid in cached:
+                self.hits += 1
+                return True
+
+        if course_uuid in await self._load_instructed(user_id, db):
+            return True
+        return course_uuid in await self._load_enrolled(user_id, db)
+
+    # ---------------------------
+    # Write-path hooks
+    # ---------------------------
+    # Enrollments and course creations need no broadcast: a negative answer
+    # always reloads. Course deletion is the only write that removes
+    # course_students rows, so it is the one other workers must hear about.
+    def record_enrollment(self, student_id: UUID, course_id) -> None:
+        self._enrolled.add(student_id, as_uuid(course_id))
+
+    def record_course_created(self, instructor_id: UUID, course_id) -> None:
+        self._instructed.add(instructor_id, as_uuid(course_id))
+
+    def record_course_deleted(self, course_id) -> None:
+        course_uuid = as_uuid(course_id)
+        self._enrolled.discard_course(course_uuid)
+        self._instructed.discard_course(course_uuid)
+
+    async def publish_course_deleted(self, course_id, db: AsyncSession) -> None:
+        """
+        Tell every worker to drop the course. PostgreSQL delivers the
+        notification only if the caller's transaction commits. Does not commit.
+        """
+        await db.execute(select(func.pg_notify(ENROLLMENT_CHANNEL, str(course_id))))
+
+    # ---------------------------
+    # Invalidation listener
+    # ---------------------------
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.notifications += 1
+        if as_uuid(payload) is not None:
+            self.record_course_deleted(payload)
+
+    async def _listen(self) -> None:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            await driver.add_listener(ENROLLMENT_CHANNEL, self._on_notify)
+            try:
+                # Deletions made while not listening were missed
+                self._enrolled.clear()
+                self._instructed.clear()
+                self.listening = True
+                while not self._stop.is_set():
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), ENROLLMENT_LISTEN_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        await driver.execute("SELECT 1")
+            finally:
+                self.listening = False
+                await driver.remove_listener(ENROLLMENT_CHANNEL, self._on_notify)
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self._listen()
+            except Exception:
+                logger.exception("Enrollment invalidation listener failed; reconnecting")
+                try:
+                    await asyncio.wait_for(self._stop.wait(), ENROLLMENT_LISTEN_RETRY_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        if engine.dialect.driver != "asyncpg":
+            # LISTEN goes through asyncpg's add_listener; without it the
+            # TTL is the only bound on staleness from other workers
+            logger.warning(
+                "Enrollment invalidation listener needs asyncpg, not %s; not started",
+                engine.dialect.driver,
+            )
+            return
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enrolled_users_cached": len(self._enrolled),
+            "instructors_cached": len(self._instructed),
+            "hits": self.hits,
+            "misses": self.misses,
+            "listening": self.listening,
+            "notifications": self.notifications,
+        }
+
+
+enrollment_index = EnrollmentIndex(ENROLLMENT_CACHE_TTL_SECONDS, ENROLLMENT_CACHE_MAX_USERS)
@@ -1,3 +1,8 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
 # ---------------------------
@@ -5,6 +10,24 @@ from passlib.context import CryptContext
 # ---------------------------
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# ---------------------------
+# Hashing worker pool
+# ---------------------------
+# argon2-cffi releases the GIL while hashing, so a thread pool gives real
+# parallelism across cores without pickling overhead.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 256))
+# Bulk imports use at most this many workers at a time, leaving the rest for logins
+PASSWORD_IMPORT_CONCURRENCY = int(os.getenv("PASSWORD_IMPORT_CONCURRENCY", max(1, PASSWORD_HASH_WORKERS // 2)))
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# One slot per queued or running hashing call
+_pending_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+_import_slots = asyncio.Semaphore(PASSWORD_IMPORT_CONCURRENCY)
+
 
 # ---------------------------
 # Hash a password
@@ -25,3 +48,62 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns True if match, False otherwise.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# ---------------------------
+# Async variants (off the event loop)
+# ---------------------------
+async def _execute(func, *args):
+    async with _pending_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+
+
+async def _run_in_pool(func, *args):
+    """
+    Run a hashing call on the worker pool.
+    Raises 503 when more than PASSWORD_HASH_MAX_PENDING calls are queued,
+    so a login storm cannot grow the queue without bound.
+    """
+    if _pending_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly"
+        )
+
+    return await _execute(func, *args)
+
+
+async def _hash_for_import(password: str) -> str:
+    """
+    Import hashing counts against the same pending budget as logins but
+    waits for room instead of failing half-way through an upload.
+    """
+    async with _import_slots:
+        return await _execute(hash_password, password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Same as hash_password but runs on the hashing pool.
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Same as verify_password but runs on the hashing pool.
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch of passwords for bulk imports, at most
+    PASSWORD_IMPORT_CONCURRENCY at a time so logins keep free workers.
+    """
+    return await asyncio.gather(*[_hash_for_import(password) for password in passwords])
+
+
+def shutdown_password_pool():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
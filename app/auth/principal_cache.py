@@ -0,0 +1,263 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models import User, UserRole
+from app.auth.token_revocation import bump_token_version, token_versions
+
+
+# Staleness window: the listeners below drop entries only in the worker that
+# commits the change. Other workers keep serving a cached snapshot, and with
+# it the old role, is_active and token_version, for up to this long after a
+# deactivation or role change. Claims-only auth (STATELESS_ROLE_AUTH) is
+# bounded by TOKEN_VERSION_CACHE_SECONDS instead.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+
+
+# ---------------------------
+# Immutable user snapshot
+# ---------------------------
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """
+    Read-only copy of the columns routes read from the current user.
+    Never carries the password hash and is safe to share between requests.
+    """
+    id: UUID
+    role: UserRole
+    name: str
+    email: Optional[str]
+    roll_number: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+    last_login: Optional[datetime]
+    profile_pic: Optional[str]
+
+    department: Optional[str]
+    year: Optional[str]
+    section: Optional[str]
+    dob: Optional[date]
+    mobile: Optional[str]
+
+    qualification: Optional[str]
+    experience_years: Optional[int]
+
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            role=user.role,
+            name=user.name,
+            email=user.email,
+            roll_number=user.roll_number,
+            is_active=user.is_active is not False,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            profile_pic=user.profile_pic,
+            department=user.department,
+            year=user.year,
+            section=user.section,
+            dob=user.dob,
+            mobile=user.mobile,
+            qualification=user.qualification,
+            experience_years=user.experience_years,
+            token_version=user.token_version or 0,
+        )
+
+
+# ---------------------------
+# Claims-only principal
+# ---------------------------
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Identity built from verified access-token claims alone (no DB row).
+    Enough for role guards and ownership checks that compare ids.
+    """
+    id: UUID
+    role: UserRole
+
+
+def token_fingerprint(token: str) -> str:
+    """
+    Short, non-reversible fingerprint of a bearer token used as part of the cache key.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+# ---------------------------
+# Bounded TTL cache
+# ---------------------------
+class PrincipalCache:
+    """
+    LRU + TTL cache of UserSnapshot keyed by (user_id, token fingerprint).
+    Keeps a per-user index so all entries of a user can be dropped at once.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple[UUID, str], tuple[float, UserSnapshot]]" = OrderedDict()
+        self._keys_by_user: dict[UUID, set[tuple[UUID, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: UUID, fingerprint: str) -> Optional[UserSnapshot]:
+        key = (user_id, fingerprint)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, snapshot = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def put(self, fingerprint: str, snapshot: UserSnapshot) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        key = (snapshot.id, fingerprint)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(snapshot.id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def get_any(self, user_id: UUID) -> Optional[UserSnapshot]:
+        """
+        Return any live snapshot of the user regardless of which token cached it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in self._keys_by_user.get(user_id, ()):
+                expires_at, snapshot = self._entries[key]
+                if expires_at > now:
+                    self.hits += 1
+                    return snapshot
+            self.misses += 1
+            return None
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            }
+
+    def _remove(self, key: tuple[UUID, str]) -> None:
+        self._entries.pop(key, None)
+        user_keys = self._keys_by_user.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[0]]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
+
+# ---------------------------
+# Invalidation hooks
+# ---------------------------
+def invalidate_user(user_id: UUID) -> None:
+    """
+    Call after changing a user's profile fields so the next request reloads them.
+    """
+    principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(User, "before_update")
+def _revoke_on_role_change(mapper, connection, target: User):
+    # Claims-only principals carry the role, so role changes and
+    # deactivation must also cut off already issued tokens. Written in
+    # the same UPDATE, so every process sees it once it commits.
+    state = inspect(target)
+    if state.attrs.token_version.history.has_changes():
+        return
+    if state.attrs.role.history.has_changes() or (
+        state.attrs.is_active.history.has_changes() and target.is_active is False
+    ):
+        bump_token_version(target)
+
+
+_UPDATED_USER_IDS = "principal_cache_updated_user_ids"
+
+
+def _invalidate_cached_user(user_id: UUID) -> None:
+    principal_cache.invalidate_user(user_id)
+    token_versions.invalidate(user_id)
+
+
+def _invalidate_at_flush_and_commit(target: User) -> None:
+    # Dropped at flush, but a concurrent request in this worker can still
+    # read and cache the old committed row until the transaction commits,
+    # so the id is dropped again once it does.
+    _invalidate_cached_user(target.id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_UPDATED_USER_IDS, set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_update(mapper, connection, target: User):
+    # Any ORM-level change to a user row (profile edit, deactivation, role change)
+    _invalidate_at_flush_and_commit(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target: User):
+    _invalidate_at_flush_and_commit(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    for user_id in session.info.pop(_UPDATED_USER_IDS, ()):
+        _invalidate_cached_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session):
+    session.info.pop(_UPDATED_USER_IDS, None)
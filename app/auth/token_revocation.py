@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+# How long a token_version bump made by another process can go unseen here
+TOKEN_VERSION_CACHE_SECONDS = float(os.getenv("TOKEN_VERSION_CACHE_SECONDS", 5))
+TOKEN_VERSION_CACHE_MAX_SIZE = int(os.getenv("TOKEN_VERSION_CACHE_MAX_SIZE", 50000))
+
+# Claim carrying users.token_version at issue time
+TOKEN_VERSION_CLAIM = "tv"
+
+
+# ---------------------------
+# Shared revocation state
+# ---------------------------
+# Revocation lives in users.token_version, so it holds across workers and
+# restarts. Tokens carry the version they were issued under; bumping the
+# column rejects every token issued before.
+def bump_token_version(user: User) -> None:
+    """
+    Reject every token issued to the user so far.
+    Used when a user is deactivated or their role changes. Does not commit.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    token_versions.invalidate(user.id)
+
+
+def token_claims(user: User) -> dict:
+    """
+    Claims shared by the access and refresh tokens of a user.
+    Only access tokens are checked today; the refresh token carries the
+    version so that whatever exchanges it must pass it to is_token_revoked
+    first, instead of minting fresh access tokens for a revoked session.
+    """
+    return {
+        "user_id": str(user.id),
+        "role": user.role.value,
+        TOKEN_VERSION_CLAIM: user.token_version or 0,
+    }
+
+
+def claimed_token_version(payload: dict) -> int:
+    # Tokens issued before versioning count as version 0
+    return payload.get(TOKEN_VERSION_CLAIM) or 0
+
+
+# ---------------------------
+# Short-TTL version cache
+# ---------------------------
+class TokenVersionCache:
+    """
+    (token_version, is_active) per user for claims-only auth, so a role
+    guard costs a primary-key lookup at most once per TTL per user.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: dict[UUID, tuple[float, int, bool]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID) -> Optional[tuple[int, bool]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, user_id: UUID, token_version: int, is_active: bool) -> None:
+        if self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            if user_id not in self._entries and len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, token_version, is_active)
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_versions = TokenVersionCache(TOKEN_VERSION_CACHE_SECONDS, TOKEN_VERSION_CACHE_MAX_SIZE)
+
+
+async def is_token_revoked(user_id: UUID, payload: dict, db: AsyncSession) -> bool:
+    """
+    True if the user is gone, deactivated, or their token_version moved past
+    the one the token was issued under.
+    """
+    cached = token_versions.get(user_id)
+    if cached is None:
+        result = await db.execute(
+            select(User.token_version, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return True
+        cached = (row.token_version, row.is_active is not False)
+        token_versions.put(user_id, *cached)
+
+    token_version, is_active = cached
+    return not is_active or claimed_token_version(payload) != token_version
@@ -1,5 +1,10 @@
 import os
+import time
+import asyncio
+import logging
 from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
@@ -19,12 +24,32 @@ if not DATABASE_URL:
 # ---------------------------
 # Engine
 # ---------------------------
+# Per-request SQL stats are collected by app.helpers.sql_instrumentation;
+# set SQL_ECHO=true to also log every statement.
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,  # set True for SQL debug logs
+    echo=SQL_ECHO,
     future=True
 )
 
+# ---------------------------
+# Read replica engine (optional)
+# ---------------------------
+# READ_DATABASE_URL points at a PostgreSQL streaming replica. Without it
+# all reads use the primary.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+MAX_REPLICA_LAG_SECONDS = float(os.getenv("MAX_REPLICA_LAG_SECONDS", 2))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 1))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+
+read_engine = (
+    create_async_engine(READ_DATABASE_URL, echo=SQL_ECHO, future=True)
+    if READ_DATABASE_URL
+    else engine
+)
+
 # ---------------------------
 # Session Local
 # ---------------------------
@@ -36,6 +61,14 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+)
+
 # ---------------------------
 # Base model
 # ---------------------------
@@ -50,3 +83,109 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+# ---------------------------
+# Replica routing
+# ---------------------------
+logger = logging.getLogger(__name__)
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_replica_lag: float | None = None
+_replica_lag_checked_at = 0.0
+_replica_lag_lock = asyncio.Lock()
+
+# Read-your-writes state travels with the client, so it holds whichever
+# worker serves the next request: a cookie for browsers, and the same value
+# as a response header that API clients echo back as a request header.
+READ_YOUR_WRITES_COOKIE = "read_your_writes_until"
+READ_YOUR_WRITES_HEADER = "Read-Your-Writes-Until"
+
+
+async def get_replica_lag() -> float | None:
+    """
+    Replica lag in seconds, re-measured at most every REPLICA_LAG_CHECK_SECONDS.
+    None means the replica could not be reached.
+    """
+    global _replica_lag, _replica_lag_checked_at
+
+    if time.monotonic() - _replica_lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+        return _replica_lag
+
+    async with _replica_lag_lock:
+        if time.monotonic() - _replica_lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+            return _replica_lag
+
+        try:
+            async with read_engine.connect() as conn:
+                lag = (await conn.execute(_REPLICA_LAG_SQL)).scalar()
+            _replica_lag = float(lag or 0)
+        except Exception:
+            logger.warning("Replica lag check failed; routing reads to primary", exc_info=True)
+            _replica_lag = None
+
+        _replica_lag_checked_at = time.monotonic()
+        return _replica_lag
+
+
+def _is_sticky(request: Request) -> bool:
+    """
+    True while the client's last write is younger than READ_YOUR_WRITES_SECONDS.
+    Values further ahead than that are ignored, so a client cannot pin
+    itself to the primary.
+    """
+    value = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    if not value:
+        return False
+    try:
+        until = float(value)
+    except ValueError:
+        return False
+
+    now = time.time()
+    return now < until <= now + READ_YOUR_WRITES_SECONDS
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """
+    After a successful write, tell the client to read from the primary for
+    READ_YOUR_WRITES_SECONDS.
+    """
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        until = f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+        response.headers[READ_YOUR_WRITES_HEADER] = until
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            until,
+            max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+# ---------------------------
+# Read-only dependency for FastAPI
+# ---------------------------
+async def get_read_db(request: Request):
+    """
+    Session for read-only routes. Uses the replica unless it is not
+    configured, lags more than MAX_REPLICA_LAG_SECONDS, or this session
+    wrote recently (read-your-writes).
+    """
+    use_replica = read_engine is not engine and not _is_sticky(request)
+    if use_replica:
+        lag = await get_replica_lag()
+        use_replica = lag is not None and lag <= MAX_REPLICA_LAG_SECONDS
+
+    session_factory = ReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
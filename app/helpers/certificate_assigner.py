@@ -1,44 +1,106 @@
 import uuid
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.helpers.progress_calculator import get_course_progress
-from app.models import Certificate
+from app.database import AsyncSessionLocal
+from app.helpers.progress_tracker import get_tracked_progress, get_tracked_progress_bulk
+from app.helpers.certificate_pdf import render_certificates_task
+from app.helpers.task_queue import emit_after_commit
+from app.models import Certificate, Course
+
+CERTIFICATE_MIN_PROGRESS = 90
+
+
+def new_certificate_number() -> str:
+    return f"CERT-{uuid.uuid4().hex[:12].upper()}"
 
 
 async def issue_certificate_if_completed(
     course_id: UUID,
     student_id: UUID,
     db: AsyncSession
-):
+) -> UUID | None:
+    """
+    Issue the student's certificate if they are eligible. Uses the same
+    INSERT ... ON CONFLICT DO NOTHING as the bulk path, so a certificate
+    issued concurrently by the course finalizer is not an error.
+    Returns the id of a newly issued certificate, else None.
+    """
     # 1. Get course progress
-    progress = await get_course_progress(course_id, student_id, db)
+    progress = await get_tracked_progress(course_id, student_id, db)
 
-    if progress["overall_progress"] < 90:
+    if progress["overall_progress"] < CERTIFICATE_MIN_PROGRESS:
+        await db.commit()  # keep a lazily materialised progress row
         return None  # not eligible yet
 
-    # 2. Check if certificate already exists
-    existing = await db.scalar(
-        select(Certificate)
-        .where(
-            Certificate.course_id == course_id,
-            Certificate.student_id == student_id
+    # 2. Create certificate unless one exists
+    certificate_id = await db.scalar(
+        pg_insert(Certificate)
+        .values(
+            id=uuid.uuid4(),
+            course_id=course_id,
+            student_id=student_id,
+            certificate_number=new_certificate_number(),
+            score=progress["overall_progress"],
         )
+        .on_conflict_do_nothing(constraint="unique_certificate_per_course")
+        .returning(Certificate.id)
     )
 
-    if existing:
-        return existing
+    # PDF is rendered in the background once the certificate is committed
+    if certificate_id is not None:
+        emit_after_commit(db, None, render_certificates_task, [certificate_id])
+    await db.commit()
+    return certificate_id
 
-    # 3. Create certificate
-    cert = Certificate(
-        course_id=course_id,
-        student_id=student_id,
-        certificate_number=f"CERT-{uuid.uuid4().hex[:12].upper()}",
-        score=progress["overall_progress"]
-    )
 
-    db.add(cert)
+async def check_certificate_task(course_id: UUID, student_id: UUID):
+    """
+    Background task run after a progress-changing commit (see task_queue).
+    """
+    async with AsyncSessionLocal() as db:
+        course = await db.get(Course, course_id)
+        if course and course.is_course_ended:
+            await issue_certificate_if_completed(course_id, student_id, db)
+
+
+async def issue_certificates_if_completed(
+    course_id: UUID,
+    student_ids: list[UUID],
+    db: AsyncSession
+) -> list[UUID]:
+    """
+    Batch variant: one progress query for all students and one
+    INSERT ... ON CONFLICT DO NOTHING for every eligible student.
+    Returns the ids of students who received a new certificate; their PDFs
+    are rendered in the background after the commit.
+    """
+    progress = await get_tracked_progress_bulk(course_id, student_ids, db)
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "course_id": course_id,
+            "student_id": student_id,
+            "certificate_number": new_certificate_number(),
+            "score": student_progress["overall_progress"],
+        }
+        for student_id, student_progress in progress.items()
+        if student_progress["overall_progress"] >= CERTIFICATE_MIN_PROGRESS
+    ]
+    if not rows:
+        await db.commit()
+        return []
+
+    result = await db.execute(
+        pg_insert(Certificate)
+        .values(rows)
+        .on_conflict_do_nothing(constraint="unique_certificate_per_course")
+        .returning(Certificate.id, Certificate.student_id)
+    )
+    issued = result.all()
+    if issued:
+        emit_after_commit(db, None, render_certificates_task, [row.id for row in issued])
     await db.commit()
-    await db.refresh(cert)
-    return cert
+    return [row.student_id for row in issued]
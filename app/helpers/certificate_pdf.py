@@ -0,0 +1,231 @@
+import os
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from uuid import UUID
+
+from sqlalchemy import select, update, values, column, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.helpers.file_paths import CERTIFICATE_DIR
+from app.models import Certificate, Course, User
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATE_RENDER_WORKERS = int(os.getenv("CERTIFICATE_RENDER_WORKERS", os.cpu_count() or 2))
+CERTIFICATE_URL_PREFIX = "/certificate/files"
+CERTIFICATE_RENDER_BATCH_SIZE = int(os.getenv("CERTIFICATE_RENDER_BATCH_SIZE", 500))
+
+PAGE_WIDTH = 842   # A4 landscape, points
+PAGE_HEIGHT = 595
+
+
+# ---------------------------
+# Minimal PDF writer
+# ---------------------------
+# One page, the two built-in Helvetica fonts and latin-1 text is all a
+# certificate needs. Output is deterministic (no timestamps or ids), so the
+# same certificate always yields the same bytes and the same file name.
+def _pdf_text(value: str) -> bytes:
+    raw = value.encode("latin-1", "replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _centered_line(text: str, font: str, size: int, y: int) -> bytes:
+    # Helvetica glyphs average roughly half an em wide
+    x = max(36, (PAGE_WIDTH - len(text) * size * 0.5) / 2)
+    return b"BT /%s %d Tf %.1f %d Td (%s) Tj ET\n" % (font.encode(), size, x, y, _pdf_text(text))
+
+
+def build_certificate_pdf(fields: dict) -> bytes:
+    content = b"".join([
+        b"4 w 30 30 782 535 re S\n",
+        b"1 w 40 40 762 515 re S\n",
+        _centered_line("Certificate of Completion", "F1", 36, 450),
+        _centered_line("This is to certify that", "F2", 16, 390),
+        _centered_line(fields["student_name"], "F1", 28, 345),
+        _centered_line("has successfully completed the course", "F2", 16, 300),
+        _centered_line(f"{fields['course_name']} ({fields['course_code']})", "F1", 22, 260),
+        _centered_line(f"Score: {fields['score']}%", "F2", 14, 200),
+        _centered_line(f"Issued on {fields['issued_on']}", "F2", 12, 120),
+        _centered_line(f"Certificate No. {fields['certificate_number']}", "F2", 12, 100),
+    ])
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%sendstream" % (len(content), content),
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def render_certificate_file(fields: dict) -> str:
+    """
+    Render and store one certificate; runs inside a pool process.
+    Files are content-addressed (<sha256>.pdf) and written atomically, so
+    identical renders share a file and a stored file never changes.
+    Returns the public URL.
+    """
+    pdf = build_certificate_pdf(fields)
+    filename = f"{hashlib.sha256(pdf).hexdigest()}.pdf"
+    fs_path = os.path.join(CERTIFICATE_DIR, filename)
+
+    if not os.path.exists(fs_path):
+        os.makedirs(CERTIFICATE_DIR, exist_ok=True)
+        tmp_path = f"{fs_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, fs_path)
+
+    return f"{CERTIFICATE_URL_PREFIX}/{filename}"
+
+
+# ---------------------------
+# Process pool
+# ---------------------------
+_render_executor: ProcessPoolExecutor | None = None
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(max_workers=CERTIFICATE_RENDER_WORKERS)
+    return _render_executor
+
+
+def shutdown_certificate_pool() -> None:
+    global _render_executor
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=True, cancel_futures=True)
+        _render_executor = None
+
+
+async def render_certificates(certificate_ids: list[UUID], db: AsyncSession) -> int:
+    """
+    Render PDFs for the given certificates in parallel on the process pool
+    and store every pdf_url with one UPDATE ... FROM (VALUES ...).
+    """
+    if not certificate_ids:
+        return 0
+
+    result = await db.execute(
+        select(
+            Certificate.id,
+            Certificate.certificate_number,
+            Certificate.issued_at,
+            Certificate.score,
+            User.name,
+            Course.name,
+            Course.code,
+        )
+        .join(User, User.id == Certificate.student_id)
+        .join(Course, Course.id == Certificate.course_id)
+        .where(Certificate.id.in_(certificate_ids))
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    loop = asyncio.get_running_loop()
+    executor = _executor()
+    urls = await asyncio.gather(*(
+        loop.run_in_executor(
+            executor,
+            render_certificate_file,
+            {
+                "certificate_number": row[1],
+                "issued_on": row[2].strftime("%d %B %Y") if row[2] else "",
+                "score": row[3] if row[3] is not None else 0,
+                "student_name": row[4],
+                "course_name": row[5],
+                "course_code": row[6],
+            },
+        )
+        for row in rows
+    ))
+
+    pdf_values = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("pdf_url", Text),
+        name="pdf_values",
+    ).data([(row[0], url) for row, url in zip(rows, urls)])
+
+    certificates = Certificate.__table__
+    await db.execute(
+        update(certificates)
+        .where(certificates.c.id == pdf_values.c.id)
+        .values(pdf_url=pdf_values.c.pdf_url)
+    )
+    await db.commit()
+    return len(rows)
+
+
+async def certificates_missing_pdf(
+    db: AsyncSession,
+    course_id: UUID | None = None,
+    after_id: UUID | None = None,
+    limit: int = CERTIFICATE_RENDER_BATCH_SIZE,
+) -> list[UUID]:
+    """
+    Ids of certificates whose PDF was never stored, in id order so callers
+    can page through them with after_id.
+    """
+    query = (
+        select(Certificate.id)
+        .where(Certificate.pdf_url.is_(None))
+        .order_by(Certificate.id)
+        .limit(limit)
+    )
+    if course_id is not None:
+        query = query.where(Certificate.course_id == course_id)
+    if after_id is not None:
+        query = query.where(Certificate.id > after_id)
+
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def render_certificates_task(certificate_ids: list[UUID]):
+    """
+    Background task queued after certificates are issued.
+    """
+    async with AsyncSessionLocal() as db:
+        rendered = await render_certificates(certificate_ids, db)
+    logger.info("Rendered %d certificate PDFs", rendered)
+
+
+async def render_missing_certificates_task():
+    """
+    Startup sweep: render every certificate whose PDF was never stored,
+    e.g. because its queued render was lost to a restart.
+    """
+    rendered = 0
+    last_id = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            certificate_ids = await certificates_missing_pdf(db, after_id=last_id)
+            if not certificate_ids:
+                break
+            rendered += await render_certificates(certificate_ids, db)
+            last_id = certificate_ids[-1]
+    if rendered:
+        logger.info("Backfilled %d missing certificate PDFs", rendered)
@@ -0,0 +1,169 @@
+import os
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import course_students
+from app.helpers.certificate_assigner import issue_certificates_if_completed
+from app.helpers.certificate_pdf import certificates_missing_pdf, render_certificates_task
+from app.helpers.task_queue import task_queue
+
+logger = logging.getLogger(__name__)
+
+FINALIZE_BATCH_SIZE = int(os.getenv("FINALIZE_BATCH_SIZE", 1000))
+FINALIZE_JOBS_KEPT = int(os.getenv("FINALIZE_JOBS_KEPT", 500))
+
+
+@dataclass
+class FinalizationJob:
+    course_id: UUID
+    job_id: UUID = field(default_factory=uuid.uuid4)
+    status: str = "queued"  # queued | running | completed | failed
+    total_students: int = 0
+    processed_students: int = 0
+    certificates_issued: int = 0
+    pdfs_requeued: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+    error: str | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CourseFinalizer:
+    """
+    Issues certificates for every eligible student once a course ends.
+    Jobs run as background tasks with their own session; each batch of
+    enrolled students costs one bulk progress read and one
+    INSERT ... ON CONFLICT DO NOTHING, so re-running a job is harmless.
+    Certificates left without a PDF by an earlier run get their render
+    queued again.
+    Job status is kept in memory for the status endpoint.
+    """
+
+    def __init__(self, batch_size: int, jobs_kept: int):
+        self.batch_size = batch_size
+        self.jobs_kept = jobs_kept
+        self._jobs: OrderedDict[UUID, FinalizationJob] = OrderedDict()
+        self._latest_by_course: dict[UUID, UUID] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self, course_id: UUID) -> FinalizationJob:
+        """
+        Schedule finalization of a course; an active job for it is reused.
+        """
+        current = self.latest_for_course(course_id)
+        if current is not None and current.is_active:
+            return current
+
+        job = FinalizationJob(course_id=course_id)
+        self._remember(job)
+
+        task = asyncio.create_task(self.run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: UUID) -> FinalizationJob | None:
+        return self._jobs.get(job_id)
+
+    def latest_for_course(self, course_id: UUID) -> FinalizationJob | None:
+        job_id = self._latest_by_course.get(course_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    def _remember(self, job: FinalizationJob) -> None:
+        self._jobs[job.job_id] = job
+        self._latest_by_course[job.course_id] = job.job_id
+        while len(self._jobs) > self.jobs_kept:
+            _, evicted = self._jobs.popitem(last=False)
+            if self._latest_by_course.get(evicted.course_id) == evicted.job_id:
+                del self._latest_by_course[evicted.course_id]
+
+    async def run(self, job: FinalizationJob) -> FinalizationJob:
+        job.status = "running"
+        try:
+            async with AsyncSessionLocal() as db:
+                job.total_students = await db.scalar(
+                    select(func.count())
+                    .select_from(course_students)
+                    .where(course_students.c.course_id == job.course_id)
+                ) or 0
+
+                # Renders from an earlier run may have been lost (restart, crash);
+                # this run's own certificates are queued after their commit
+                job.pdfs_requeued = await self._requeue_missing_pdfs(job.course_id, db)
+
+                last_student_id = None
+                while True:
+                    query = (
+                        select(course_students.c.student_id)
+                        .where(course_students.c.course_id == job.course_id)
+                        .order_by(course_students.c.student_id)
+                        .limit(self.batch_size)
+                    )
+                    if last_student_id is not None:
+                        query = query.where(course_students.c.student_id > last_student_id)
+
+                    result = await db.execute(query)
+                    student_ids = list(result.scalars().all())
+                    if not student_ids:
+                        break
+
+                    issued = await issue_certificates_if_completed(job.course_id, student_ids, db)
+                    job.processed_students += len(student_ids)
+                    job.certificates_issued += len(issued)
+                    last_student_id = student_ids[-1]
+
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "cancelled"
+            raise
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            logger.exception("Finalization of course %s failed", job.course_id)
+        finally:
+            job.finished_at = datetime.utcnow()
+
+        logger.info(
+            "Finalized course %s: %d/%d students, %d certificates issued, %d PDFs re-queued",
+            job.course_id, job.processed_students, job.total_students,
+            job.certificates_issued, job.pdfs_requeued,
+        )
+        return job
+
+    async def _requeue_missing_pdfs(self, course_id: UUID, db: AsyncSession) -> int:
+        queued = 0
+        last_id = None
+        while True:
+            certificate_ids = await certificates_missing_pdf(
+                db, course_id=course_id, after_id=last_id, limit=self.batch_size
+            )
+            if not certificate_ids:
+                return queued
+            if task_queue.enqueue(None, render_certificates_task, certificate_ids):
+                queued += len(certificate_ids)
+            last_id = certificate_ids[-1]
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+course_finalizer = CourseFinalizer(FINALIZE_BATCH_SIZE, FINALIZE_JOBS_KEPT)
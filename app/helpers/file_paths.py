@@ -38,4 +38,16 @@ def delete_assignment_file_safely(file_url: str):
     file_path = os.path.join(ASSIGNMENT_SUBMISSION_DIR, filename)
 
     if os.path.exists(file_path):
-        os.remove(file_path)
\ No newline at end of file
+        os.remove(file_path)
+
+CERTIFICATE_DIR = os.path.join(UPLOADS_DIR, "certificates")
+
+
+def get_certificate_fs_path(pdf_url: str) -> str:
+    """
+    Converts certificate pdf_url -> absolute filesystem path
+    Example:
+    /certificate/files/<sha256>.pdf
+    -> F:/course_management_system/uploads/certificates/<sha256>.pdf
+    """
+    return os.path.join(CERTIFICATE_DIR, os.path.basename(pdf_url))
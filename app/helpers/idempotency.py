@@ -0,0 +1,155 @@
+import os
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Header, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+UPLOAD_DIGEST_CHUNK_SIZE = 64 * 1024
+
+
+def idempotency_key_header(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Optional[str]:
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(400, f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+    return idempotency_key
+
+
+def request_fingerprint(*parts) -> str:
+    """
+    Hash of what makes a request "the same request" for key reuse checks.
+    """
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+
+
+async def upload_digest(file: UploadFile) -> str:
+    """
+    SHA-256 of an upload's content; the file is rewound afterwards.
+    """
+    digest = hashlib.sha256()
+    while chunk := await file.read(UPLOAD_DIGEST_CHUNK_SIZE):
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+def _cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+async def find_idempotent_response(
+    db: AsyncSession,
+    user_id: UUID,
+    key: Optional[str],
+    scope: str,
+    request_hash: str,
+) -> Optional[JSONResponse]:
+    """
+    Stored response for a retried request, or None if the key is new.
+    Reusing a key for a different request is a 422.
+    """
+    if key is None:
+        return None
+
+    result = await db.execute(
+        select(
+            IdempotencyKey.scope,
+            IdempotencyKey.request_hash,
+            IdempotencyKey.status_code,
+            IdempotencyKey.response_body,
+        ).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at >= _cutoff(),
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    if row.scope != scope or row.request_hash != request_hash:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+
+    return JSONResponse(
+        status_code=row.status_code,
+        content=row.response_body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def idempotency_row(
+    user_id: UUID,
+    key: str,
+    scope: str,
+    request_hash: str,
+    status_code: int,
+    body,
+) -> dict:
+    return {
+        "user_id": user_id,
+        "key": key,
+        "scope": scope,
+        "request_hash": request_hash,
+        "status_code": status_code,
+        "response_body": jsonable_encoder(body),
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def store_idempotent_responses(rows: list[dict], db: AsyncSession) -> None:
+    """
+    Record responses in the caller's transaction, so a key is stored if and
+    only if its write commits. An expired record under the same key is replaced.
+    """
+    if not rows:
+        return
+
+    stmt = pg_insert(IdempotencyKey)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_={
+                "scope": stmt.excluded.scope,
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": stmt.excluded.status_code,
+                "response_body": stmt.excluded.response_body,
+                "created_at": stmt.excluded.created_at,
+            },
+            where=IdempotencyKey.created_at < _cutoff(),
+        ),
+        rows,
+    )
+
+
+async def store_idempotent_response(
+    db: AsyncSession,
+    user_id: UUID,
+    key: Optional[str],
+    scope: str,
+    request_hash: str,
+    status_code: int,
+    body,
+) -> None:
+    if key is not None:
+        await store_idempotent_responses(
+            [idempotency_row(user_id, key, scope, request_hash, status_code, body)], db
+        )
+
+
+async def purge_expired_idempotency_keys(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.created_at < _cutoff())
+    )
+    await db.commit()
+    return result.rowcount
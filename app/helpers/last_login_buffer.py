@@ -0,0 +1,99 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import update, values, column, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.database import AsyncSessionLocal
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+LAST_LOGIN_FLUSH_SECONDS = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", 5))
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for User.last_login.
+    Logins record a timestamp in memory; a background task writes all pending
+    timestamps with one UPDATE ... FROM (VALUES ...) every few seconds and
+    once more on shutdown. Repeated logins of a user collapse to the latest.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: dict[UUID, datetime] = {}
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def record(self, user_id: UUID, logged_in_at: datetime) -> None:
+        current = self._pending.get(user_id)
+        if current is None or logged_in_at > current:
+            self._pending[user_id] = logged_in_at
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+
+        login_values = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("ts", DateTime),
+            name="login_values",
+        ).data(list(batch.items()))
+
+        users = User.__table__
+        stmt = (
+            update(users)
+            .where(users.c.id == login_values.c.id)
+            .values(last_login=login_values.c.ts)
+        )
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except asyncio.CancelledError:
+            # Cancelled mid-write: keep the batch for whoever flushes next
+            for user_id, logged_in_at in batch.items():
+                self.record(user_id, logged_in_at)
+            raise
+        except Exception:
+            # Put the batch back so the next flush retries it
+            for user_id, logged_in_at in batch.items():
+                self.record(user_id, logged_in_at)
+            logger.exception("Failed to flush %d last_login updates", len(batch))
+            return 0
+
+        return len(batch)
+
+    async def _run(self):
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Let the writer finish its current flush (never cancelled mid-write),
+        then write whatever is still pending.
+        """
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+last_login_buffer = LastLoginBuffer(LAST_LOGIN_FLUSH_SECONDS)
@@ -0,0 +1,94 @@
+import os
+import hmac
+import json
+import base64
+import hashlib
+from datetime import datetime
+from uuid import UUID
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import tuple_, literal
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.types import DateTime
+
+load_dotenv()
+
+# Cursors are signed so clients cannot craft arbitrary keyset positions.
+CURSOR_SECRET = (os.getenv("CURSOR_SECRET") or os.getenv("SECRET_KEY") or "").encode()
+
+if not CURSOR_SECRET:
+    raise ValueError("❌ CURSOR_SECRET or SECRET_KEY must be set in the .env file")
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(CURSOR_SECRET, payload, hashlib.sha256).digest()[:16]
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """
+    Opaque cursor for the (created_at, id) position of the last row of a page.
+    """
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Verify and decode a cursor produced by encode_cursor.
+    Raises 400 if it was tampered with or is malformed.
+    """
+    try:
+        payload_part, signature_part = cursor.split(".", 1)
+        payload = _b64decode(payload_part)
+        if not hmac.compare_digest(_sign(payload), _b64decode(signature_part)):
+            raise ValueError("bad signature")
+        created_at, row_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def apply_keyset(query, created_col, id_col, cursor: str | None, limit: int, descending: bool = True):
+    """
+    Add the keyset condition, a stable (created_at, id) ordering and LIMIT limit+1.
+    The row-value comparison lets Postgres walk a (created_at, id) index directly.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        position = tuple_(
+            literal(created_at, DateTime()),
+            literal(row_id, PG_UUID(as_uuid=True)),
+        )
+        keys = tuple_(created_col, id_col)
+        query = query.where(keys < position if descending else keys > position)
+
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+
+    return query.limit(limit + 1)
+
+
+def split_page(rows: list, limit: int) -> tuple[list, str | None]:
+    """
+    Trim the extra look-ahead row and build the next cursor from the last row kept.
+    Rows must expose created_at and id.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(last.created_at, last.id)
+    return rows, None
@@ -1,4 +1,5 @@
-from sqlalchemy import select, func
+from sqlalchemy import select, func, values, column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -76,7 +77,83 @@ async def get_quiz_progress(course_id: UUID, student_id: UUID, db: AsyncSession)
     return round((completed_quizzes / total_quizzes) * 100, 2)
 
 
+def _percentage(part, total):
+    if not total:
+        return None
+    return round(((part or 0) / total) * 100, 2)
+
+
+def progress_from_totals(
+    total_duration, watched_seconds,
+    total_assignments, submitted_assignments,
+    total_quizzes, completed_quizzes,
+):
+    """
+    Turn raw totals/numerators into the course-progress payload.
+    Same rounding as the per-component functions above.
+    """
+    video_progress = _percentage(watched_seconds, total_duration)
+    assignment_progress = _percentage(submitted_assignments, total_assignments)
+    quiz_progress = _percentage(completed_quizzes, total_quizzes)
+
+    progress_values = [
+        value for value in (video_progress, assignment_progress, quiz_progress)
+        if value is not None
+    ]
+    overall = round(sum(progress_values) / len(progress_values), 2) if progress_values else 0
+
+    return {
+        "video_progress": video_progress,
+        "assignment_progress": assignment_progress,
+        "quiz_progress": quiz_progress,
+        "overall_progress": overall
+    }
+
+
+def progress_totals(course_id: UUID):
+    """
+    Scalar subqueries for the course-wide denominators of progress.
+    """
+    total_duration = (
+        select(func.sum(Media.duration_seconds))
+        .where(Media.course_id == course_id, Media.media_type == "video")
+        .scalar_subquery()
+    )
+    total_assignments = (
+        select(func.count(Assignment.id))
+        .where(Assignment.course_id == course_id)
+        .scalar_subquery()
+    )
+    total_quizzes = (
+        select(func.count(Quiz.id))
+        .where(Quiz.course_id == course_id)
+        .scalar_subquery()
+    )
+    return total_duration, total_assignments, total_quizzes
+
+
+def _student_ids_table(student_ids: list[UUID]):
+    return values(
+        column("student_id", PG_UUID(as_uuid=True)),
+        name="requested_students",
+    ).data([(student_id,) for student_id in student_ids])
+
+
 async def get_course_progress(course_id: UUID, student_id: UUID, db: AsyncSession):
+    """
+    Course progress of one student in a single round trip; the one-student
+    case of get_progress_counts_bulk. Results match
+    get_course_progress_sequential.
+    """
+    counts = await get_progress_counts_bulk(course_id, [student_id], db)
+    return progress_from_totals(*counts[student_id])
+
+
+async def get_course_progress_sequential(course_id: UUID, student_id: UUID, db: AsyncSession):
+    """
+    Original six-query composition, kept as the reference for parity checks
+    and benchmarks/progress_benchmark.py.
+    """
     progress_values = []
 
     video_progress = await get_media_progress(course_id, student_id, db)
@@ -101,69 +178,146 @@ async def get_course_progress(course_id: UUID, student_id: UUID, db: AsyncSessio
     }
 
 
+def performance_from_totals(assignment_count, obtained, total_marks):
+    """
+    Assignment or quiz performance payload: obtained and total marks, and
+    the percentage rounded to two places.
+    """
+    if not assignment_count:
+        return {"obtained": 0, "total": 0, "percentage": 0}
 
+    obtained = obtained or 0
+    total_marks = total_marks or 0
+    percentage = round((obtained / total_marks) * 100, 2) if total_marks else 0
 
-async def get_assignment_performance(course_id: UUID, student_id: UUID, db: AsyncSession):
-    # 1. Get all assignments in the course
-    result = await db.execute(
-        select(Assignment.id, Assignment.total_marks)
-        .where(Assignment.course_id == course_id)
-    )
-    assignments = result.all()
+    return {
+        "obtained": obtained,
+        "total": total_marks,
+        "percentage": percentage
+    }
 
-    if not assignments:
-        return {"obtained": 0, "total": 0, "percentage": 0}
 
-    assignment_ids = [a.id for a in assignments]
-    total_marks = sum(a.total_marks for a in assignments)
+# ---------------------------
+# Batch variants (one course, many students)
+# ---------------------------
+async def get_progress_counts_bulk(course_id: UUID, student_ids: list[UUID], db: AsyncSession):
+    """
+    Raw progress inputs for many students in one round trip.
+    Per-student numerators come from grouped aggregates outer-joined to the
+    requested ids; returns {student_id: (total_duration, watched_seconds,
+    total_assignments, submitted_assignments, total_quizzes, completed_quizzes)}.
+    """
+    if not student_ids:
+        return {}
+
+    students = _student_ids_table(student_ids)
+    total_duration, total_assignments, total_quizzes = progress_totals(course_id)
+
+    watched = (
+        select(
+            MediaProgress.student_id,
+            func.sum(MediaProgress.watched_seconds).label("amount"),
+        )
+        .join(Media)
+        .where(Media.course_id == course_id, MediaProgress.student_id.in_(student_ids))
+        .group_by(MediaProgress.student_id)
+        .subquery()
+    )
+    submitted = (
+        select(
+            AssignmentSubmission.student_id,
+            func.count(AssignmentSubmission.id).label("amount"),
+        )
+        .join(Assignment)
+        .where(Assignment.course_id == course_id, AssignmentSubmission.student_id.in_(student_ids))
+        .group_by(AssignmentSubmission.student_id)
+        .subquery()
+    )
+    completed = (
+        select(
+            QuizSubmission.student_id,
+            func.count(QuizSubmission.id).label("amount"),
+        )
+        .join(Quiz)
+        .where(Quiz.course_id == course_id, QuizSubmission.student_id.in_(student_ids))
+        .group_by(QuizSubmission.student_id)
+        .subquery()
+    )
 
-    # 2. Get marks obtained by student
     result = await db.execute(
-        select(func.sum(AssignmentSubmission.marks_obtained))
-        .where(
-            AssignmentSubmission.assignment_id.in_(assignment_ids),
-            AssignmentSubmission.student_id == student_id
+        select(
+            students.c.student_id,
+            total_duration,
+            watched.c.amount,
+            total_assignments,
+            submitted.c.amount,
+            total_quizzes,
+            completed.c.amount,
         )
+        .select_from(students)
+        .outerjoin(watched, watched.c.student_id == students.c.student_id)
+        .outerjoin(submitted, submitted.c.student_id == students.c.student_id)
+        .outerjoin(completed, completed.c.student_id == students.c.student_id)
     )
-    obtained_marks = result.scalar() or 0
 
-    percentage = round((obtained_marks / total_marks) * 100, 2) if total_marks else 0
+    return {row[0]: tuple(row[1:]) for row in result.all()}
 
-    return {
-        "obtained": obtained_marks,
-        "total": total_marks,
-        "percentage": percentage
-    }
 
+async def get_performance_bulk(course_id: UUID, student_ids: list[UUID], db: AsyncSession):
+    """
+    Assignment and quiz performance for many students in one round trip.
+    Returns {student_id: {"assignment": {...}, "quiz": {...}}}.
+    """
+    if not student_ids:
+        return {}
 
-async def get_quiz_performance(course_id: UUID, student_id: UUID, db: AsyncSession):
-    # 1. Get all quizzes in the course
-    result = await db.execute(
-        select(Quiz.id, Quiz.total_marks)
-        .where(Quiz.course_id == course_id)
-    )
-    quizzes = result.all()
+    students = _student_ids_table(student_ids)
 
-    if not quizzes:
-        return {"obtained": 0, "total": 0, "percentage": 0}
+    assignment_count = select(func.count(Assignment.id)).where(Assignment.course_id == course_id).scalar_subquery()
+    assignment_marks = select(func.sum(Assignment.total_marks)).where(Assignment.course_id == course_id).scalar_subquery()
+    quiz_count = select(func.count(Quiz.id)).where(Quiz.course_id == course_id).scalar_subquery()
+    quiz_marks = select(func.sum(Quiz.total_marks)).where(Quiz.course_id == course_id).scalar_subquery()
 
-    quiz_ids = [q.id for q in quizzes]
-    total_marks = sum(q.total_marks for q in quizzes)
+    assignment_obtained = (
+        select(
+            AssignmentSubmission.student_id,
+            func.sum(AssignmentSubmission.marks_obtained).label("amount"),
+        )
+        .join(Assignment)
+        .where(Assignment.course_id == course_id, AssignmentSubmission.student_id.in_(student_ids))
+        .group_by(AssignmentSubmission.student_id)
+        .subquery()
+    )
+    quiz_obtained = (
+        select(
+            QuizSubmission.student_id,
+            func.sum(QuizSubmission.total_score).label("amount"),
+        )
+        .join(Quiz)
+        .where(Quiz.course_id == course_id, QuizSubmission.student_id.in_(student_ids))
+        .group_by(QuizSubmission.student_id)
+        .subquery()
+    )
 
-    # 2. Get marks obtained by student
     result = await db.execute(
-        select(func.sum(QuizSubmission.total_score))
-        .where(
-            QuizSubmission.quiz_id.in_(quiz_ids),
-            QuizSubmission.student_id == student_id
+        select(
+            students.c.student_id,
+            assignment_count,
+            assignment_obtained.c.amount,
+            assignment_marks,
+            quiz_count,
+            quiz_obtained.c.amount,
+            quiz_marks,
         )
+        .select_from(students)
+        .outerjoin(assignment_obtained, assignment_obtained.c.student_id == students.c.student_id)
+        .outerjoin(quiz_obtained, quiz_obtained.c.student_id == students.c.student_id)
     )
-    obtained_marks = result.scalar() or 0
-
-    percentage = round((obtained_marks / total_marks) * 100, 2) if total_marks else 0
 
     return {
-        "obtained": obtained_marks,
-        "total": total_marks,
-        "percentage": percentage
+        row[0]: {
+            "assignment": performance_from_totals(row[1], row[2], row[3]),
+            "quiz": performance_from_totals(row[4], row[5], row[6]),
+        }
+        for row in result.all()
     }
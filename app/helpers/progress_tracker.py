@@ -0,0 +1,302 @@
+import os
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, values, column, func, Integer, String
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import StudentCourseProgress, course_students
+from app.helpers.progress_calculator import (
+    get_progress_counts_bulk,
+    progress_from_totals,
+    progress_totals,
+)
+
+PROGRESS_REFRESH_BATCH_SIZE = int(os.getenv("PROGRESS_REFRESH_BATCH_SIZE", 1000))
+
+# Same order as progress_from_totals arguments
+COUNT_COLUMNS = (
+    "total_duration",
+    "watched_seconds",
+    "total_assignments",
+    "submitted_assignments",
+    "total_quizzes",
+    "completed_quizzes",
+)
+
+
+def _row_progress(row: StudentCourseProgress) -> dict:
+    return progress_from_totals(*(getattr(row, name) for name in COUNT_COLUMNS))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _lock_progress_rows(pairs: list[tuple[UUID, UUID]], db: AsyncSession):
+    """
+    Transaction-level advisory locks on (course_id, student_id) pairs, taken
+    in a fixed order. Serialises a materialisation (read raw tables, write
+    the row) against deltas for the same row: whichever runs second sees the
+    other's committed effect, so a delta can never fall between the read
+    and the insert of a stale row.
+    """
+    if not pairs:
+        return
+
+    keys = sorted({f"progress:{course_id}:{student_id}" for course_id, student_id in pairs})
+    lock_key = func.unnest(array(keys, type_=String)).column_valued("lock_key")
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(lock_key))))
+
+
+async def _materialize(course_id: UUID, student_ids: list[UUID], db: AsyncSession, overwrite: bool) -> dict:
+    """
+    Recompute rows from the raw tables and upsert them. Does not commit;
+    the row locks are held until the caller's transaction ends.
+    overwrite=False keeps rows that already exist (lazy first read);
+    overwrite=True replaces them (refresh / rebuild).
+    """
+    await _lock_progress_rows([(course_id, student_id) for student_id in student_ids], db)
+    counts = await get_progress_counts_bulk(course_id, student_ids, db)
+    if not counts:
+        return {}
+
+    rows = []
+    for student_id, (total_duration, watched, total_assignments, submitted, total_quizzes, completed) in counts.items():
+        rows.append({
+            "student_id": student_id,
+            "course_id": course_id,
+            "total_duration": total_duration,
+            "watched_seconds": watched or 0,
+            "total_assignments": total_assignments or 0,
+            "submitted_assignments": submitted or 0,
+            "total_quizzes": total_quizzes or 0,
+            "completed_quizzes": completed or 0,
+            "updated_at": datetime.utcnow(),
+        })
+
+    stmt = pg_insert(StudentCourseProgress).values(rows)
+    if overwrite:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StudentCourseProgress.student_id, StudentCourseProgress.course_id],
+            set_={name: stmt.excluded[name] for name in (*COUNT_COLUMNS, "updated_at")},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+    await db.execute(stmt)
+
+    return {student_id: progress_from_totals(*values) for student_id, values in counts.items()}
+
+
+# ---------------------------
+# Reads
+# ---------------------------
+async def get_tracked_progress(course_id: UUID, student_id: UUID, db: AsyncSession) -> dict:
+    """
+    Course progress from student_course_progress (one primary-key lookup).
+    A missing row is computed from the raw tables and stored in the
+    caller's transaction. Does not commit.
+    """
+    row = await db.get(StudentCourseProgress, (student_id, course_id))
+    if row is not None:
+        return _row_progress(row)
+
+    progress = await _materialize(course_id, [student_id], db, overwrite=False)
+    return progress[student_id]
+
+
+async def get_tracked_progress_bulk(course_id: UUID, student_ids: list[UUID], db: AsyncSession) -> dict:
+    """
+    Batch variant of get_tracked_progress; returns {student_id: progress dict}.
+    Does not commit.
+    """
+    if not student_ids:
+        return {}
+
+    result = await db.execute(
+        select(StudentCourseProgress).where(
+            StudentCourseProgress.course_id == course_id,
+            StudentCourseProgress.student_id.in_(student_ids),
+        )
+    )
+    progress = {row.student_id: _row_progress(row) for row in result.scalars().all()}
+
+    missing = [student_id for student_id in dict.fromkeys(student_ids) if student_id not in progress]
+    if missing:
+        for chunk in _chunks(sorted(missing), PROGRESS_REFRESH_BATCH_SIZE):
+            progress.update(await _materialize(course_id, chunk, db, overwrite=False))
+
+    return progress
+
+
+# ---------------------------
+# Write hooks
+# ---------------------------
+# Deltas run in the caller's transaction so they commit together with the
+# write they describe. Students without a row are skipped: their row is
+# computed from scratch on first read. Both take the row's advisory lock
+# (see _lock_progress_rows).
+async def lock_progress(course_id: UUID, student_id: UUID, db: AsyncSession):
+    """
+    Take the row's advisory lock ahead of a delta, for callers that derive
+    the delta from rows they read first. Held until the transaction ends.
+    """
+    await _lock_progress_rows([(course_id, student_id)], db)
+
+
+async def _apply_delta(course_id: UUID, student_id: UUID, db: AsyncSession, **increments):
+    await _lock_progress_rows([(course_id, student_id)], db)
+    await db.execute(
+        update(StudentCourseProgress)
+        .where(
+            StudentCourseProgress.student_id == student_id,
+            StudentCourseProgress.course_id == course_id,
+        )
+        .values({
+            name: getattr(StudentCourseProgress, name) + amount
+            for name, amount in increments.items()
+        } | {"updated_at": datetime.utcnow()})
+    )
+
+
+async def record_media_watched(course_id: UUID, student_id: UUID, delta_seconds: int, db: AsyncSession):
+    if delta_seconds:
+        await _apply_delta(course_id, student_id, db, watched_seconds=delta_seconds)
+
+
+async def record_assignment_submitted(course_id: UUID, student_id: UUID, db: AsyncSession):
+    await _apply_delta(course_id, student_id, db, submitted_assignments=1)
+
+
+async def record_quiz_submitted(course_id: UUID, student_id: UUID, db: AsyncSession):
+    await _apply_delta(course_id, student_id, db, completed_quizzes=1)
+
+
+async def record_quiz_submissions_bulk(counts: dict[tuple[UUID, UUID], int], db: AsyncSession):
+    """
+    Batched record_quiz_submitted: {(course_id, student_id): quizzes} in one
+    UPDATE ... FROM (VALUES ...).
+    """
+    if not counts:
+        return
+
+    await _lock_progress_rows(list(counts), db)
+    quiz_counts = values(
+        column("course_id", PG_UUID(as_uuid=True)),
+        column("student_id", PG_UUID(as_uuid=True)),
+        column("quizzes", Integer),
+        name="quiz_counts",
+    ).data([(course_id, student_id, n) for (course_id, student_id), n in counts.items()])
+
+    progress = StudentCourseProgress.__table__
+    await db.execute(
+        update(progress)
+        .where(
+            progress.c.course_id == quiz_counts.c.course_id,
+            progress.c.student_id == quiz_counts.c.student_id,
+        )
+        .values(
+            completed_quizzes=progress.c.completed_quizzes + quiz_counts.c.quizzes,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+async def refresh_course_totals(course_id: UUID, db: AsyncSession):
+    """
+    Content was added, edited or removed: recompute the course totals on every row
+    of the course in one UPDATE. Student numerators are unaffected.
+    """
+    await db.flush()
+    total_duration, total_assignments, total_quizzes = progress_totals(course_id)
+    await db.execute(
+        update(StudentCourseProgress)
+        .where(StudentCourseProgress.course_id == course_id)
+        .values(
+            total_duration=total_duration,
+            total_assignments=total_assignments,
+            total_quizzes=total_quizzes,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+async def refresh_course(course_id: UUID, db: AsyncSession) -> int:
+    """
+    Content was removed (possibly with its submissions): recompute every
+    existing row of the course from the raw tables.
+    """
+    await db.flush()
+    result = await db.execute(
+        select(StudentCourseProgress.student_id).where(StudentCourseProgress.course_id == course_id)
+    )
+    student_ids = sorted(result.scalars().all())
+
+    for chunk in _chunks(student_ids, PROGRESS_REFRESH_BATCH_SIZE):
+        await _materialize(course_id, chunk, db, overwrite=True)
+    return len(student_ids)
+
+
+# ---------------------------
+# Maintenance
+# ---------------------------
+async def rebuild_progress(db: AsyncSession) -> int:
+    """
+    Drop every row and recompute one per enrollment, committing per course.
+    """
+    await db.execute(delete(StudentCourseProgress))
+    await db.commit()
+
+    result = await db.execute(
+        select(course_students.c.course_id, course_students.c.student_id)
+        .order_by(course_students.c.course_id)
+    )
+    enrollments: dict[UUID, list[UUID]] = {}
+    for course_id, student_id in result.all():
+        enrollments.setdefault(course_id, []).append(student_id)
+
+    rebuilt = 0
+    for course_id, student_ids in enrollments.items():
+        for chunk in _chunks(sorted(student_ids), PROGRESS_REFRESH_BATCH_SIZE):
+            rebuilt += len(await _materialize(course_id, chunk, db, overwrite=True))
+        await db.commit()
+    return rebuilt
+
+
+async def check_progress_consistency(db: AsyncSession, course_id: UUID | None = None) -> list[dict]:
+    """
+    Diff stored rows against get_progress_counts_bulk, the computation
+    behind get_course_progress and _materialize, so the check exercises
+    the real implementation. One query for the stored rows plus one per
+    course and PROGRESS_REFRESH_BATCH_SIZE students.
+    Returns one entry per row whose progress differs.
+    """
+    query = select(StudentCourseProgress).order_by(
+        StudentCourseProgress.course_id, StudentCourseProgress.student_id
+    )
+    if course_id is not None:
+        query = query.where(StudentCourseProgress.course_id == course_id)
+    result = await db.execute(query)
+
+    stored_by_course: dict[UUID, dict[UUID, dict]] = {}
+    for row in result.scalars().all():
+        stored_by_course.setdefault(row.course_id, {})[row.student_id] = _row_progress(row)
+
+    mismatches = []
+    for row_course_id, stored_rows in stored_by_course.items():
+        for chunk in _chunks(list(stored_rows), PROGRESS_REFRESH_BATCH_SIZE):
+            counts = await get_progress_counts_bulk(row_course_id, chunk, db)
+            for student_id in chunk:
+                stored = stored_rows[student_id]
+                expected = progress_from_totals(*counts[student_id])
+                if stored != expected:
+                    mismatches.append({
+                        "course_id": row_course_id,
+                        "student_id": student_id,
+                        "stored": stored,
+                        "expected": expected,
+                    })
+    return mismatches
@@ -0,0 +1,243 @@
+import os
+import time
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy import select, func, Float, JSON
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizAnswer, QuizSubmission
+from app.helpers.quiz_cache import QuizDefinition
+from app.schemas.quiz_submission import (
+    QuizAnalyticsView,
+    QuizQuestionStat,
+    QuizOptionStat,
+    QuizScoreStats,
+    QuizScoreBucket,
+)
+
+QUIZ_ANALYTICS_BUCKETS = int(os.getenv("QUIZ_ANALYTICS_BUCKETS", 10))
+# Bounds staleness from submissions made through other processes
+QUIZ_ANALYTICS_TTL_SECONDS = float(os.getenv("QUIZ_ANALYTICS_TTL_SECONDS", 60))
+QUIZ_ANALYTICS_MAX_ENTRIES = int(os.getenv("QUIZ_ANALYTICS_MAX_ENTRIES", 256))
+
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+# ---------------------------
+# Aggregate query
+# ---------------------------
+def _analytics_query(quiz_id: UUID, max_score: int, buckets: int):
+    """
+    One SELECT whose columns are scalar subqueries:
+    submission count, (question, option, count) triples, (question,
+    answering submissions) pairs, score statistics and the score histogram
+    as (bucket, count) pairs.
+    """
+    answer_counts = (
+        select(
+            QuizAnswer.question_id,
+            QuizAnswer.selected_option_id,
+            func.count().label("chosen"),
+        )
+        .join(QuizSubmission, QuizSubmission.id == QuizAnswer.submission_id)
+        .where(QuizSubmission.quiz_id == quiz_id)
+        .group_by(QuizAnswer.question_id, QuizAnswer.selected_option_id)
+        .subquery("answer_counts")
+    )
+
+    # Distinct, so repeated answer rows for a question count one submission once
+    answered_counts = (
+        select(
+            QuizAnswer.question_id,
+            func.count(QuizAnswer.submission_id.distinct()).label("answered"),
+        )
+        .join(QuizSubmission, QuizSubmission.id == QuizAnswer.submission_id)
+        .where(
+            QuizSubmission.quiz_id == quiz_id,
+            QuizAnswer.selected_option_id.isnot(None),
+        )
+        .group_by(QuizAnswer.question_id)
+        .subquery("answered_counts")
+    )
+
+    scores = (
+        select(QuizSubmission.total_score.label("score"))
+        .where(
+            QuizSubmission.quiz_id == quiz_id,
+            QuizSubmission.total_score.isnot(None),
+        )
+        .subquery("scores")
+    )
+
+    # width_bucket puts score == max_score into bucket n + 1; fold it into n
+    bucketed = select(
+        func.least(
+            func.width_bucket(scores.c.score, 0, max(max_score, 1), buckets),
+            buckets,
+        ).label("bucket")
+    ).subquery("bucketed")
+    histogram = (
+        select(bucketed.c.bucket, func.count().label("n"))
+        .group_by(bucketed.c.bucket)
+        .subquery("histogram")
+    )
+
+    return select(
+        select(func.count())
+        .select_from(QuizSubmission)
+        .where(QuizSubmission.quiz_id == quiz_id)
+        .scalar_subquery()
+        .label("submissions"),
+        select(
+            func.json_agg(
+                func.json_build_array(
+                    answer_counts.c.question_id,
+                    answer_counts.c.selected_option_id,
+                    answer_counts.c.chosen,
+                ),
+                type_=JSON,
+            )
+        )
+        .scalar_subquery()
+        .label("answer_counts"),
+        select(
+            func.json_agg(
+                func.json_build_array(answered_counts.c.question_id, answered_counts.c.answered),
+                type_=JSON,
+            )
+        )
+        .scalar_subquery()
+        .label("answered_counts"),
+        select(
+            func.json_build_object(
+                "mean", func.avg(scores.c.score),
+                "min", func.min(scores.c.score),
+                "max", func.max(scores.c.score),
+                "percentiles", func.percentile_cont(
+                    array(PERCENTILES, type_=Float)
+                ).within_group(scores.c.score),
+                type_=JSON,
+            )
+        )
+        .scalar_subquery()
+        .label("scores"),
+        select(
+            func.json_agg(
+                func.json_build_array(histogram.c.bucket, histogram.c.n),
+                type_=JSON,
+            )
+        )
+        .scalar_subquery()
+        .label("histogram"),
+    )
+
+
+async def compute_quiz_analytics(quiz: QuizDefinition, db: AsyncSession) -> QuizAnalyticsView:
+    max_score = sum(q.marks for q in quiz.questions)
+    buckets = QUIZ_ANALYTICS_BUCKETS
+
+    result = await db.execute(_analytics_query(quiz.id, max_score, buckets))
+    row = result.one()
+    submissions = row.submissions or 0
+
+    # question_id -> {option_id or None: count}
+    chosen: dict[UUID, dict] = defaultdict(dict)
+    for question_id, option_id, count in row.answer_counts or []:
+        chosen[UUID(question_id)][UUID(option_id) if option_id else None] = count
+    answered_by_question = {
+        UUID(question_id): count for question_id, count in row.answered_counts or []
+    }
+
+    questions = []
+    for question in quiz.questions:
+        counts = chosen.get(question.id, {})
+        options = [
+            QuizOptionStat(
+                id=opt.id,
+                option_text=opt.option_text,
+                is_correct=opt.is_correct,
+                chosen=counts.get(opt.id, 0),
+            )
+            for opt in question.options
+        ]
+        answered = answered_by_question.get(question.id, 0)
+        correct = sum(opt.chosen for opt in options if opt.is_correct)
+        questions.append(QuizQuestionStat(
+            id=question.id,
+            question_text=question.question_text,
+            marks=question.marks,
+            answered=answered,
+            unanswered=submissions - answered,
+            correct=correct,
+            correct_rate=round(correct / submissions, 4) if submissions else 0.0,
+            options=options,
+        ))
+
+    stats = row.scores or {}
+    percentiles = stats.get("percentiles") or [None] * len(PERCENTILES)
+    mean = stats.get("mean")
+
+    width = max(max_score, 1) / buckets
+    bucket_counts = {bucket: count for bucket, count in row.histogram or []}
+
+    return QuizAnalyticsView(
+        quiz_id=quiz.id,
+        quiz_title=quiz.title,
+        version=quiz.version,
+        submissions=submissions,
+        max_score=max_score,
+        scores=QuizScoreStats(
+            mean=round(float(mean), 2) if mean is not None else None,
+            min=stats.get("min"),
+            max=stats.get("max"),
+            p25=percentiles[0],
+            median=percentiles[1],
+            p75=percentiles[2],
+            p90=percentiles[3],
+        ),
+        histogram=[
+            QuizScoreBucket(
+                lower=round((bucket - 1) * width, 2),
+                upper=round(bucket * width, 2),
+                count=bucket_counts.get(bucket, 0),
+            )
+            for bucket in range(1, buckets + 1)
+        ],
+        questions=questions,
+    )
+
+
+# ---------------------------
+# Per-quiz cache
+# ---------------------------
+class QuizAnalyticsCache:
+    """
+    Analytics per quiz, keyed by quiz version. Invalidated in-process on
+    submissions and regrades; the TTL bounds staleness from other processes.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[UUID, tuple[int, float, QuizAnalyticsView]] = {}
+
+    async def get(self, quiz: QuizDefinition, db: AsyncSession) -> QuizAnalyticsView:
+        cached = self._entries.get(quiz.id)
+        if cached is not None:
+            version, expires_at, view = cached
+            if version == quiz.version and expires_at > time.monotonic():
+                return view
+
+        view = await compute_quiz_analytics(quiz, db)
+        if quiz.id not in self._entries and len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[quiz.id] = (quiz.version, time.monotonic() + self.ttl, view)
+        return view
+
+    def invalidate(self, quiz_id: UUID) -> None:
+        self._entries.pop(quiz_id, None)
+
+
+quiz_analytics_cache = QuizAnalyticsCache(QUIZ_ANALYTICS_TTL_SECONDS, QUIZ_ANALYTICS_MAX_ENTRIES)
@@ -1,50 +1,83 @@
-from typing import  List,Dict
+import uuid
+from typing import  List,Dict,Optional
 from uuid import UUID
 
-from app.schemas.quiz_submission import QuizAnswerSubmit
-from app.models import Quiz, QuizAnswer,QuizQuestion
+from app.schemas.quiz_submission import QuizAnswerSubmit, QuizQuestionResult, QuizOptionResult
+from app.helpers.quiz_cache import QuizDefinition
 
 
 def evaluate_quiz_answers(
-    quiz: Quiz,
+    quiz: QuizDefinition,
     submission_id: UUID,
     answers_payload:List[QuizAnswerSubmit]
 ):
     """
-    Evaluates quiz answers and returns:
+    Evaluates quiz answers against the compiled answer key and returns:
     - total_score
-    - list of QuizAnswer ORM objects
+    - list of quiz_answers row dicts for one multi-row INSERT
     """
 
+    key = quiz.answer_key
     total_score = 0
-    answer_rows: List[QuizAnswer] = []
-
-    # Map questions for fast lookup
-    question_map:Dict[UUID,QuizQuestion] = {q.id: q for q in quiz.questions}
+    answer_rows: List[dict] = []
 
     for ans in answers_payload:
-        question = question_map.get(ans.question_id)
-        if not question:
+        if ans.question_id not in key.question_index:
             continue
 
-        selected_option = None
-        is_correct = False
-    
-        for opt in question.options:
-            if opt.id == ans.selected_option_id:
-                selected_option = opt
-                is_correct = opt.is_correct
-                break
-
-        if is_correct:
-            total_score += question.marks
-
-        answer_rows.append(
-            QuizAnswer(
-                submission_id=submission_id,
-                question_id=question.id,
-                selected_option_id=selected_option.id if selected_option else None,
+        # Options of other questions count as no answer
+        belongs, points = key.points_for(ans.question_id, ans.selected_option_id)
+        total_score += points
+
+        answer_rows.append({
+            "id": uuid.uuid4(),
+            "submission_id": submission_id,
+            "question_id": ans.question_id,
+            "selected_option_id": ans.selected_option_id if belongs else None,
+        })
+
+    return total_score, answer_rows
+
+
+def build_question_results(
+    quiz: QuizDefinition,
+    selected_by_question: Dict[UUID, Optional[UUID]],
+) -> List[QuizQuestionResult]:
+    """
+    Per-question result view (selected vs correct option) from the cached
+    definition and a {question_id: selected_option_id} map of the answers.
+    """
+    results: List[QuizQuestionResult] = []
+
+    for question in quiz.questions:
+        correct_option = question.correct_option
+        selected_option = quiz.options_by_id.get(selected_by_question.get(question.id))
+
+        results.append(
+            QuizQuestionResult(
+                id=question.id,
+                question_text=question.question_text,
+                marks=question.marks,
+                selected_option=(
+                    QuizOptionResult(
+                        id=selected_option.id,
+                        option_text=selected_option.option_text,
+                        is_correct=selected_option.is_correct,
+                    )
+                    if selected_option
+                    else None
+                ),
+                correct_option=QuizOptionResult(
+                    id=correct_option.id,
+                    option_text=correct_option.option_text,
+                    is_correct=True,
+                ),
+                is_correct=(
+                    selected_option.id == correct_option.id
+                    if selected_option
+                    else False
+                ),
             )
         )
 
-    return total_score, answer_rows
+    return results
@@ -0,0 +1,263 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import List
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert, update, delete, values, column, func, or_, Integer, Text, Boolean
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizQuestion, QuizOption, QuizAnswer, QuizSubmission
+from app.schemas.quiz import QuizQuestionCreate, QuizQuestionUpdate
+
+
+def validate_quiz_questions(questions: List[QuizQuestionCreate]) -> None:
+    """
+    Check the whole question list before anything is written.
+    """
+    for q in questions:
+        if not any(opt.is_correct for opt in q.options):
+            raise HTTPException(
+                400,
+                f"Question '{q.question_text}' must have at least one correct option"
+            )
+
+
+def build_question_rows(quiz_id: UUID, questions: List[QuizQuestionCreate]) -> tuple[list[dict], list[dict]]:
+    """
+    quiz_questions and quiz_options rows with client-side ids, so options
+    can reference their question without a flush per question.
+    """
+    question_rows = []
+    option_rows = []
+
+    for q in questions:
+        question_id = uuid.uuid4()
+        question_rows.append({
+            "id": question_id,
+            "quiz_id": quiz_id,
+            "question_text": q.question_text,
+            "marks": q.marks,
+        })
+        option_rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "question_id": question_id,
+                "option_text": opt.option_text,
+                "is_correct": opt.is_correct,
+            }
+            for opt in q.options
+        )
+
+    return question_rows, option_rows
+
+
+async def insert_quiz_questions(quiz_id: UUID, questions: List[QuizQuestionCreate], db: AsyncSession) -> None:
+    """
+    Write all questions and options of a quiz with two multi-row INSERTs.
+    The quiz row must already be flushed. Does not commit.
+    """
+    question_rows, option_rows = build_question_rows(quiz_id, questions)
+
+    if question_rows:
+        await db.execute(insert(QuizQuestion), question_rows)
+    if option_rows:
+        await db.execute(insert(QuizOption), option_rows)
+
+
+# ---------------------------
+# Structural diff for quiz updates
+# ---------------------------
+@dataclass
+class QuizQuestionDiff:
+    """
+    Row-level changes that turn the stored questions/options of a quiz
+    into an update payload. grading_changed is set when marks, correct
+    options or the set of questions/options change.
+    """
+    question_inserts: list[dict] = field(default_factory=list)
+    question_updates: list[tuple] = field(default_factory=list)   # (id, question_text, marks)
+    question_deletes: list[UUID] = field(default_factory=list)
+    option_inserts: list[dict] = field(default_factory=list)
+    option_updates: list[tuple] = field(default_factory=list)     # (id, option_text, is_correct)
+    option_deletes: list[UUID] = field(default_factory=list)
+    grading_changed: bool = False
+
+    def summary(self) -> dict:
+        return {
+            "questions_added": len(self.question_inserts),
+            "questions_updated": len(self.question_updates),
+            "questions_removed": len(self.question_deletes),
+            "options_added": len(self.option_inserts),
+            "options_updated": len(self.option_updates),
+            "options_removed": len(self.option_deletes),
+        }
+
+
+async def load_quiz_structure(quiz_id: UUID, db: AsyncSession) -> dict:
+    """
+    {question_id: (question_text, marks, {option_id: (option_text, is_correct)})}
+    """
+    result = await db.execute(
+        select(QuizQuestion.id, QuizQuestion.question_text, QuizQuestion.marks)
+        .where(QuizQuestion.quiz_id == quiz_id)
+    )
+    structure = {row[0]: (row[1], row[2], {}) for row in result.all()}
+
+    result = await db.execute(
+        select(QuizOption.question_id, QuizOption.id, QuizOption.option_text, QuizOption.is_correct)
+        .join(QuizQuestion, QuizQuestion.id == QuizOption.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id)
+    )
+    for question_id, option_id, option_text, is_correct in result.all():
+        structure[question_id][2][option_id] = (option_text, bool(is_correct))
+
+    return structure
+
+
+def diff_quiz_questions(quiz_id: UUID, existing: dict, questions: List[QuizQuestionUpdate]) -> QuizQuestionDiff:
+    """
+    Match the payload against load_quiz_structure() output by id.
+    Pure; raises 400 for ids that are unknown or repeated.
+    """
+    diff = QuizQuestionDiff()
+    seen_questions = set()
+
+    for q in questions:
+        if q.id is None:
+            question_rows, option_rows = build_question_rows(quiz_id, [q])
+            diff.question_inserts.extend(question_rows)
+            diff.option_inserts.extend(option_rows)
+            diff.grading_changed = True
+            continue
+
+        if q.id not in existing:
+            raise HTTPException(400, f"Question {q.id} does not belong to this quiz")
+        if q.id in seen_questions:
+            raise HTTPException(400, f"Question {q.id} appears more than once")
+        seen_questions.add(q.id)
+
+        question_text, marks, options = existing[q.id]
+        if (q.question_text, q.marks) != (question_text, marks):
+            diff.question_updates.append((q.id, q.question_text, q.marks))
+            diff.grading_changed |= q.marks != marks
+
+        seen_options = set()
+        for opt in q.options:
+            if opt.id is None:
+                diff.option_inserts.append({
+                    "id": uuid.uuid4(),
+                    "question_id": q.id,
+                    "option_text": opt.option_text,
+                    "is_correct": opt.is_correct,
+                })
+                diff.grading_changed |= opt.is_correct
+                continue
+
+            if opt.id not in options:
+                raise HTTPException(400, f"Option {opt.id} does not belong to question {q.id}")
+            if opt.id in seen_options:
+                raise HTTPException(400, f"Option {opt.id} appears more than once")
+            seen_options.add(opt.id)
+
+            option_text, is_correct = options[opt.id]
+            if (opt.option_text, opt.is_correct) != (option_text, is_correct):
+                diff.option_updates.append((opt.id, opt.option_text, opt.is_correct))
+                diff.grading_changed |= opt.is_correct != is_correct
+
+        removed_options = [option_id for option_id in options if option_id not in seen_options]
+        diff.option_deletes.extend(removed_options)
+        diff.grading_changed |= bool(removed_options)
+
+    for question_id, (_, _, options) in existing.items():
+        if question_id not in seen_questions:
+            diff.question_deletes.append(question_id)
+            diff.option_deletes.extend(options)
+            diff.grading_changed = True
+
+    return diff
+
+
+async def count_lost_answers(diff: QuizQuestionDiff, db: AsyncSession) -> int:
+    """
+    Stored answers that applying the diff would delete (removed question)
+    or clear (removed option).
+    """
+    if not diff.question_deletes and not diff.option_deletes:
+        return 0
+
+    conditions = []
+    if diff.question_deletes:
+        conditions.append(QuizAnswer.question_id.in_(diff.question_deletes))
+    if diff.option_deletes:
+        conditions.append(QuizAnswer.selected_option_id.in_(diff.option_deletes))
+
+    return await db.scalar(
+        select(func.count()).select_from(QuizAnswer).where(or_(*conditions))
+    )
+
+
+async def apply_quiz_question_diff(diff: QuizQuestionDiff, db: AsyncSession) -> None:
+    """
+    Apply a diff with set-based statements: answers pointing at removed
+    rows are detached first, updates go through UPDATE ... FROM (VALUES ...).
+    Does not commit.
+    """
+    if diff.question_deletes:
+        await db.execute(
+            delete(QuizAnswer).where(QuizAnswer.question_id.in_(diff.question_deletes))
+        )
+    if diff.option_deletes:
+        await db.execute(
+            update(QuizAnswer)
+            .where(QuizAnswer.selected_option_id.in_(diff.option_deletes))
+            .values(selected_option_id=None)
+        )
+        await db.execute(
+            delete(QuizOption).where(QuizOption.id.in_(diff.option_deletes))
+        )
+    if diff.question_deletes:
+        await db.execute(
+            delete(QuizQuestion).where(QuizQuestion.id.in_(diff.question_deletes))
+        )
+
+    if diff.question_updates:
+        question_values = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("question_text", Text),
+            column("marks", Integer),
+            name="question_values",
+        ).data(diff.question_updates)
+
+        quiz_questions = QuizQuestion.__table__
+        await db.execute(
+            update(quiz_questions)
+            .where(quiz_questions.c.id == question_values.c.id)
+            .values(question_text=question_values.c.question_text, marks=question_values.c.marks)
+        )
+    if diff.option_updates:
+        option_values = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("option_text", Text),
+            column("is_correct", Boolean),
+            name="option_values",
+        ).data(diff.option_updates)
+
+        quiz_options = QuizOption.__table__
+        await db.execute(
+            update(quiz_options)
+            .where(quiz_options.c.id == option_values.c.id)
+            .values(option_text=option_values.c.option_text, is_correct=option_values.c.is_correct)
+        )
+
+    if diff.question_inserts:
+        await db.execute(insert(QuizQuestion), diff.question_inserts)
+    if diff.option_inserts:
+        await db.execute(insert(QuizOption), diff.option_inserts)
+
+
+async def quiz_has_submissions(quiz_id: UUID, db: AsyncSession) -> bool:
+    return bool(await db.scalar(
+        select(select(QuizSubmission.id).where(QuizSubmission.quiz_id == quiz_id).exists())
+    ))
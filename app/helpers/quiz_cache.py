@@ -0,0 +1,252 @@
+import os
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Quiz, QuizQuestion
+from app.schemas.quiz import QuizDetailView
+from app.helpers.quiz_grader import CompiledAnswerKey, compile_answer_key
+
+QUIZ_CACHE_MAX_ENTRIES = int(os.getenv("QUIZ_CACHE_MAX_ENTRIES", 512))
+
+
+@dataclass(frozen=True, slots=True)
+class QuizOptionDef:
+    id: UUID
+    option_text: str
+    is_correct: bool
+
+
+@dataclass(frozen=True, slots=True)
+class QuizQuestionDef:
+    id: UUID
+    question_text: str
+    marks: int
+    options: tuple[QuizOptionDef, ...]
+    correct_option: Optional[QuizOptionDef]
+
+
+@dataclass(frozen=True, slots=True)
+class QuizDefinition:
+    """
+    Immutable snapshot of a quiz at one version: metadata, questions,
+    the pre-serialized student/teacher JSON bodies and the grading key.
+    """
+    id: UUID
+    version: int
+    course_id: UUID
+    instructor_id: UUID
+    title: str
+    total_marks: int
+    questions: tuple[QuizQuestionDef, ...]
+    # Pre-serialized QuizDetailView bodies
+    student_payload: bytes
+    teacher_payload: bytes
+    # Grading key in array form (see quiz_grader)
+    answer_key: CompiledAnswerKey
+    # option_id -> option (any question)
+    options_by_id: dict
+
+    @classmethod
+    def from_quiz(cls, quiz: Quiz) -> "QuizDefinition":
+        questions = []
+        for q in quiz.questions:
+            options = tuple(
+                QuizOptionDef(id=opt.id, option_text=opt.option_text, is_correct=bool(opt.is_correct))
+                for opt in q.options
+            )
+            questions.append(QuizQuestionDef(
+                id=q.id,
+                question_text=q.question_text,
+                marks=q.marks,
+                options=options,
+                correct_option=next((opt for opt in options if opt.is_correct), None),
+            ))
+
+        week = (
+            {"week_number": quiz.week.week_number, "title": quiz.week.title}
+            if quiz.week else None
+        )
+
+        def detail_view(include_answers: bool) -> QuizDetailView:
+            return QuizDetailView(
+                id=quiz.id,
+                title=quiz.title,
+                description=quiz.description,
+                total_marks=quiz.total_marks,
+                time_limit_minutes=quiz.time_limit_minutes,
+                week=week,
+                questions=[
+                    {
+                        "id": q.id,
+                        "question_text": q.question_text,
+                        "marks": q.marks,
+                        "options": [
+                            {
+                                "id": opt.id,
+                                "option_text": opt.option_text,
+                                **({"is_correct": opt.is_correct} if include_answers else {}),
+                            }
+                            for opt in q.options
+                        ],
+                    }
+                    for q in questions
+                ],
+            )
+
+        return cls(
+            id=quiz.id,
+            version=quiz.version,
+            course_id=quiz.course_id,
+            instructor_id=quiz.instructor_id,
+            title=quiz.title,
+            total_marks=quiz.total_marks,
+            questions=tuple(questions),
+            student_payload=detail_view(False).model_dump_json(exclude_none=True).encode(),
+            teacher_payload=detail_view(True).model_dump_json().encode(),
+            answer_key=compile_answer_key(questions),
+            options_by_id={opt.id: opt for q in questions for opt in q.options},
+        )
+
+
+class QuizDefinitionCache:
+    """
+    In-process LRU of QuizDefinition keyed by quiz id.
+    Every read checks the quiz's current version with a primary-key lookup;
+    a mismatch (the quiz was edited, possibly by another process) reloads
+    the graph. Concurrent misses for the same version share one load.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[UUID, QuizDefinition] = OrderedDict()
+        self._loading: dict[tuple[UUID, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, quiz_id: UUID, db: AsyncSession) -> Optional[QuizDefinition]:
+        version = await db.scalar(select(Quiz.version).where(Quiz.id == quiz_id))
+        if version is None:
+            self.invalidate(quiz_id)
+            return None
+
+        cached = self._entries.get(quiz_id)
+        if cached is not None and cached.version == version:
+            self._entries.move_to_end(quiz_id)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        key = (quiz_id, version)
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            definition = await self._load(quiz_id, db)
+            if definition is not None:
+                self._store(definition)
+            future.set_result(definition)
+            return definition
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise; avoid "exception never retrieved" when there are none
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+    async def _load(self, quiz_id: UUID, db: AsyncSession) -> Optional[QuizDefinition]:
+        result = await db.execute(
+            select(Quiz)
+            .options(
+                selectinload(Quiz.week),
+                selectinload(Quiz.questions)
+                .selectinload(QuizQuestion.options),
+            )
+            .where(Quiz.id == quiz_id)
+        )
+        quiz = result.scalar_one_or_none()
+        return QuizDefinition.from_quiz(quiz) if quiz else None
+
+    def _store(self, definition: QuizDefinition) -> None:
+        current = self._entries.get(definition.id)
+        # Never replace a newer version with an older concurrent load
+        if current is not None and current.version > definition.version:
+            return
+        self._entries[definition.id] = definition
+        self._entries.move_to_end(definition.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, quiz_id: UUID) -> None:
+        self._entries.pop(quiz_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+quiz_cache = QuizDefinitionCache(QUIZ_CACHE_MAX_ENTRIES)
+
+
+async def get_quiz_definition(quiz_id: UUID, db: AsyncSession) -> Optional[QuizDefinition]:
+    return await quiz_cache.get(quiz_id, db)
+
+
+# ---------------------------
+# Version bumps
+# ---------------------------
+def bump_quiz_version(quiz: Quiz) -> None:
+    """
+    Mark an edited quiz so every process reloads its definition.
+    """
+    quiz.version = (quiz.version or 1) + 1
+    quiz_cache.invalidate(quiz.id)
+
+
+async def bump_quiz_version_by_id(quiz_id: UUID, db: AsyncSession) -> int:
+    """
+    Same as bump_quiz_version for a quiz held only as a definition, e.g. a
+    regrade: views cached in other processes see the new version and
+    re-render. Returns the new version. Does not commit.
+    """
+    version = await db.scalar(
+        update(Quiz)
+        .where(Quiz.id == quiz_id)
+        .values(version=Quiz.version + 1)
+        .returning(Quiz.version)
+    )
+    quiz_cache.invalidate(quiz_id)
+    return version
+
+
+async def bump_week_quiz_versions(week_ids: list[UUID], db: AsyncSession) -> None:
+    """
+    Week number/title are part of the cached payload; bump quizzes of these weeks.
+    """
+    if not week_ids:
+        return
+    result = await db.execute(
+        update(Quiz)
+        .where(Quiz.week_id.in_(week_ids))
+        .values(version=Quiz.version + 1)
+        .returning(Quiz.id)
+    )
+    for quiz_id in result.scalars().all():
+        quiz_cache.invalidate(quiz_id)
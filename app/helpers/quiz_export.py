@@ -0,0 +1,135 @@
+import os
+import csv
+import io
+import json
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.helpers.sql_instrumentation import timed_partitions
+from app.models import QuizSubmission, QuizAnswer, User
+from app.helpers.quiz_cache import QuizDefinition
+
+QUIZ_EXPORT_BATCH_SIZE = int(os.getenv("QUIZ_EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _export_query(quiz_id: UUID):
+    """
+    One row per (submission, answer), ordered so a submission's answers are
+    contiguous. Submissions without answers still yield one row.
+    """
+    return (
+        select(
+            QuizSubmission.id,
+            QuizSubmission.student_id,
+            User.roll_number,
+            QuizSubmission.submitted_at,
+            QuizSubmission.total_score,
+            QuizAnswer.question_id,
+            QuizAnswer.selected_option_id,
+        )
+        .join(User, User.id == QuizSubmission.student_id)
+        .outerjoin(QuizAnswer, QuizAnswer.submission_id == QuizSubmission.id)
+        .where(QuizSubmission.quiz_id == quiz_id)
+        .order_by(QuizSubmission.submitted_at, QuizSubmission.id)
+        .execution_options(yield_per=QUIZ_EXPORT_BATCH_SIZE)
+    )
+
+
+async def _iter_submissions(quiz: QuizDefinition) -> AsyncIterator[list[tuple]]:
+    """
+    Stream submissions through a server-side cursor, grouping answer rows.
+    Yields batches of (submission row, {question_id: selected_option_id}).
+    Runs in its own session: the request's session is closed before the
+    response body is streamed.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_export_query(quiz.id))
+
+        current = None
+        selected: dict = {}
+        batch = []
+        async for partition in timed_partitions(result):
+            for row in partition:
+                if current is None or row.id != current.id:
+                    if current is not None:
+                        batch.append((current, selected))
+                    current, selected = row, {}
+                if row.question_id is not None:
+                    selected[row.question_id] = row.selected_option_id
+            if batch:
+                yield batch
+                batch = []
+
+        if current is not None:
+            yield [(current, selected)]
+
+
+def _answer_cells(quiz: QuizDefinition, selected: dict) -> list:
+    cells = []
+    for question in quiz.questions:
+        option = quiz.options_by_id.get(selected.get(question.id))
+        cells.append(option.option_text if option else "")
+        cells.append(1 if option and option.is_correct else 0)
+    return cells
+
+
+async def stream_quiz_export_csv(quiz: QuizDefinition) -> AsyncIterator[bytes]:
+    header = ["submission_id", "student_id", "roll_number", "submitted_at", "total_score"]
+    for index in range(1, len(quiz.questions) + 1):
+        header += [f"q{index}_answer", f"q{index}_correct"]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+
+    async for batch in _iter_submissions(quiz):
+        buffer.seek(0)
+        buffer.truncate()
+        for row, selected in batch:
+            writer.writerow([
+                row.id,
+                row.student_id,
+                row.roll_number or "",
+                row.submitted_at.isoformat() if row.submitted_at else "",
+                row.total_score if row.total_score is not None else "",
+                *_answer_cells(quiz, selected),
+            ])
+        yield buffer.getvalue().encode()
+
+
+async def stream_quiz_export_ndjson(quiz: QuizDefinition) -> AsyncIterator[bytes]:
+    async for batch in _iter_submissions(quiz):
+        lines = []
+        for row, selected in batch:
+            answers = []
+            for question in quiz.questions:
+                option = quiz.options_by_id.get(selected.get(question.id))
+                answers.append({
+                    "question_id": str(question.id),
+                    "selected_option_id": str(option.id) if option else None,
+                    "is_correct": bool(option and option.is_correct),
+                })
+            lines.append(json.dumps({
+                "submission_id": str(row.id),
+                "student_id": str(row.student_id),
+                "roll_number": row.roll_number,
+                "submitted_at": row.submitted_at.isoformat() if row.submitted_at else None,
+                "total_score": row.total_score,
+                "answers": answers,
+            }))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+QUIZ_EXPORTERS = {
+    "csv": stream_quiz_export_csv,
+    "ndjson": stream_quiz_export_ndjson,
+}
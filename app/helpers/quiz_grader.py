@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, update, values, column, Integer
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizAnswer, QuizSubmission
+
+if TYPE_CHECKING:
+    from app.helpers.quiz_cache import QuizQuestionDef
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAnswerKey:
+    """
+    Answer key of one quiz version in array form.
+    Options and questions are numbered densely; for option i,
+    option_question[i] is its question index and option_points[i] the
+    marks it earns (0 for a wrong option).
+    """
+    question_index: dict        # question_id -> question index
+    option_index: dict          # option_id -> option index
+    option_question: np.ndarray  # int32, one entry per option
+    option_points: np.ndarray    # int32, one entry per option
+
+    def points_for(self, question_id: UUID, option_id: UUID | None) -> tuple[bool, int]:
+        """
+        (option belongs to the question, marks earned) for a single answer.
+        """
+        option = self.option_index.get(option_id)
+        if option is None or self.option_question[option] != self.question_index[question_id]:
+            return False, 0
+        return True, int(self.option_points[option])
+
+
+def compile_answer_key(questions: Iterable["QuizQuestionDef"]) -> CompiledAnswerKey:
+    question_index = {}
+    option_index = {}
+    option_question = []
+    option_points = []
+
+    for q_idx, question in enumerate(questions):
+        question_index[question.id] = q_idx
+        for option in question.options:
+            option_index[option.id] = len(option_question)
+            option_question.append(q_idx)
+            option_points.append(question.marks if option.is_correct else 0)
+
+    return CompiledAnswerKey(
+        question_index=question_index,
+        option_index=option_index,
+        option_question=np.asarray(option_question, dtype=np.int32),
+        option_points=np.asarray(option_points, dtype=np.int32),
+    )
+
+
+def grade_answer_arrays(
+    key: CompiledAnswerKey,
+    submission_idx: np.ndarray,
+    question_idx: np.ndarray,
+    option_idx: np.ndarray,
+    submission_count: int,
+) -> np.ndarray:
+    """
+    Vectorized scoring of many stored answers at once.
+    One row per answer; -1 marks an unknown question or option. Returns the
+    total score per submission index (same rules as evaluate_quiz_answers).
+    """
+    if not len(option_idx) or not len(key.option_points):
+        return np.zeros(submission_count, dtype=np.int64)
+
+    safe_option = np.where(option_idx >= 0, option_idx, 0)
+    valid = (
+        (option_idx >= 0)
+        & (question_idx >= 0)
+        & (key.option_question[safe_option] == question_idx)
+    )
+    points = np.where(valid, key.option_points[safe_option], 0)
+    return np.bincount(submission_idx, weights=points, minlength=submission_count).astype(np.int64)
+
+
+async def regrade_quiz_submissions(key: CompiledAnswerKey, quiz_id: UUID, db: AsyncSession) -> dict:
+    """
+    Re-score every submission of a quiz against the current key in one
+    vectorized pass and write the changed totals with a single
+    UPDATE ... FROM (VALUES ...). Does not commit.
+    """
+    result = await db.execute(
+        select(QuizSubmission.id, QuizSubmission.total_score)
+        .where(QuizSubmission.quiz_id == quiz_id)
+    )
+    submissions = result.all()
+    if not submissions:
+        return {"submissions": 0, "changed": 0, "changed_submission_ids": []}
+
+    submission_position = {row.id: position for position, row in enumerate(submissions)}
+
+    result = await db.execute(
+        select(QuizAnswer.submission_id, QuizAnswer.question_id, QuizAnswer.selected_option_id)
+        .join(QuizSubmission, QuizSubmission.id == QuizAnswer.submission_id)
+        .where(QuizSubmission.quiz_id == quiz_id)
+    )
+    answers = result.all()
+
+    question_lookup = key.question_index.get
+    option_lookup = key.option_index.get
+    submission_idx = np.fromiter((submission_position[a[0]] for a in answers), dtype=np.int64, count=len(answers))
+    question_idx = np.fromiter((question_lookup(a[1], -1) for a in answers), dtype=np.int64, count=len(answers))
+    option_idx = np.fromiter((option_lookup(a[2], -1) for a in answers), dtype=np.int64, count=len(answers))
+
+    scores = grade_answer_arrays(key, submission_idx, question_idx, option_idx, len(submissions))
+
+    changed = [
+        (row.id, int(score))
+        for row, score in zip(submissions, scores)
+        if row.total_score != score
+    ]
+
+    if changed:
+        score_values = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("score", Integer),
+            name="score_values",
+        ).data(changed)
+
+        quiz_submissions = QuizSubmission.__table__
+        await db.execute(
+            update(quiz_submissions)
+            .where(quiz_submissions.c.id == score_values.c.id)
+            .values(total_score=score_values.c.score)
+        )
+
+    return {
+        "submissions": len(submissions),
+        "changed": len(changed),
+        "changed_submission_ids": [submission_id for submission_id, _ in changed],
+    }
@@ -0,0 +1,579 @@
+import os
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import QuizSubmission, QuizAnswer, QuizSubmissionStaging, User
+from app.helpers.quiz_cache import QuizDefinition, get_quiz_definition
+from app.helpers.certificate_assigner import check_certificate_task
+from app.helpers.progress_tracker import record_quiz_submissions_bulk
+from app.helpers.task_queue import emit_after_commit
+from app.helpers.idempotency import IDEMPOTENCY_KEY_TTL_HOURS, idempotency_row, store_idempotent_responses
+from app.helpers.quiz_analytics import quiz_analytics_cache
+from app.helpers.quiz_results import build_result_snapshot, store_result_snapshots
+
+logger = logging.getLogger(__name__)
+
+QUIZ_BURST_MODE = os.getenv("QUIZ_BURST_MODE", "false").lower() == "true"
+QUIZ_INGEST_BATCH_SIZE = int(os.getenv("QUIZ_INGEST_BATCH_SIZE", 500))
+QUIZ_INGEST_FLUSH_SECONDS = float(os.getenv("QUIZ_INGEST_FLUSH_SECONDS", 0.2))
+# Failed rows are retried after 1, 2, 4, ... seconds, capped here
+QUIZ_INGEST_RETRY_MAX_SECONDS = float(os.getenv("QUIZ_INGEST_RETRY_MAX_SECONDS", 300))
+# Written rows keep rejecting resubmissions until the quiz_submissions row
+# is visible to every process
+QUIZ_STAGING_RETENTION_SECONDS = float(os.getenv("QUIZ_STAGING_RETENTION_SECONDS", 600))
+QUIZ_STAGING_CLEANUP_SECONDS = 60
+
+REJECTED_DETAIL = (
+    "Your submission could not be recorded: another submission for this quiz "
+    "was saved first"
+)
+
+
+# ---------------------------
+# Request side
+# ---------------------------
+async def lock_quiz_submission(quiz_id: UUID, student_id: UUID, db: AsyncSession) -> None:
+    """
+    Transaction-level advisory lock on one (quiz, student). Staging and the
+    synchronous write both take it before checking the other's table, so
+    a submission is only accepted one way.
+    """
+    await db.execute(
+        select(func.pg_advisory_xact_lock(func.hashtext(f"quiz-submission:{quiz_id}:{student_id}")))
+    )
+
+
+async def stage_quiz_submission(
+    db: AsyncSession,
+    quiz: QuizDefinition,
+    submission_id: UUID,
+    student_id: UUID,
+    total_score: int,
+    answer_rows: list[dict],
+    idempotency: Optional[dict] = None,
+) -> bool:
+    """
+    Accept a graded submission with one INSERT into quiz_submission_staging.
+    idempotency is {"key", "scope", "request_hash", "response_body"}.
+    False if the student already has a staged submission for the quiz, from
+    this or any other process. Does not commit; the caller commits before
+    answering 202 and then calls quiz_ingestor.notify().
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        pg_insert(QuizSubmissionStaging)
+        .values(
+            id=submission_id,
+            quiz_id=quiz.id,
+            course_id=quiz.course_id,
+            student_id=student_id,
+            submitted_at=now,
+            total_score=total_score,
+            answers=jsonable_encoder([
+                {
+                    "id": row["id"],
+                    "question_id": row["question_id"],
+                    "selected_option_id": row["selected_option_id"],
+                }
+                for row in answer_rows
+            ]),
+            idempotency_key=idempotency["key"] if idempotency else None,
+            idempotency=jsonable_encoder({
+                "scope": idempotency["scope"],
+                "request_hash": idempotency["request_hash"],
+                "response_body": idempotency["response_body"],
+            }) if idempotency else None,
+            next_attempt_at=now,
+        )
+        .on_conflict_do_nothing(constraint="uq_quiz_submission_staging_quiz_id_student_id")
+        .returning(QuizSubmissionStaging.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def find_staged_response(
+    db: AsyncSession,
+    user_id: UUID,
+    key: Optional[str],
+    scope: str,
+    request_hash: str,
+) -> Optional[JSONResponse]:
+    """
+    202 replay for a retry of a submission that is staged but not written
+    yet, so its idempotency_keys row does not exist. Same rules as
+    find_idempotent_response: reusing the key for another request is a 422.
+    """
+    if key is None:
+        return None
+
+    result = await db.execute(
+        select(QuizSubmissionStaging.idempotency, QuizSubmissionStaging.rejected_at).where(
+            QuizSubmissionStaging.student_id == user_id,
+            QuizSubmissionStaging.idempotency_key == key,
+        )
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    stored = row.idempotency
+    if stored["scope"] != scope or stored["request_hash"] != request_hash:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+    if row.rejected_at is not None:
+        raise HTTPException(409, REJECTED_DETAIL)
+
+    return JSONResponse(
+        status_code=202,
+        content=stored["response_body"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def staged_status(quiz_id: UUID, student_id: UUID, db: AsyncSession) -> Optional[str]:
+    """
+    "pending" while an accepted submission is waiting to be written,
+    "rejected" if it lost to another submission, else None.
+    """
+    result = await db.execute(
+        select(QuizSubmissionStaging.written_at, QuizSubmissionStaging.rejected_at).where(
+            QuizSubmissionStaging.quiz_id == quiz_id,
+            QuizSubmissionStaging.student_id == student_id,
+        )
+    )
+    row = result.first()
+    if row is None:
+        return None
+    if row.rejected_at is not None:
+        return "rejected"
+    if row.written_at is None:
+        return "pending"
+    return None
+
+
+def _answer_rows(staged: QuizSubmissionStaging, quiz: QuizDefinition) -> list[dict]:
+    """
+    Staged answers as quiz_answers rows, reconciled with the current
+    definition the way apply_quiz_question_diff treats stored answers: an
+    answer to a question removed since staging is dropped, one naming a
+    removed option keeps the question with no option selected.
+    """
+    question_ids = quiz.answer_key.question_index
+    rows = []
+    for answer in staged.answers:
+        question_id = UUID(answer["question_id"])
+        if question_id not in question_ids:
+            continue
+        option_id = UUID(answer["selected_option_id"]) if answer["selected_option_id"] else None
+        if option_id is not None and option_id not in quiz.options_by_id:
+            option_id = None
+        rows.append({
+            "id": UUID(answer["id"]),
+            "submission_id": staged.id,
+            "question_id": question_id,
+            "selected_option_id": option_id,
+        })
+    return rows
+
+
+def _score(quiz: QuizDefinition, answer_rows: list[dict]) -> int:
+    """
+    Total score of reconciled answer rows (same rules as evaluate_quiz_answers).
+    """
+    return sum(
+        quiz.answer_key.points_for(row["question_id"], row["selected_option_id"])[1]
+        for row in answer_rows
+    )
+
+
+# ---------------------------
+# Background writer
+# ---------------------------
+class QuizSubmissionIngestor:
+    """
+    Writer for burst-mode quiz submissions. Requests stage graded
+    submissions in quiz_submission_staging and answer 202; this task claims
+    due staged rows with FOR UPDATE SKIP LOCKED, so every process drains the
+    same table (including rows left behind by a crashed one), and writes a
+    batch in one transaction: a multi-row INSERT ... ON CONFLICT for
+    quiz_submissions, one INSERT for quiz_answers and one progress UPDATE.
+    Rows that fail stay staged and are retried with backoff.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._wakeup = asyncio.Event()
+        self._notified = 0
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self._last_cleanup = 0.0
+        # Whether quiz_submission_staging may hold unwritten rows. The
+        # synchronous submit path only pays for the staging lock and check
+        # while this is set; cleared once a non-burst startup drain leaves
+        # nothing pending.
+        self.staging_active = True
+
+        self.accepted = 0
+        self.written = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.failed_attempts = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def notify(self) -> None:
+        """
+        A submission was staged and committed by this process.
+        """
+        self.accepted += 1
+        self._notified += 1
+        if self._notified >= self.batch_size:
+            self._wakeup.set()
+
+    async def _claim(self, db: AsyncSession, limit: int, staged_id: Optional[UUID] = None) -> list[QuizSubmissionStaging]:
+        query = (
+            select(QuizSubmissionStaging)
+            .where(
+                QuizSubmissionStaging.written_at.is_(None),
+                QuizSubmissionStaging.rejected_at.is_(None),
+                QuizSubmissionStaging.next_attempt_at <= datetime.utcnow(),
+            )
+            .order_by(QuizSubmissionStaging.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if staged_id is not None:
+            query = query.where(QuizSubmissionStaging.id == staged_id)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def flush(self) -> int:
+        """
+        Write one batch of due staged submissions; returns how many rows
+        were claimed. A failed batch is retried row by row, and rows that
+        still fail are deferred, never dropped.
+        """
+        self._notified = 0
+        async with AsyncSessionLocal() as db:
+            batch = await self._claim(db, self.batch_size)
+            if not batch:
+                return 0
+
+            staged = [(row.id, row.attempts) for row in batch]
+            try:
+                self.written += await self._write(batch, db)
+                self.batches += 1
+                return len(staged)
+            except Exception as exc:
+                await db.rollback()
+                self.failed_batches += 1
+                self._record_error(exc)
+                logger.exception("Quiz submission batch of %d failed; retrying one by one", len(staged))
+
+        for staged_id, attempts in staged:
+            async with AsyncSessionLocal() as db:
+                batch = await self._claim(db, 1, staged_id)
+                if not batch:
+                    continue
+                try:
+                    self.written += await self._write(batch, db)
+                except Exception as exc:
+                    await db.rollback()
+                    await self._defer(staged_id, attempts, exc, db)
+        self.batches += 1
+        return len(staged)
+
+    async def _defer(self, staged_id: UUID, attempts: int, exc: Exception, db: AsyncSession) -> None:
+        delay = min(2 ** attempts, QUIZ_INGEST_RETRY_MAX_SECONDS)
+        self.failed_attempts += 1
+        self._record_error(exc)
+        logger.exception(
+            "Quiz submission %s failed (attempt %d); retrying in %ds",
+            staged_id, attempts + 1, delay,
+        )
+
+        await db.execute(
+            update(QuizSubmissionStaging)
+            .where(QuizSubmissionStaging.id == staged_id)
+            .values(
+                attempts=QuizSubmissionStaging.attempts + 1,
+                last_error=repr(exc)[:2000],
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+            )
+        )
+        await db.commit()
+
+    def _record_error(self, exc: Exception) -> None:
+        self.last_error = repr(exc)[:2000]
+        self.last_error_at = datetime.utcnow()
+
+    async def _write(self, batch: list[QuizSubmissionStaging], db: AsyncSession) -> int:
+        staged_ids = [s.id for s in batch]
+        quizzes = {quiz_id: await get_quiz_definition(quiz_id, db) for quiz_id in {s.quiz_id for s in batch}}
+        # A quiz deleted since staging takes its staged rows with it
+        batch = [s for s in batch if quizzes[s.quiz_id] is not None]
+
+        # The quiz may have been edited with allow_answer_loss since staging:
+        # answers are reconciled with the current definition and re-scored
+        # against its key, so the stored score only counts answers it keeps
+        answer_rows = {s.id: _answer_rows(s, quizzes[s.quiz_id]) for s in batch}
+        scores = {
+            s.id: _score(quizzes[s.quiz_id], answer_rows[s.id])
+            for s in batch
+        }
+
+        # The synchronous path checks staging under lock_quiz_submission, so a
+        # conflict here means the data changed some other way; the row is
+        # kept as rejected and shown to the student on their result view and
+        # on an idempotent retry
+        inserted = set()
+        if batch:
+            result = await db.execute(
+                pg_insert(QuizSubmission)
+                .on_conflict_do_nothing(constraint="uq_quiz_submissions_quiz_id_student_id")
+                .returning(QuizSubmission.id),
+                [
+                    {
+                        "id": s.id,
+                        "quiz_id": s.quiz_id,
+                        "student_id": s.student_id,
+                        "submitted_at": s.submitted_at,
+                        "total_score": scores[s.id],
+                    }
+                    for s in batch
+                ],
+            )
+            inserted = set(result.scalars().all())
+        fresh = [s for s in batch if s.id in inserted]
+        rejected = [s.id for s in batch if s.id not in inserted]
+        if rejected:
+            logger.error("%d staged quiz submissions lost to an existing submission: %s", len(rejected), rejected)
+            await db.execute(
+                update(QuizSubmissionStaging)
+                .where(QuizSubmissionStaging.id.in_(rejected))
+                .values(
+                    rejected_at=datetime.utcnow(),
+                    last_error="Conflicts with an existing quiz submission",
+                )
+            )
+
+        if fresh:
+            rows = [row for s in fresh for row in answer_rows[s.id]]
+            if rows:
+                await db.execute(insert(QuizAnswer), rows)
+
+            await record_quiz_submissions_bulk(
+                Counter((s.course_id, s.student_id) for s in fresh), db
+            )
+            await store_idempotent_responses(
+                [
+                    idempotency_row(
+                        s.student_id,
+                        s.idempotency_key,
+                        s.idempotency["scope"],
+                        s.idempotency["request_hash"],
+                        202,
+                        s.idempotency["response_body"],
+                    )
+                    for s in fresh if s.idempotency_key
+                ],
+                db,
+            )
+
+            result = await db.execute(
+                select(User.id, User.roll_number)
+                .where(User.id.in_({s.student_id for s in fresh}))
+            )
+            roll_numbers = dict(result.tuples().all())
+            await store_result_snapshots(
+                [
+                    build_result_snapshot(
+                        quizzes[s.quiz_id],
+                        s.id,
+                        s.student_id,
+                        roll_numbers.get(s.student_id),
+                        s.submitted_at,
+                        scores[s.id],
+                        {row["question_id"]: row["selected_option_id"] for row in answer_rows[s.id]},
+                    )
+                    for s in fresh
+                ],
+                db,
+            )
+
+            for course_id, student_id in {(s.course_id, s.student_id) for s in fresh}:
+                emit_after_commit(
+                    db,
+                    ("certificate", course_id, student_id),
+                    check_certificate_task,
+                    course_id,
+                    student_id,
+                )
+
+        # Includes rows of quizzes deleted since staging: nothing to write
+        written_ids = [staged_id for staged_id in staged_ids if staged_id not in rejected]
+        if written_ids:
+            await db.execute(
+                update(QuizSubmissionStaging)
+                .where(QuizSubmissionStaging.id.in_(written_ids))
+                .values(written_at=datetime.utcnow())
+            )
+        await db.commit()
+
+        self.rejected += len(rejected)
+        for quiz_id in {s.quiz_id for s in fresh}:
+            quiz_analytics_cache.invalidate(quiz_id)
+        return len(fresh)
+
+    async def _cleanup(self) -> None:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(QuizSubmissionStaging).where(
+                    QuizSubmissionStaging.written_at
+                    < now - timedelta(seconds=QUIZ_STAGING_RETENTION_SECONDS)
+                )
+            )
+            # Rejected rows stay as long as a retry could still ask about them
+            await db.execute(
+                delete(QuizSubmissionStaging).where(
+                    QuizSubmissionStaging.rejected_at
+                    < now - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+                )
+            )
+            await db.commit()
+
+    async def _drain(self) -> None:
+        while await self.flush() >= self.batch_size:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            # Staged rows are safe in the database; keep going on errors
+            try:
+                await self._drain()
+                if loop.time() - self._last_cleanup >= QUIZ_STAGING_CLEANUP_SECONDS:
+                    await self._cleanup()
+                    self._last_cleanup = loop.time()
+            except Exception as exc:
+                self._record_error(exc)
+                logger.exception("Quiz submission ingest cycle failed")
+
+    async def _drain_leftovers(self) -> None:
+        """
+        Burst mode is off: write rows staged before the switch, then stop.
+        Rows waiting out a retry backoff are picked up on a later pass.
+        """
+        while not self._stopping:
+            try:
+                await self._drain()
+                async with AsyncSessionLocal() as db:
+                    pending = await db.scalar(
+                        select(func.count()).select_from(QuizSubmissionStaging).where(
+                            QuizSubmissionStaging.written_at.is_(None),
+                            QuizSubmissionStaging.rejected_at.is_(None),
+                        )
+                    )
+                if not pending:
+                    self.staging_active = False
+                    return
+            except Exception as exc:
+                self._record_error(exc)
+                logger.exception("Draining staged quiz submissions failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), QUIZ_STAGING_CLEANUP_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """
+        Poll the staging table in burst mode; otherwise only write what an
+        earlier burst-mode run left staged.
+        """
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run() if QUIZ_BURST_MODE else self._drain_leftovers())
+
+    async def stop(self) -> None:
+        """
+        Let the writer finish its current batch (never cancelled mid-write),
+        then drain what is due. Anything left stays staged for the next start
+        or another process.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if not self.staging_active:
+            return
+        try:
+            await self._drain()
+        except Exception:
+            logger.exception("Could not drain staged quiz submissions on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "burst_mode": QUIZ_BURST_MODE,
+            "staging_active": self.staging_active,
+            "accepted": self.accepted,
+            "written": self.written,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "failed_attempts": self.failed_attempts,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+    async def backlog(self, db: AsyncSession) -> dict:
+        """
+        Staged rows not yet written, across all processes.
+        """
+        result = await db.execute(
+            select(
+                func.count().filter(QuizSubmissionStaging.rejected_at.is_(None)),
+                func.count().filter(
+                    QuizSubmissionStaging.rejected_at.is_(None),
+                    QuizSubmissionStaging.attempts > 0,
+                ),
+                func.count().filter(QuizSubmissionStaging.rejected_at.isnot(None)),
+                func.min(QuizSubmissionStaging.submitted_at).filter(QuizSubmissionStaging.rejected_at.is_(None)),
+            ).where(QuizSubmissionStaging.written_at.is_(None))
+        )
+        staged, retrying, rejected, oldest = result.one()
+        return {
+            "staged": staged,
+            "retrying": retrying,
+            "rejected": rejected,
+            "oldest_staged_at": oldest,
+        }
+
+
+quiz_ingestor = QuizSubmissionIngestor(QUIZ_INGEST_BATCH_SIZE, QUIZ_INGEST_FLUSH_SECONDS)
@@ -0,0 +1,324 @@
+import os
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizResultSnapshot, QuizSubmission, QuizAnswer, User
+from app.helpers.quiz_cache import QuizDefinition
+from app.helpers.quiz_answer_evaluator import build_question_results
+from app.schemas.quiz_submission import QuizSubmissionDetailView
+
+QUIZ_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("QUIZ_RESULT_CACHE_MAX_ENTRIES", 4096))
+# Bounds how long another process's re-render can go unseen by the teacher
+# view; student views also compare the quiz version
+QUIZ_RESULT_CACHE_TTL_SECONDS = float(os.getenv("QUIZ_RESULT_CACHE_TTL_SECONDS", 300))
+
+# Clients must revalidate, and revalidation is a 304 from memory
+RESULT_CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True, slots=True)
+class ResultSnapshot:
+    submission_id: UUID
+    quiz_id: UUID
+    # Definition version the snapshot was rendered or loaded under
+    quiz_version: int
+    student_id: UUID
+    instructor_id: UUID
+    etag: str
+    body: bytes
+
+    @property
+    def etag_header(self) -> str:
+        return f'"{self.etag}"'
+
+
+# ---------------------------
+# Rendering
+# ---------------------------
+def build_result_snapshot(
+    quiz: QuizDefinition,
+    submission_id: UUID,
+    student_id: UUID,
+    roll_number: Optional[str],
+    submitted_at: datetime,
+    total_score: int,
+    selected_by_question: dict,
+) -> ResultSnapshot:
+    body = QuizSubmissionDetailView(
+        submission_id=submission_id,
+        quiz_id=quiz.id,
+        quiz_title=quiz.title,
+        student_id=student_id,
+        student_roll_number=roll_number,
+        submitted_at=submitted_at,
+        total_score=total_score,
+        questions=build_question_results(quiz, selected_by_question),
+    ).model_dump_json().encode()
+
+    return ResultSnapshot(
+        submission_id=submission_id,
+        quiz_id=quiz.id,
+        quiz_version=quiz.version,
+        student_id=student_id,
+        instructor_id=quiz.instructor_id,
+        etag=hashlib.sha256(body).hexdigest(),
+        body=body,
+    )
+
+
+async def store_result_snapshots(snapshots: list[ResultSnapshot], db: AsyncSession) -> None:
+    """
+    Upsert rendered snapshots in the caller's transaction. Does not commit.
+    """
+    if not snapshots:
+        return
+
+    stmt = pg_insert(QuizResultSnapshot)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[QuizResultSnapshot.submission_id],
+            set_={
+                "etag": stmt.excluded.etag,
+                "body": stmt.excluded.body,
+                "rendered_at": stmt.excluded.rendered_at,
+            },
+        ),
+        [
+            {
+                "submission_id": s.submission_id,
+                "quiz_id": s.quiz_id,
+                "student_id": s.student_id,
+                "etag": s.etag,
+                "body": s.body,
+                "rendered_at": datetime.utcnow(),
+            }
+            for s in snapshots
+        ],
+    )
+    for snapshot in snapshots:
+        quiz_result_cache.invalidate_submission(snapshot.submission_id)
+
+
+async def render_quiz_snapshots(
+    quiz: QuizDefinition,
+    db: AsyncSession,
+    submission_ids: Optional[list[UUID]] = None,
+) -> dict[UUID, ResultSnapshot]:
+    """
+    Render and store snapshots from the raw tables for every submission of
+    a quiz (regrade) or only the given ones (first view of an old
+    submission). Two queries regardless of count. Does not commit.
+    """
+    query = (
+        select(
+            QuizSubmission.id,
+            QuizSubmission.student_id,
+            QuizSubmission.submitted_at,
+            QuizSubmission.total_score,
+            User.roll_number,
+        )
+        .join(User, User.id == QuizSubmission.student_id)
+        .where(QuizSubmission.quiz_id == quiz.id)
+    )
+    if submission_ids is not None:
+        query = query.where(QuizSubmission.id.in_(submission_ids))
+    submissions = (await db.execute(query)).all()
+    if not submissions:
+        return {}
+
+    answers_query = (
+        select(QuizAnswer.submission_id, QuizAnswer.question_id, QuizAnswer.selected_option_id)
+        .join(QuizSubmission, QuizSubmission.id == QuizAnswer.submission_id)
+        .where(QuizSubmission.quiz_id == quiz.id)
+    )
+    if submission_ids is not None:
+        answers_query = answers_query.where(QuizAnswer.submission_id.in_(submission_ids))
+
+    selected: dict[UUID, dict] = defaultdict(dict)
+    for submission_id, question_id, option_id in (await db.execute(answers_query)).all():
+        selected[submission_id][question_id] = option_id
+
+    snapshots = {
+        row.id: build_result_snapshot(
+            quiz,
+            row.id,
+            row.student_id,
+            row.roll_number,
+            row.submitted_at,
+            row.total_score,
+            selected[row.id],
+        )
+        for row in submissions
+    }
+    await store_result_snapshots(list(snapshots.values()), db)
+    return snapshots
+
+
+async def discard_quiz_snapshots(quiz_id: UUID, db: AsyncSession) -> None:
+    """
+    Quiz content changed: drop its snapshots so they re-render on next view.
+    Does not commit.
+    """
+    await db.execute(
+        delete(QuizResultSnapshot).where(QuizResultSnapshot.quiz_id == quiz_id)
+    )
+    quiz_result_cache.invalidate_quiz(quiz_id)
+
+
+# ---------------------------
+# Loading
+# ---------------------------
+async def load_result_snapshot(
+    quiz: QuizDefinition,
+    db: AsyncSession,
+    submission_id: Optional[UUID] = None,
+    student_id: Optional[UUID] = None,
+) -> Optional[ResultSnapshot]:
+    """
+    Stored snapshot by submission id or by (quiz, student); rendered and
+    stored in the caller's transaction if the submission predates
+    snapshots. Does not commit.
+    """
+    if submission_id is not None:
+        condition = QuizResultSnapshot.submission_id == submission_id
+    else:
+        condition = (QuizResultSnapshot.quiz_id == quiz.id) & (QuizResultSnapshot.student_id == student_id)
+
+    result = await db.execute(
+        select(
+            QuizResultSnapshot.submission_id,
+            QuizResultSnapshot.student_id,
+            QuizResultSnapshot.etag,
+            QuizResultSnapshot.body,
+        ).where(condition)
+    )
+    row = result.one_or_none()
+
+    if row is not None:
+        snapshot = ResultSnapshot(
+            submission_id=row.submission_id,
+            quiz_id=quiz.id,
+            quiz_version=quiz.version,
+            student_id=row.student_id,
+            instructor_id=quiz.instructor_id,
+            etag=row.etag,
+            body=row.body,
+        )
+    else:
+        if submission_id is None:
+            submission_id = await db.scalar(
+                select(QuizSubmission.id).where(
+                    QuizSubmission.quiz_id == quiz.id,
+                    QuizSubmission.student_id == student_id,
+                )
+            )
+            if submission_id is None:
+                return None
+        rendered = await render_quiz_snapshots(quiz, db, [submission_id])
+        snapshot = rendered.get(submission_id)
+        if snapshot is None:
+            return None
+
+    quiz_result_cache.put(snapshot)
+    return snapshot
+
+
+def snapshot_response(snapshot: ResultSnapshot, request: Request) -> Response:
+    """
+    Snapshot body with a strong ETag, or 304 if the client already has it.
+    """
+    headers = {
+        "ETag": snapshot.etag_header,
+        "Cache-Control": RESULT_CACHE_CONTROL,
+    }
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag_header):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(candidate.strip() in (etag, "*") for candidate in if_none_match.split(","))
+
+
+# ---------------------------
+# In-process cache
+# ---------------------------
+class QuizResultCache:
+    """
+    LRU of rendered snapshots by submission id, with a (quiz, student)
+    index, so a revalidation can be answered before any database access.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[UUID, tuple[float, ResultSnapshot]] = OrderedDict()
+        self._by_student: dict[tuple[UUID, UUID], UUID] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, submission_id: Optional[UUID], quiz_version: Optional[int] = None) -> Optional[ResultSnapshot]:
+        entry = self._entries.get(submission_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        if quiz_version is not None and entry[1].quiz_version != quiz_version:
+            self.invalidate_submission(submission_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(submission_id)
+        self.hits += 1
+        return entry[1]
+
+    def by_submission(self, submission_id: UUID) -> Optional[ResultSnapshot]:
+        return self._get(submission_id)
+
+    def by_student(self, quiz: QuizDefinition, student_id: UUID) -> Optional[ResultSnapshot]:
+        """
+        Cached snapshot of the student's submission, only if it was rendered
+        under the given definition version (a quiz edited or regraded in
+        another process has a newer version).
+        """
+        return self._get(self._by_student.get((quiz.id, student_id)), quiz.version)
+
+    def put(self, snapshot: ResultSnapshot) -> None:
+        self._entries[snapshot.submission_id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(snapshot.submission_id)
+        self._by_student[(snapshot.quiz_id, snapshot.student_id)] = snapshot.submission_id
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._by_student.pop((evicted.quiz_id, evicted.student_id), None)
+
+    def invalidate_submission(self, submission_id: UUID) -> None:
+        entry = self._entries.pop(submission_id, None)
+        if entry is not None:
+            self._by_student.pop((entry[1].quiz_id, entry[1].student_id), None)
+
+    def invalidate_quiz(self, quiz_id: UUID) -> None:
+        for submission_id, (_, snapshot) in list(self._entries.items()):
+            if snapshot.quiz_id == quiz_id:
+                self.invalidate_submission(submission_id)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+quiz_result_cache = QuizResultCache(QUIZ_RESULT_CACHE_MAX_ENTRIES, QUIZ_RESULT_CACHE_TTL_SECONDS)
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import time
+import heapq
+import logging
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncResult
+
+logger = logging.getLogger("app.sql")
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+SLOWEST_STATEMENTS_KEPT = int(os.getenv("SQL_SLOWEST_STATEMENTS_KEPT", 5))
+RECENT_REQUESTS_KEPT = int(os.getenv("SQL_RECENT_REQUESTS_KEPT", 200))
+
+_IN_LIST = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so executions that differ only in parameters
+    (including the length of IN lists) share one shape.
+    """
+    shape = _IN_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestSqlStats:
+    """
+    SQL activity of a single HTTP request.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.query_count = 0
+        self.total_ms = 0.0
+        self.fetch_ms = 0.0
+        self.shapes: Counter = Counter()
+        self._slowest: list[tuple[float, str]] = []
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.query_count += 1
+        self.total_ms += elapsed_ms
+
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+
+        entry = (elapsed_ms, shape)
+        if len(self._slowest) < SLOWEST_STATEMENTS_KEPT:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def record_fetch(self, elapsed_ms: float) -> None:
+        # Server-side cursor fetches: database time, but not a new statement
+        self.total_ms += elapsed_ms
+        self.fetch_ms += elapsed_ms
+
+    def suspected_n_plus_one(self) -> list[dict]:
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def summary(self, status_code: int, request_ms: float) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status_code": status_code,
+            "request_ms": round(request_ms, 2),
+            "query_count": self.query_count,
+            "db_ms": round(self.total_ms, 2),
+            "fetch_ms": round(self.fetch_ms, 2),
+            "slowest": [
+                {"ms": round(ms, 2), "statement": shape}
+                for ms, shape in sorted(self._slowest, reverse=True)
+            ],
+            "suspected_n_plus_one": self.suspected_n_plus_one(),
+        }
+
+
+_current_stats: ContextVar[Optional[RequestSqlStats]] = ContextVar("current_sql_stats", default=None)
+recent_requests: deque = deque(maxlen=RECENT_REQUESTS_KEPT)
+
+
+# ---------------------------
+# Engine events
+# ---------------------------
+# The start time lives on the execution context, which is per statement:
+# after_cursor_execute does not fire for a failed statement, and nothing
+# is left behind on the connection when that happens.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start_time", None)
+    if started is None:
+        return
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_sql_instrumentation(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def timed_partitions(result: AsyncResult):
+    """
+    result.partitions() of a streamed result, charging each fetch to the
+    current request. Fetches from a server-side cursor do not pass through
+    the cursor events, so without this only the opening execute is timed.
+    """
+    partitions = result.partitions()
+    while True:
+        started = time.perf_counter()
+        try:
+            partition = await anext(partitions)
+        except StopAsyncIteration:
+            return
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.record_fetch((time.perf_counter() - started) * 1000)
+        yield partition
+
+
+# ---------------------------
+# Request middleware
+# ---------------------------
+def _finish(stats: RequestSqlStats, status_code: int, started: float) -> None:
+    if not stats.query_count:
+        return
+
+    summary = stats.summary(status_code, (time.perf_counter() - started) * 1000)
+    recent_requests.append(summary)
+
+    if summary["suspected_n_plus_one"]:
+        logger.warning(json.dumps({"event": "sql_request", **summary}))
+    else:
+        logger.info(json.dumps({"event": "sql_request", **summary}))
+
+
+async def sql_stats_middleware(request: Request, call_next):
+    stats = RequestSqlStats(request.method, request.url.path)
+    token = _current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        _finish(stats, 500, started)
+        raise
+    finally:
+        _current_stats.reset(token)
+
+    # The endpoint runs with a copy of this context, so statements issued
+    # while a StreamingResponse body is produced (e.g. the quiz export's
+    # server-side cursor) still land in stats. Summarise once the body is
+    # fully sent, not when the headers are.
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        _finish(stats, response.status_code, started)
+        return response
+
+    async def finish_after_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            _finish(stats, response.status_code, started)
+
+    response.body_iterator = finish_after_body()
+    return response
+
+
+def sql_stats_report(limit: int) -> dict:
+    """
+    Aggregate the recently tracked requests for the admin endpoint.
+    """
+    requests = list(recent_requests)[-limit:]
+
+    by_endpoint: dict[str, dict] = {}
+    for item in requests:
+        key = f"{item['method']} {item['path']}"
+        endpoint = by_endpoint.setdefault(key, {"requests": 0, "queries": 0, "db_ms": 0.0, "n_plus_one_hits": 0})
+        endpoint["requests"] += 1
+        endpoint["queries"] += item["query_count"]
+        endpoint["db_ms"] = round(endpoint["db_ms"] + item["db_ms"], 2)
+        if item["suspected_n_plus_one"]:
+            endpoint["n_plus_one_hits"] += 1
+
+    return {
+        "tracked_requests": len(requests),
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "endpoints": by_endpoint,
+        "suspected_n_plus_one": [item for item in requests if item["suspected_n_plus_one"]],
+        "recent": requests,
+    }
@@ -0,0 +1,159 @@
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TASK_QUEUE_WORKERS = int(os.getenv("TASK_QUEUE_WORKERS", 4))
+TASK_DEDUPE_SECONDS = float(os.getenv("TASK_DEDUPE_SECONDS", 2))
+TASK_QUEUE_MAX_PENDING = int(os.getenv("TASK_QUEUE_MAX_PENDING", 10000))
+TASK_QUEUE_DRAIN_SECONDS = float(os.getenv("TASK_QUEUE_DRAIN_SECONDS", 10))
+
+TaskFn = Callable[..., Awaitable[Any]]
+
+
+class TaskQueue:
+    """
+    In-process background queue for side effects that must not delay a
+    response. Keyed tasks are debounced: a task waits dedupe_seconds before
+    it becomes runnable, and further tasks with the same key are dropped
+    until it starts, so a burst of events collapses into one run that sees
+    the latest committed state.
+    """
+
+    def __init__(self, workers: int, dedupe_seconds: float, max_pending: int):
+        self.worker_count = workers
+        self.dedupe_seconds = dedupe_seconds
+        self.max_pending = max_pending
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        # key -> (timer handle while debouncing, queued item)
+        self._pending: dict[Hashable, tuple[asyncio.TimerHandle | None, tuple]] = {}
+
+        self.processed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    def enqueue(self, key: Hashable | None, fn: TaskFn, *args) -> bool:
+        """
+        Schedule fn(*args). Returns False if it was deduplicated or rejected.
+        """
+        if self._queue is None:
+            logger.warning("Task queue not started; dropping %s", getattr(fn, "__name__", fn))
+            self.rejected += 1
+            return False
+
+        if key is not None and key in self._pending:
+            self.deduplicated += 1
+            return False
+
+        if len(self._pending) + self._queue.qsize() >= self.max_pending:
+            logger.warning("Task queue full; dropping %s", getattr(fn, "__name__", fn))
+            self.rejected += 1
+            return False
+
+        item = (key, fn, args)
+        if key is None:
+            self._queue.put_nowait(item)
+        elif self.dedupe_seconds > 0:
+            handle = asyncio.get_running_loop().call_later(self.dedupe_seconds, self._release, key)
+            self._pending[key] = (handle, item)
+        else:
+            self._pending[key] = (None, item)
+            self._queue.put_nowait(item)
+        return True
+
+    def _release(self, key: Hashable) -> None:
+        _, item = self._pending[key]
+        self._pending[key] = (None, item)
+        self._queue.put_nowait(item)
+
+    async def _worker(self):
+        while True:
+            key, fn, args = await self._queue.get()
+            if key is not None:
+                self._pending.pop(key, None)
+            try:
+                await fn(*args)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Background task %s failed", getattr(fn, "__name__", fn))
+            finally:
+                self._queue.task_done()
+
+    async def stop(self, drain_seconds: float = TASK_QUEUE_DRAIN_SECONDS) -> None:
+        """
+        Release debounced tasks immediately, give workers drain_seconds to
+        finish what is queued, then cancel them.
+        """
+        if self._queue is None:
+            return
+
+        for key, (handle, _) in list(self._pending.items()):
+            if handle is not None:
+                handle.cancel()
+                self._release(key)
+
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Task queue stopped with %d tasks unfinished", self._queue.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "debouncing": sum(1 for handle, _ in self._pending.values() if handle is not None),
+            "processed": self.processed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
+
+
+task_queue = TaskQueue(TASK_QUEUE_WORKERS, TASK_DEDUPE_SECONDS, TASK_QUEUE_MAX_PENDING)
+
+
+# ---------------------------
+# Post-commit hook
+# ---------------------------
+_AFTER_COMMIT_TASKS = "after_commit_tasks"
+
+
+def emit_after_commit(db, key: Hashable | None, fn: TaskFn, *args) -> None:
+    """
+    Enqueue fn(*args) on the task queue once the session's transaction
+    commits; discarded if it rolls back. Works with Session and AsyncSession.
+    """
+    db.info.setdefault(_AFTER_COMMIT_TASKS, []).append((key, fn, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_after_commit(session: Session):
+    for key, fn, args in session.info.pop(_AFTER_COMMIT_TASKS, []):
+        task_queue.enqueue(key, fn, *args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_AFTER_COMMIT_TASKS, None)
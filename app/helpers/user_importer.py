@@ -0,0 +1,299 @@
+import csv
+import json
+import codecs
+import uuid
+from collections import deque
+from datetime import datetime, date
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User, UserRole
+from app.schemas.user import UserCreate
+from app.auth.password_security import hash_passwords_async
+
+IMPORT_BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+SUPPORTED_FORMATS = ("csv", "ndjson")
+# CSV cells that get surrounding whitespace trimmed. Everything else,
+# notably password, is passed through exactly as uploaded.
+STRIPPED_CSV_FIELDS = {"role", "name", "email", "roll_number"}
+
+
+def detect_import_format(filename: Optional[str], requested: Optional[str]) -> Optional[str]:
+    """
+    Resolve the upload format from the explicit query value or the file extension.
+    """
+    if requested:
+        requested = requested.lower()
+        return requested if requested in SUPPORTED_FORMATS else None
+
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith(".ndjson") or name.endswith(".jsonl"):
+        return "ndjson"
+    return None
+
+
+# ---------------------------
+# Streaming readers
+# ---------------------------
+async def iter_upload_lines(file: UploadFile) -> AsyncIterator[str]:
+    """
+    Yield decoded lines of an upload, reading it in fixed-size chunks.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class _LineFeed:
+    """
+    Sync line iterator for one persistent csv.reader. Lines are pushed as
+    they arrive; the reader is only advanced once a complete record is queued.
+    """
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def iter_csv_rows(file: UploadFile) -> AsyncIterator[list[str]]:
+    """
+    Yield parsed CSV records. Physical lines are buffered until their quotes
+    balance, so quoted fields may span lines.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    in_quotes = False
+
+    async for line in iter_upload_lines(file):
+        if not in_quotes and not line.strip():
+            continue
+
+        feed.lines.append(line + "\n")
+        # A doubled "" escape does not change parity
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            yield next(reader)
+
+    # Unterminated quote at end of file: parse what there is
+    if feed.lines:
+        yield next(reader)
+
+
+def _csv_value(key: str, value: str) -> str | None:
+    """
+    An empty cell means "not given"; only identifier cells are trimmed.
+    """
+    if key in STRIPPED_CSV_FIELDS:
+        value = value.strip()
+    return value or None
+
+
+async def iter_import_records(file: UploadFile, fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Yield (row_number, record, error) for every non-empty data row of the upload.
+    Row numbers are 1-based data rows (the CSV header is not counted).
+    """
+    row_number = 0
+
+    if fmt == "csv":
+        header: list[str] | None = None
+        async for values in iter_csv_rows(file):
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, None, "Column count does not match header"
+                continue
+
+            yield row_number, {
+                key: _csv_value(key, value)
+                for key, value in zip(header, values)
+            }, None
+        return
+
+    async for line in iter_upload_lines(file):
+        if not line.strip():
+            continue
+
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield row_number, None, "Invalid JSON"
+            continue
+
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+
+        yield row_number, record, None
+
+
+# ---------------------------
+# Batch processing
+# ---------------------------
+def _validate_record(record: dict) -> tuple[UserCreate | None, str | None]:
+    try:
+        data = UserCreate(**record)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+
+    # Same rules as POST /user/register
+    if data.role in [UserRole.STUDENT, UserRole.INSTRUCTOR] and not data.roll_number:
+        return None, "roll_number is required for students and instructors"
+
+    if data.role == UserRole.ADMIN and not data.email:
+        return None, "email is required for admin users"
+
+    if data.dob:
+        try:
+            date.fromisoformat(data.dob)
+        except ValueError:
+            return None, "dob must be an ISO date (YYYY-MM-DD)"
+
+    return data, None
+
+
+async def import_user_batch(
+    batch: list[tuple[int, dict | None, str | None]],
+    db: AsyncSession,
+) -> list[dict]:
+    """
+    Validate, de-duplicate, hash and insert one batch of rows.
+    Uniqueness is checked with one set-based SELECT and enforced again by
+    INSERT ... ON CONFLICT DO NOTHING, so concurrent imports stay safe.
+    Returns one result dict per input row, in input order.
+    """
+    results: dict[int, dict] = {}
+    candidates: list[tuple[int, UserCreate]] = []
+    seen_roll_numbers: set[str] = set()
+    seen_emails: set[str] = set()
+
+    for row_number, record, error in batch:
+        if error:
+            results[row_number] = {"row": row_number, "status": "error", "detail": error}
+            continue
+
+        data, error = _validate_record(record)
+        if error:
+            results[row_number] = {"row": row_number, "status": "error", "detail": error}
+            continue
+
+        if (data.roll_number and data.roll_number in seen_roll_numbers) or (
+            data.email and data.email in seen_emails
+        ):
+            results[row_number] = {"row": row_number, "status": "duplicate", "detail": "Duplicate within upload"}
+            continue
+
+        if data.roll_number:
+            seen_roll_numbers.add(data.roll_number)
+        if data.email:
+            seen_emails.add(data.email)
+        candidates.append((row_number, data))
+
+    # Set-based uniqueness check against existing users
+    if candidates:
+        conditions = []
+        if seen_roll_numbers:
+            conditions.append(User.roll_number.in_(seen_roll_numbers))
+        if seen_emails:
+            conditions.append(User.email.in_(seen_emails))
+
+        existing = await db.execute(
+            select(User.roll_number, User.email).where(or_(*conditions))
+        )
+        taken_roll_numbers = set()
+        taken_emails = set()
+        for roll_number, email in existing.all():
+            if roll_number:
+                taken_roll_numbers.add(roll_number)
+            if email:
+                taken_emails.add(email)
+
+        remaining = []
+        for row_number, data in candidates:
+            if data.roll_number and data.roll_number in taken_roll_numbers:
+                results[row_number] = {"row": row_number, "status": "duplicate", "detail": "Roll number already exists"}
+            elif data.email and data.email in taken_emails:
+                results[row_number] = {"row": row_number, "status": "duplicate", "detail": "Email already exists"}
+            else:
+                remaining.append((row_number, data))
+        candidates = remaining
+
+    # Parallel hashing + one multi-row insert
+    if candidates:
+        password_hashes = await hash_passwords_async([data.password for _, data in candidates])
+        now = datetime.utcnow()
+
+        rows = []
+        row_numbers_by_id = {}
+        for (row_number, data), password_hash in zip(candidates, password_hashes):
+            user_id = uuid.uuid4()
+            row_numbers_by_id[user_id] = row_number
+            rows.append({
+                "id": user_id,
+                "role": data.role,
+                "name": data.name,
+                "email": data.email,
+                "roll_number": data.roll_number,
+                "password_hash": password_hash,
+                "is_active": True,
+                "created_at": now,
+                "super_admin": False,
+                "department": data.department,
+                "year": data.year,
+                "section": data.section,
+                "dob": date.fromisoformat(data.dob) if data.dob else None,
+                "mobile": data.mobile,
+                "qualification": data.qualification,
+                "experience_years": data.experience_years,
+            })
+
+        inserted = await db.execute(
+            pg_insert(User)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(User.id)
+        )
+        inserted_ids = set(inserted.scalars().all())
+        await db.commit()
+
+        for user_id, row_number in row_numbers_by_id.items():
+            if user_id in inserted_ids:
+                results[row_number] = {"row": row_number, "status": "created", "user_id": str(user_id)}
+            else:
+                results[row_number] = {"row": row_number, "status": "duplicate", "detail": "Created concurrently by another request"}
+
+    return [results[row_number] for row_number, _, _ in batch]
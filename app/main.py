@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.routes.users.user_creation import router as user_registration_router
@@ -5,9 +6,11 @@ from app.routes.users.user_login import router as user_login_router
 from app.routes.users.user_profile import router as user_profile_router
 from app.routes.users.course import router as user_course_router
 from app.routes.users.week import router as user_week_router
+from app.routes.users.certificate import router as user_certificate_router
 
 from app.routes.admin.admin_login import router as admin_login_router
 from app.routes.admin.user import router as admin_user_router
+from app.routes.admin.monitoring import router as admin_monitoring_router
 
 from app.routes.users.teacher.course import router as teacher_course_router
 from app.routes.users.teacher.week import router as teacher_weeks_router
@@ -24,14 +27,50 @@ from app.routes.users.student.quiz import router as student_quiz_router
 from app.routes.users.student.quiz_submission import router as student_quiz_submission_router
 from app.routes.users.student.media_progress import router as student_media_progress_router
 
+from app.auth.password_security import shutdown_password_pool
+from app.helpers.certificate_pdf import render_missing_certificates_task, shutdown_certificate_pool
+from app.helpers.last_login_buffer import last_login_buffer
+from app.helpers.course_finalizer import course_finalizer
+from app.helpers.task_queue import task_queue
+from app.helpers.quiz_ingest import quiz_ingestor
+from app.auth.enrollment_index import enrollment_index
+from app.helpers.sql_instrumentation import install_sql_instrumentation, sql_stats_middleware
+from app.database import engine, read_engine, read_your_writes_middleware
 
 
 
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    last_login_buffer.start()
+    task_queue.start()
+    task_queue.enqueue(None, render_missing_certificates_task)
+    quiz_ingestor.start()
+    enrollment_index.start()
+    yield
+    await enrollment_index.stop()
+    # Stop the producers first; certificate checks and PDF renders they
+    # queue are drained by task_queue
+    await quiz_ingestor.stop()
+    await course_finalizer.stop()
+    await task_queue.stop()
+    await last_login_buffer.stop()
+    shutdown_password_pool()
+    shutdown_certificate_pool()
+
+
 app=FastAPI(
-    title="Course Management System"
+    title="Course Management System",
+    lifespan=lifespan
 )
 
+install_sql_instrumentation(engine)
+if read_engine is not engine:
+    install_sql_instrumentation(read_engine)
+app.middleware("http")(sql_stats_middleware)
+app.middleware("http")(read_your_writes_middleware)
+
 @app.get("/")
 def root():
     return {
@@ -44,9 +83,11 @@ app.include_router(user_login_router)
 app.include_router(user_profile_router)
 app.include_router(user_course_router)
 app.include_router(user_week_router)
+app.include_router(user_certificate_router)
 
 app.include_router(admin_login_router)
 app.include_router(admin_user_router)
+app.include_router(admin_monitoring_router)
 
 app.include_router(teacher_course_router)
 app.include_router(teacher_media_router)
@@ -1,8 +1,8 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Enum, Date, ForeignKey, Table, Text,UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, BigInteger, Enum, Date, ForeignKey, Table, Text,UniqueConstraint,Index,LargeBinary
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -47,6 +47,13 @@ class User(Base):
 
     super_admin = Column(Boolean, default=False)
 
+    # Bumped on deactivation / role change; tokens carry the version they were issued under
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
 
 course_categories_association = Table(
     "course_category_map",
@@ -62,7 +69,8 @@ course_categories_association = Table(
         UUID(as_uuid=True),
         ForeignKey("course_categories.id", ondelete="CASCADE"),
         primary_key=True
-    )
+    ),
+    Index("ix_course_category_map_category_id", "category_id"),
 )
 
 # ---------------------------
@@ -104,6 +112,11 @@ class Course(Base):
     quizzes = relationship("Quiz", back_populates="course", cascade="all, delete-orphan")
     weeks = relationship("CourseWeek", back_populates="course", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_courses_instructor_id_created_at_id", "instructor_id", "created_at", "id"),
+        Index("ix_courses_created_at_id", "created_at", "id"),
+    )
+
 
 class CourseCategory(Base):
     __tablename__ = "course_categories"
@@ -123,6 +136,7 @@ course_students = Table(
     Base.metadata,
     Column("course_id", UUID(as_uuid=True), ForeignKey("courses.id"), primary_key=True),
     Column("student_id", UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True),
+    Index("ix_course_students_student_id", "student_id"),
 )
 
 
@@ -149,6 +163,10 @@ class Media(Base):
     uploader = relationship("User")
     week = relationship("CourseWeek", back_populates="media_items")
 
+    __table_args__ = (
+        Index("ix_media_course_id_week_id", "course_id", "week_id"),
+    )
+
 
 class MediaProgress(Base):
     __tablename__ = "media_progress"
@@ -167,6 +185,7 @@ class MediaProgress(Base):
 
     __table_args__ = (
         UniqueConstraint("media_id", "student_id", name="unique_media_progress"),
+        Index("ix_media_progress_student_id", "student_id"),
     )
 
 
@@ -213,6 +232,10 @@ class Assignment(Base):
     submissions = relationship("AssignmentSubmission", back_populates="assignment", cascade="all, delete-orphan")
     week = relationship("CourseWeek", back_populates="assignments")
 
+    __table_args__ = (
+        Index("ix_assignments_course_id_week_id", "course_id", "week_id"),
+    )
+
 
 
 class AssignmentSubmission(Base):
@@ -231,6 +254,15 @@ class AssignmentSubmission(Base):
     assignment = relationship("Assignment", back_populates="submissions")
     student = relationship("User")
 
+    __table_args__ = (
+        # One submission per student; writes use INSERT ... ON CONFLICT on it
+        UniqueConstraint(
+            "assignment_id",
+            "student_id",
+            name="uq_assignment_submissions_assignment_id_student_id"
+        ),
+    )
+
 
 # ---------------------------
 # Quiz Model
@@ -250,6 +282,9 @@ class Quiz(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     week_id = Column(UUID(as_uuid=True), ForeignKey("course_weeks.id"), nullable=True)
 
+    # Bumped on every edit; keys the in-process quiz definition cache
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
 
     course = relationship("Course", back_populates="quizzes")
     instructor = relationship("User")
@@ -257,6 +292,10 @@ class Quiz(Base):
     submissions = relationship("QuizSubmission", back_populates="quiz", cascade="all, delete-orphan")
     week = relationship("CourseWeek", back_populates="quizzes")
 
+    __table_args__ = (
+        Index("ix_quizzes_course_id_week_id", "course_id", "week_id"),
+    )
+
 
 
 class QuizQuestion(Base):
@@ -298,6 +337,15 @@ class QuizSubmission(Base):
     student = relationship("User")
     answers = relationship("QuizAnswer", back_populates="submission", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # One submission per student; writes use INSERT ... ON CONFLICT on it
+        UniqueConstraint(
+            "quiz_id",
+            "student_id",
+            name="uq_quiz_submissions_quiz_id_student_id"
+        ),
+    )
+
 
 class QuizAnswer(Base):
     __tablename__ = "quiz_answers"
@@ -312,6 +360,84 @@ class QuizAnswer(Base):
     selected_option = relationship("QuizOption")
 
 
+class QuizResultSnapshot(Base):
+    """
+    Serialized QuizSubmissionDetailView of one submission, rendered at
+    submit/regrade time (app.helpers.quiz_results).
+    """
+    __tablename__ = "quiz_result_snapshots"
+
+    submission_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("quiz_submissions.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    quiz_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("quizzes.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    student_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    etag = Column(String(64), nullable=False)  # sha256 of body
+    body = Column(LargeBinary, nullable=False)
+    rendered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("quiz_id", "student_id", name="uq_quiz_result_snapshots_quiz_id_student_id"),
+    )
+
+
+class QuizSubmissionStaging(Base):
+    """
+    Burst-mode quiz submission accepted (202) but not yet written to
+    quiz_submissions. Inserted by the request before it answers; drained in
+    batches by app.helpers.quiz_ingest from any process. Written rows are
+    kept briefly so the unique constraint keeps rejecting resubmissions.
+    """
+    __tablename__ = "quiz_submission_staging"
+
+    # Becomes quiz_submissions.id
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    quiz_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("quizzes.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    course_id = Column(UUID(as_uuid=True), nullable=False)
+    student_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    submitted_at = Column(DateTime, nullable=False)
+    total_score = Column(Integer, nullable=False)
+    # [{"id", "question_id", "selected_option_id"}] as graded
+    answers = Column(JSONB, nullable=False)
+
+    idempotency_key = Column(String(255), nullable=True)
+    # {"scope", "request_hash", "response_body"}
+    idempotency = Column(JSONB, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    written_at = Column(DateTime, nullable=True)
+    # Lost to a submission written another way; kept so the student is told
+    rejected_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("quiz_id", "student_id", name="uq_quiz_submission_staging_quiz_id_student_id"),
+        Index("ix_quiz_submission_staging_written_at_next_attempt_at", "written_at", "next_attempt_at"),
+        Index("ix_quiz_submission_staging_student_id_idempotency_key", "student_id", "idempotency_key"),
+    )
+
+
 class Certificate(Base):
     __tablename__ = "certificates"
 
@@ -348,3 +474,68 @@ class Certificate(Base):
             name="unique_certificate_per_course"
         ),
     )
+
+
+# ---------------------------
+# Student Course Progress (denormalized)
+# ---------------------------
+class StudentCourseProgress(Base):
+    """
+    Raw progress numerators and course totals per (student, course),
+    maintained incrementally by app.helpers.progress_tracker.
+    """
+    __tablename__ = "student_course_progress"
+
+    student_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    course_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("courses.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    watched_seconds = Column(BigInteger, nullable=False, default=0)
+    submitted_assignments = Column(Integer, nullable=False, default=0)
+    completed_quizzes = Column(Integer, nullable=False, default=0)
+
+    total_duration = Column(BigInteger, nullable=True)
+    total_assignments = Column(Integer, nullable=False, default=0)
+    total_quizzes = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_student_course_progress_course_id", "course_id"),
+    )
+
+
+# ---------------------------
+# Idempotency Keys
+# ---------------------------
+class IdempotencyKey(Base):
+    """
+    Stored response of a write made with a client-supplied Idempotency-Key,
+    replayed when the client retries the same request.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    key = Column(String(255), primary_key=True)
+
+    scope = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
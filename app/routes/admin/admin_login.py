@@ -6,8 +6,10 @@ from sqlalchemy import select
 
 from app.database import get_db
 from app.models import User,UserRole
+from app.helpers.last_login_buffer import last_login_buffer
 from app.auth.jwt import create_access_token,create_refresh_token
-from app.auth.password_security import verify_password
+from app.auth.token_revocation import token_claims
+from app.auth.password_security import verify_password_async
 from app.schemas.user import TokenResponse
 from app.schemas.admin_login import AdminLoginRequest
 
@@ -30,27 +32,26 @@ async def admin_login(request: AdminLoginRequest, db: AsyncSession = Depends(get
     result = await db.execute(select(User).where(User.email == request.email))
     admin = result.scalars().first()
 
-    if not admin or admin.role != UserRole.ADMIN:
+    if not admin or admin.is_active is False or admin.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
     # Verify password
-    if not verify_password(request.password, admin.password_hash):
+    if not await verify_password_async(request.password, admin.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
-    # Update last login
-    admin.last_login = datetime.utcnow()
-    db.add(admin)
-    await db.commit()
+    # Update last login (flushed in batches by the write-behind buffer)
+    last_login_buffer.record(admin.id, datetime.utcnow())
 
     # Generate tokens
-    access_token = create_access_token({"user_id": str(admin.id), "role": admin.role.value})
-    refresh_token = create_refresh_token({"user_id": str(admin.id), "role": admin.role.value})
+    claims = token_claims(admin)
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token(claims)
 
     return TokenResponse(
         access_token=access_token, 
@@ -0,0 +1,69 @@
+from fastapi import APIRouter,Depends,Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+
+from app.auth.dependencies import is_admin
+from app.auth.enrollment_index import enrollment_index
+from app.helpers.sql_instrumentation import sql_stats_report
+from app.helpers.task_queue import task_queue
+from app.helpers.quiz_cache import quiz_cache
+from app.helpers.quiz_ingest import quiz_ingestor
+from app.helpers.quiz_results import quiz_result_cache
+
+router=APIRouter(
+    prefix="/admin/monitoring",
+    tags=["Admin Monitoring Endpoints"],
+    dependencies=[Depends(is_admin)]
+)
+
+
+@router.get("/sql-stats")
+async def get_sql_stats(
+    limit: int = Query(50, ge=1, le=200, description="Number of recent requests to include")
+):
+    """
+    Per-request query counts, DB time, slowest statements and suspected N+1 patterns.
+    """
+    return sql_stats_report(limit)
+
+
+@router.get("/task-queue")
+async def get_task_queue_stats():
+    """
+    Background task queue depth and outcome counters.
+    """
+    return task_queue.stats()
+
+
+@router.get("/quiz-cache")
+async def get_quiz_cache_stats():
+    """
+    Quiz definition cache size and hit/miss counters.
+    """
+    return quiz_cache.stats()
+
+
+@router.get("/quiz-ingest")
+async def get_quiz_ingest_stats(db: AsyncSession = Depends(get_db)):
+    """
+    Exam-burst write counters and failures of this process, plus the
+    staged backlog across all processes.
+    """
+    return {**quiz_ingestor.stats(), **await quiz_ingestor.backlog(db)}
+
+
+@router.get("/quiz-result-cache")
+async def get_quiz_result_cache_stats():
+    """
+    Rendered quiz result snapshot cache size and hit/miss counters.
+    """
+    return quiz_result_cache.stats()
+
+
+@router.get("/enrollment-index")
+async def get_enrollment_index_stats():
+    """
+    Enrollment/instructor index size, hit/miss counters and LISTEN/NOTIFY state.
+    """
+    return enrollment_index.stats()
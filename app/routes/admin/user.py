@@ -1,12 +1,19 @@
-from fastapi import APIRouter,Depends
+from fastapi import APIRouter,Depends,HTTPException,UploadFile,File,Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from sqlalchemy import select
+import json
 
-from app.database import get_db
+from app.database import get_db, AsyncSessionLocal
 from app.models import User
 from app.auth.dependencies import is_admin
+from app.auth.principal_cache import principal_cache
 from app.schemas.user import UserListBasic
+from app.helpers.user_importer import (
+    IMPORT_BATCH_SIZE, SUPPORTED_FORMATS, detect_import_format,
+    iter_import_records, import_user_batch
+)
 
 router=APIRouter(
     prefix="/admin",
@@ -36,3 +43,48 @@ async def list_all_users(
             role=u.role
         ) for u in users
     ]
+
+
+@router.get("/principal-cache-stats")
+async def get_principal_cache_stats():
+    """
+    Hit/miss counters of the authenticated-principal cache used by get_current_user.
+    """
+    return principal_cache.stats()
+
+
+@router.post("/bulk-import-users")
+async def bulk_import_users(
+    file: UploadFile = File(...),
+    format: str | None = Query(None, description="csv or ndjson; defaults to the file extension"),
+):
+    """
+    Stream a CSV (with header row) or NDJSON file of users in UserCreate shape.
+    Rows are processed in batches and the response streams one NDJSON result
+    per input row followed by a summary line.
+    """
+    fmt = detect_import_format(file.filename, format)
+    if fmt is None:
+        raise HTTPException(400, f"Unsupported format. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+    async def report():
+        summary = {"created": 0, "duplicate": 0, "error": 0}
+
+        async with AsyncSessionLocal() as db:
+            batch = []
+            async for item in iter_import_records(file, fmt):
+                batch.append(item)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    for row_result in await import_user_batch(batch, db):
+                        summary[row_result["status"]] += 1
+                        yield json.dumps(row_result) + "\n"
+                    batch = []
+
+            if batch:
+                for row_result in await import_user_batch(batch, db):
+                    summary[row_result["status"]] += 1
+                    yield json.dumps(row_result) + "\n"
+
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
@@ -0,0 +1,76 @@
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+import os
+
+from app.database import get_read_db
+from app.models import Certificate, Course, User
+from app.helpers.file_paths import get_certificate_fs_path
+
+router = APIRouter(
+    prefix="/certificate",
+    tags=["Certificate Endpoints"]
+)
+
+_CERTIFICATE_FILE = re.compile(r"^[0-9a-f]{64}\.pdf$")
+
+# Files are content-addressed, so a URL never changes content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# ---------------------------
+# Verify certificate (public)
+# ---------------------------
+@router.get("/verify/{certificate_number}")
+async def verify_certificate(
+    certificate_number: str,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Look up a certificate by its number (unique index on certificate_number).
+    """
+    result = await db.execute(
+        select(
+            Certificate.certificate_number,
+            Certificate.issued_at,
+            Certificate.score,
+            Certificate.grade,
+            Certificate.pdf_url,
+            User.name.label("student_name"),
+            Course.name.label("course_name"),
+            Course.code.label("course_code"),
+        )
+        .join(User, User.id == Certificate.student_id)
+        .join(Course, Course.id == Certificate.course_id)
+        .where(Certificate.certificate_number == certificate_number)
+    )
+    certificate = result.mappings().one_or_none()
+
+    if not certificate:
+        raise HTTPException(404, "Certificate not found")
+
+    return {"valid": True, **certificate}
+
+
+# ---------------------------
+# Certificate PDF files
+# ---------------------------
+@router.get("/files/{filename}")
+async def get_certificate_file(filename: str, request: Request):
+    if not _CERTIFICATE_FILE.match(filename):
+        raise HTTPException(404, "Certificate file not found")
+
+    fs_path = get_certificate_fs_path(filename)
+    if not os.path.exists(fs_path):
+        raise HTTPException(404, "Certificate file not found")
+
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": f'"{filename[:-4]}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(fs_path, media_type="application/pdf", headers=headers)
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
-from datetime import datetime
 from uuid import UUID
 
 from app.schemas.course import (
@@ -14,44 +13,35 @@ from app.schemas.media import MediaLite
 from app.schemas.quiz import QuizLite
 from app.schemas.assignment import AssignmentLite
 from app.models import Course,User,CourseWeek,course_students,Quiz,Media,Assignment
-from app.database import get_db
-from app.auth.dependencies import get_current_user
+from app.database import get_read_db
+from app.auth.dependencies import get_current_principal
 from app.auth.course_access import check_course_access
+from app.helpers.pagination import apply_keyset, split_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/course",
     tags=["User Course Endpoints"],
-    dependencies=[Depends(get_current_user)]
+    dependencies=[Depends(get_current_principal)]
 )
 
 @router.get("/list-courses", response_model=StudentCoursesCursorResponse)
 async def list_courses_cursor(
-    cursor: str | None = Query(None, description="Cursor timestamp for pagination"),
-    limit: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    cursor_time = datetime.fromisoformat(cursor) if cursor else None
-    
     query = (
         select(Course)
         .options(
             selectinload(Course.categories)
             )
         )
-    
-    if cursor_time:
-        query = query.where(Course.created_at < cursor_time)
 
-    query = query.order_by(Course.created_at.desc()).limit(limit + 1)
+    query = apply_keyset(query, Course.created_at, Course.id, cursor, limit)
     result = await db.execute(query)
-    courses = result.scalars().all()
 
     # Cursor logic
-    if len(courses) > limit:
-        next_cursor = courses[limit-1].created_at.isoformat()
-        courses = courses[:limit]
-    else:
-        next_cursor = None
+    courses, next_cursor = split_page(result.scalars().all(), limit)
 
     # Fetch week counts
     course_ids = [c.id for c in courses]
@@ -94,8 +84,8 @@ async def list_courses_cursor(
 @router.get("/course-detail/{course_id}", response_model=CourseDetailResponse)
 async def get_course_detail(
     course_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # --------------------------
     # Validate UUID
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException,UploadFile,File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional
 from uuid import UUID
 from datetime import datetime,timezone
 import shutil
 import os
+import uuid
 
-from app.models import Assignment, AssignmentSubmission, User,Course
+from app.models import Assignment, AssignmentSubmission, User
 from app.database import get_db
 from app.auth.dependencies import is_student
+from app.auth.course_access import ensure_student_enrolled
 from app.schemas.assignment_submission import  AssignmentSubmissionRead
 from app.helpers.file_paths import ASSIGNMENT_SUBMISSION_DIR
+from app.helpers.progress_tracker import record_assignment_submitted
+from app.helpers.certificate_assigner import check_certificate_task
+from app.helpers.task_queue import emit_after_commit
+from app.helpers.idempotency import (
+    idempotency_key_header,
+    request_fingerprint,
+    upload_digest,
+    find_idempotent_response,
+    store_idempotent_response,
+)
 
 router = APIRouter(
     prefix="/student/assignment-submission",
@@ -26,61 +39,83 @@ async def submit_assignment(
     assignment_id: UUID,
     file: UploadFile = File(...),
     current_user: User = Depends(is_student),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
     db: AsyncSession = Depends(get_db),
 ):
-    # 1️⃣ Fetch assignment with course + students eagerly
+    # 1️⃣ Fetch assignment
     result = await db.execute(
-        select(Assignment)
-        .where(Assignment.id == assignment_id)
-        .options(
-            selectinload(Assignment.course)
-            .selectinload(Course.students))
+        select(Assignment).where(Assignment.id == assignment_id)
     )
     assignment = result.scalar_one_or_none()
     if not assignment:
         raise HTTPException(404, "Assignment not found")
 
-    # 2️⃣ Check enrollment
-    if current_user.id not in [s.id for s in assignment.course.students]:
-        raise HTTPException(403, "You are not enrolled in this course")
+    # 2️⃣ Retried request: answer from the stored result, even past the deadline
+    scope = f"submit-assignment:{assignment.id}"
+    request_hash = request_fingerprint(scope, file.filename, await upload_digest(file))
+    replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+    if replay:
+        return replay
+
+    # 3️⃣ Check enrollment
+    await ensure_student_enrolled(assignment.course_id, current_user.id, db)
 
-    # 3️⃣ Check deadline
+    # 4️⃣ Check deadline
     if datetime.now(timezone.utc) > assignment.deadline:
         raise HTTPException(400, "Deadline has passed")
 
-    # 4️⃣ Prevent multiple submissions
-    result_sub = await db.execute(
-        select(AssignmentSubmission).where(
-            AssignmentSubmission.assignment_id == assignment.id,
-            AssignmentSubmission.student_id == current_user.id
+    filename = f"{assignment.id}_{current_user.id}_{file.filename}"
+    file_path = os.path.join(ASSIGNMENT_SUBMISSION_DIR, filename)
+    file_url = f"/uploads/assignment_submissions/{filename}"  # relative URL for DB
+
+    # 5️⃣ Create AssignmentSubmission record (unique per student; no read-before-write)
+    submission = await db.scalar(
+        pg_insert(AssignmentSubmission)
+        .values(
+            assignment_id=assignment.id,
+            student_id=current_user.id,
+            file_url=file_url,
         )
+        .on_conflict_do_nothing(constraint="uq_assignment_submissions_assignment_id_student_id")
+        .returning(AssignmentSubmission)
     )
-    existing_submission = result_sub.scalar_one_or_none()
-    if existing_submission:
+    if submission is None:
+        # A concurrent retry with the same key may have just committed
+        replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+        if replay:
+            return replay
         raise HTTPException(400, "You have already submitted this assignment")
 
-    # 5️⃣ Save uploaded file in assignment_submissions folder
-    filename = f"{assignment.id}_{current_user.id}_{file.filename}"
-    file_path = os.path.join(ASSIGNMENT_SUBMISSION_DIR, filename)
-
+    # 6️⃣ Save the upload under a temporary name; it only takes its final name
+    # once the row has committed, and is removed if anything fails before that
     os.makedirs(ASSIGNMENT_SUBMISSION_DIR, exist_ok=True)  # ensure folder exists
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.part"
 
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    try:
+        with open(temp_path, "wb") as f:
+            shutil.copyfileobj(file.file, f)
 
-    file_url = f"/uploads/assignment_submissions/{filename}"  # relative URL for DB
+        response_body = AssignmentSubmissionRead.model_validate(submission)
+        await record_assignment_submitted(assignment.course_id, current_user.id, db)
+        await store_idempotent_response(
+            db, current_user.id, idempotency_key, scope, request_hash, 200, response_body
+        )
+        emit_after_commit(
+            db,
+            ("certificate", assignment.course_id, current_user.id),
+            check_certificate_task,
+            assignment.course_id,
+            current_user.id,
+        )
+        await db.commit()
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
-    # 6️⃣ Create AssignmentSubmission record
-    submission = AssignmentSubmission(
-        assignment_id=assignment.id,
-        student_id=current_user.id,
-        file_url=file_url
-    )
-    db.add(submission)
-    await db.commit()
-    await db.refresh(submission)
+    os.replace(temp_path, file_path)
 
-    return submission
+    return response_body
 
 # ---------------------------
 # Get All Submissions of Current Student
@@ -1,15 +1,25 @@
 from fastapi import APIRouter,Depends,HTTPException
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from typing import Optional
 from uuid import UUID
 
 from app.database import get_db
 from app.models import Course,course_students,User
 from app.auth.dependencies import is_student
 from app.auth.course_access import ensure_student_enrolled
+from app.auth.enrollment_index import enrollment_index
 from app.schemas.course import EnrollmentResponse,StudentCourseListResponse
-from app.helpers.progress_calculator import get_course_progress,get_quiz_performance,get_assignment_performance
+from app.helpers.progress_calculator import get_performance_bulk
+from app.helpers.progress_tracker import get_tracked_progress
+from app.helpers.idempotency import (
+    idempotency_key_header,
+    request_fingerprint,
+    find_idempotent_response,
+    store_idempotent_response,
+)
 
 router=APIRouter(
     prefix="/student/course",
@@ -22,6 +32,7 @@ router=APIRouter(
 async def enroll_student(
     course_id: str,
     current_user: User = Depends(is_student),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -36,31 +47,42 @@ async def enroll_student(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # 2. Check if already enrolled
-    exists = await db.execute(
-        select(course_students)
-        .where(course_students.c.course_id == course_id)
-        .where(course_students.c.student_id == current_user.id)
-    )
-
-    if exists.first():
-        raise HTTPException(400, "Already enrolled in this course")
+    # 2. Retried request: answer from the stored result
+    scope = f"enroll:{course.id}"
+    request_hash = request_fingerprint(scope)
+    replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+    if replay:
+        return replay
 
-    # 3. Insert enrollment
-    await db.execute(
-        course_students.insert().values(
-            course_id=course_id,
+    # 3. Insert enrollment (primary key rejects duplicates; no read-before-write)
+    result = await db.execute(
+        pg_insert(course_students)
+        .values(
+            course_id=course.id,
             student_id=current_user.id
         )
+        .on_conflict_do_nothing()
+        .returning(course_students.c.course_id)
     )
+    if result.scalar_one_or_none() is None:
+        replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+        if replay:
+            return replay
+        raise HTTPException(400, "Already enrolled in this course")
 
-    await db.commit()
-
-    return EnrollmentResponse(
+    response = EnrollmentResponse(
         message="Enrolled successfully",
         course_id=course_id,
         student_id=str(current_user.id)
     )
+    await store_idempotent_response(
+        db, current_user.id, idempotency_key, scope, request_hash, 200, response
+    )
+
+    await db.commit()
+    enrollment_index.record_enrollment(current_user.id, course.id)
+
+    return response
 
 
 @router.get(
@@ -106,7 +128,9 @@ async def student_course_progress(
     # ensure enrollment
     await ensure_student_enrolled(course_id, current_user.id, db)
 
-    progress = await get_course_progress(course_id, current_user.id, db)
+    progress = await get_tracked_progress(course_id, current_user.id, db)
+    # Store the row if this read materialised it
+    await db.commit()
     return progress
 
 
@@ -119,12 +143,7 @@ async def student_course_performance(
     # Ensure student is enrolled
     await ensure_student_enrolled(course_id, current_user.id, db)
 
-    assignment_perf = await get_assignment_performance(course_id, current_user.id, db)
-    quiz_perf = await get_quiz_performance(course_id, current_user.id, db)
-
-    return {
-        "assignment": assignment_perf,
-        "quiz": quiz_perf
-    }
+    performance = await get_performance_bulk(course_id, [current_user.id], db)
+    return performance[current_user.id]
 
 
@@ -6,6 +6,9 @@ from app.database import get_db
 from app.models import Media, MediaProgress
 from app.auth.dependencies import is_student
 from app.auth.course_access import ensure_student_enrolled
+from app.helpers.progress_tracker import lock_progress, record_media_watched
+from app.helpers.certificate_assigner import check_certificate_task
+from app.helpers.task_queue import emit_after_commit
 from app.schemas.media_progress import (
     MediaProgressUpdate,
     MediaProgressResponse,
@@ -48,12 +51,17 @@ async def update_media_progress(
         db=db,
     )
 
-    # 4️⃣ Fetch existing progress
+    # 4️⃣ Fetch existing progress under the course-progress lock, so a
+    # concurrent update for the same student waits and then sees this one's
+    # committed row instead of applying the same delta twice
+    await lock_progress(media.course_id, current_user.id, db)
     progress = await db.scalar(
-        select(MediaProgress).where(
+        select(MediaProgress)
+        .where(
             MediaProgress.media_id == media.id,
             MediaProgress.student_id == current_user.id,
         )
+        .with_for_update()
     )
 
     # 5️⃣ Normalize seconds
@@ -67,6 +75,7 @@ async def update_media_progress(
         is_completed = watched_seconds >= int(media.duration_seconds * 0.9)
 
     # 7️⃣ Upsert logic
+    previous_seconds = (progress.watched_seconds or 0) if progress else 0
     if progress:
         progress.watched_seconds = max(
             progress.watched_seconds,
@@ -82,6 +91,19 @@ async def update_media_progress(
         )
         db.add(progress)
 
+    await record_media_watched(
+        media.course_id,
+        current_user.id,
+        (progress.watched_seconds or 0) - previous_seconds,
+        db,
+    )
+    emit_after_commit(
+        db,
+        ("certificate", media.course_id, current_user.id),
+        check_certificate_task,
+        media.course_id,
+        current_user.id,
+    )
     await db.commit()
     await db.refresh(progress)
 
@@ -2,12 +2,12 @@ from uuid import UUID
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models import Quiz,QuizQuestion,User
+from app.database import get_read_db
+from app.models import User
+from app.helpers.quiz_cache import get_quiz_definition
 from app.auth.dependencies import is_student
 from app.schemas.quiz import QuizDetailView
 from app.auth.course_access import ensure_student_enrolled
@@ -26,21 +26,12 @@ router=APIRouter(
 async def get_quiz_details(
     quiz_id: UUID,
     current_user: User = Depends(is_student),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # --------------------------
-    # Fetch quiz + questions + options + week
+    # Cached quiz definition (version-checked)
     # --------------------------
-    result = await db.execute(
-        select(Quiz)
-        .options(
-            selectinload(Quiz.week),
-            selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options),
-        )
-        .where(Quiz.id == quiz_id)
-    )
-    quiz = result.scalar_one_or_none()
+    quiz = await get_quiz_definition(quiz_id, db)
 
     if not quiz:
         raise HTTPException(404, "Quiz not found")
@@ -53,42 +44,8 @@ async def get_quiz_details(
             student_id=current_user.id,
             db=db,
         )
-    
-            
-
-    # --------------------------
-    # Week mapping
-    # --------------------------
-    week_data = None
-    if quiz.week:
-        week_data = {
-            "week_number": quiz.week.week_number,
-            "title": quiz.week.title,
-        }
 
     # --------------------------
-    # Response
+    # Response (pre-serialized, no correct answers)
     # --------------------------
-    return QuizDetailView(
-        id=quiz.id,
-        title=quiz.title,
-        description=quiz.description,
-        total_marks=quiz.total_marks,
-        time_limit_minutes=quiz.time_limit_minutes,
-        week=week_data,
-        questions=[
-            {
-                "id": q.id,
-                "question_text": q.question_text,
-                "marks": q.marks,
-                "options": [
-                    {
-                        "id": opt.id,
-                        "option_text": opt.option_text,
-                    }
-                    for opt in q.options
-                ],
-            }
-            for q in quiz.questions
-        ],
-    )
+    return Response(content=quiz.student_payload, media_type="application/json")
@@ -1,19 +1,50 @@
-from fastapi import APIRouter,Depends,HTTPException
+import uuid
+from fastapi import APIRouter,Depends,HTTPException,Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.future import select
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from typing import Optional
 from uuid import UUID
 
 from app.database import get_db
-from app.auth.dependencies import is_student
+from app.auth.dependencies import is_student,load_user_snapshot
 from app.auth.course_access import ensure_student_enrolled
 from app.helpers.quiz_answer_evaluator import evaluate_quiz_answers
-from app.helpers.certificate_assigner import issue_certificate_if_completed
-from app.models import Quiz,QuizSubmission,User,QuizQuestion,QuizAnswer,Course
+from app.helpers.quiz_cache import get_quiz_definition
+from app.helpers.certificate_assigner import check_certificate_task
+from app.helpers.task_queue import emit_after_commit
+from app.helpers.progress_tracker import record_quiz_submitted
+from app.helpers.quiz_analytics import quiz_analytics_cache
+from app.helpers.quiz_results import (
+    build_result_snapshot,
+    store_result_snapshots,
+    load_result_snapshot,
+    snapshot_response,
+    etag_matches,
+    quiz_result_cache,
+)
+from app.helpers.quiz_ingest import (
+    QUIZ_BURST_MODE,
+    stage_quiz_submission,
+    lock_quiz_submission,
+    find_staged_response,
+    staged_status,
+    REJECTED_DETAIL,
+    quiz_ingestor,
+)
+from app.helpers.idempotency import (
+    idempotency_key_header,
+    request_fingerprint,
+    find_idempotent_response,
+    store_idempotent_response,
+)
+from app.models import QuizSubmission,User,QuizAnswer
 from app.schemas.quiz_submission import (
     QuizSubmitRequest,QuizSubmitResponse,
-    QuizSubmissionDetailView,QuizQuestionResult,
-    QuizOptionResult
+    QuizSubmissionDetailView
 )
 
 router=APIRouter(
@@ -30,24 +61,29 @@ async def submit_quiz(
     quiz_id: UUID,
     payload: QuizSubmitRequest,
     current_user: User = Depends(is_student),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
     db: AsyncSession = Depends(get_db),
 ):
     # --------------------------
-    # Fetch quiz with questions
+    # Cached quiz definition + grading key
     # --------------------------
-    result = await db.execute(
-        select(Quiz)
-        .options(
-            selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options)
-        )
-        .where(Quiz.id == quiz_id)
-    )
-    quiz = result.scalar_one_or_none()
+    quiz = await get_quiz_definition(quiz_id, db)
 
     if not quiz:
         raise HTTPException(404, "Quiz not found")
 
+    # --------------------------
+    # Retried request: answer from the stored result
+    # --------------------------
+    scope = f"submit-quiz:{quiz.id}"
+    request_hash = request_fingerprint(scope, payload.model_dump_json())
+    replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+    if replay is None and QUIZ_BURST_MODE:
+        # Accepted in burst mode, not written yet
+        replay = await find_staged_response(db, current_user.id, idempotency_key, scope, request_hash)
+    if replay:
+        return replay
+
     # --------------------------
     # Enrollment check
     # --------------------------
@@ -58,55 +94,138 @@ async def submit_quiz(
     )
 
     # --------------------------
-    # Prevent re-submission
+    # Evaluate answers against the cached key
     # --------------------------
-    result = await db.execute(
-        select(QuizSubmission).where(
-            QuizSubmission.quiz_id == quiz.id,
-            QuizSubmission.student_id == current_user.id,
-        )
+    submission_id = uuid.uuid4()
+    total_score, answer_rows = evaluate_quiz_answers(
+        quiz=quiz,
+        submission_id=submission_id,
+        answers_payload=payload.answers,
     )
-    if result.scalar_one_or_none():
-        raise HTTPException(400, "You have already submitted this quiz")
+    response_body = {
+        "submission_id": submission_id,
+        "quiz_id": quiz.id,
+        "total_score": total_score,
+    }
 
     # --------------------------
-    # Create submission
+    # Exam-burst mode: stage durably, acknowledge, write in the background.
+    # The lock and staging check are only needed while staged rows can exist.
     # --------------------------
-    submission = QuizSubmission(
-        quiz_id=quiz.id,
-        student_id=current_user.id,
-    )
-    db.add(submission)
-    await db.flush()
+    staging_active = quiz_ingestor.staging_active
+    if staging_active:
+        await lock_quiz_submission(quiz.id, current_user.id, db)
+
+    if QUIZ_BURST_MODE and quiz_ingestor.running:
+        result = await db.execute(
+            select(QuizSubmission.id).where(
+                QuizSubmission.quiz_id == quiz.id,
+                QuizSubmission.student_id == current_user.id,
+            )
+        )
+        if result.first():
+            raise HTTPException(400, "You have already submitted this quiz")
+
+        # The staging unique constraint decides between concurrent
+        # submissions, whichever process they reach
+        staged = await stage_quiz_submission(
+            db,
+            quiz,
+            submission_id,
+            current_user.id,
+            total_score,
+            answer_rows,
+            idempotency=(
+                {
+                    "key": idempotency_key,
+                    "scope": scope,
+                    "request_hash": request_hash,
+                    "response_body": response_body,
+                }
+                if idempotency_key else None
+            ),
+        )
+        if not staged:
+            # A concurrent retry with the same key may have just been staged
+            replay = await find_staged_response(db, current_user.id, idempotency_key, scope, request_hash)
+            if replay:
+                return replay
+            raise HTTPException(400, "You have already submitted this quiz")
+
+        await db.commit()
+        quiz_ingestor.notify()
+        return JSONResponse(status_code=202, content=jsonable_encoder(response_body))
 
     # --------------------------
-    # Evaluate answers (NEW)
+    # Synchronous write: never while a submission acknowledged in burst
+    # mode is still staged (checked under the same lock as staging)
     # --------------------------
-    total_score, answer_rows = evaluate_quiz_answers(
-        quiz=quiz,
-        submission_id=submission.id,
-        answers_payload=payload.answers,
+    if staging_active and await staged_status(quiz.id, current_user.id, db) == "pending":
+        replay = await find_staged_response(db, current_user.id, idempotency_key, scope, request_hash)
+        if replay:
+            return replay
+        raise HTTPException(400, "You have already submitted this quiz")
+
+    # --------------------------
+    # Create submission (unique per student; no read-before-write)
+    # --------------------------
+    result = await db.execute(
+        pg_insert(QuizSubmission)
+        .values(
+            id=submission_id,
+            quiz_id=quiz.id,
+            student_id=current_user.id,
+            total_score=total_score,
+        )
+        .on_conflict_do_nothing(constraint="uq_quiz_submissions_quiz_id_student_id")
+        .returning(QuizSubmission.submitted_at)
     )
+    submitted_at = result.scalar_one_or_none()
+    if submitted_at is None:
+        # A concurrent retry with the same key may have just committed
+        replay = await find_idempotent_response(db, current_user.id, idempotency_key, scope, request_hash)
+        if replay:
+            return replay
+        raise HTTPException(400, "You have already submitted this quiz")
 
-    submission.total_score = total_score
-    db.add_all(answer_rows)
+    if answer_rows:
+        await db.execute(insert(QuizAnswer), answer_rows)
+    await record_quiz_submitted(quiz.course_id, current_user.id, db)
+
+    # Result view is rendered once here and served from the snapshot
+    student = await load_user_snapshot(current_user, db)
+    await store_result_snapshots([
+        build_result_snapshot(
+            quiz,
+            submission_id,
+            current_user.id,
+            student.roll_number,
+            submitted_at,
+            total_score,
+            {row["question_id"]: row["selected_option_id"] for row in answer_rows},
+        )
+    ], db)
+
+    await store_idempotent_response(
+        db, current_user.id, idempotency_key, scope, request_hash, 201, response_body
+    )
+
+    # Certificate check runs in the background once this commit succeeds
+    emit_after_commit(
+        db,
+        ("certificate", quiz.course_id, current_user.id),
+        check_certificate_task,
+        quiz.course_id,
+        current_user.id,
+    )
 
     # --------------------------
     # Commit
     # --------------------------
     await db.commit()
-    await db.refresh(submission)
+    quiz_analytics_cache.invalidate(quiz.id)
 
-    result_course = await db.execute(select(Course).where(Course.id == quiz.course_id))
-    course = result_course.scalar_one_or_none()
-    if course and course.is_course_ended:
-        await issue_certificate_if_completed(course.id, current_user.id, db)
-
-    return {
-        "submission_id": submission.id,
-        "quiz_id": quiz.id,
-        "total_score": total_score,
-    }
+    return response_body
 
 @router.get(
     "/my-quiz-result/{quiz_id}",
@@ -114,22 +233,20 @@ async def submit_quiz(
 )
 async def get_my_quiz_result(
     quiz_id: UUID,
+    request: Request,
     current_user: User = Depends(is_student),
     db: AsyncSession = Depends(get_db),
 ):
     # --------------------------
-    # Fetch quiz
+    # Cached quiz definition (a version probe on a hit)
     # --------------------------
-    result = await db.execute(
-        select(Quiz).where(Quiz.id == quiz_id)
-    )
-    quiz = result.scalar_one_or_none()
+    quiz = await get_quiz_definition(quiz_id, db)
 
     if not quiz:
         raise HTTPException(404, "Quiz not found")
 
     # --------------------------
-    # Enrollment check
+    # Enrollment check (cached membership set)
     # --------------------------
     await ensure_student_enrolled(
         course_id=quiz.course_id,
@@ -138,86 +255,30 @@ async def get_my_quiz_result(
     )
 
     # --------------------------
-    # Fetch student's submission
+    # Revalidation of a result this process rendered under the current
+    # quiz version: no further queries
     # --------------------------
-    result = await db.execute(
-        select(QuizSubmission)
-        .options(
-            selectinload(QuizSubmission.answers)
-            .selectinload(QuizAnswer.selected_option),
-            selectinload(QuizSubmission.quiz)
-            .selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options),
-            selectinload(QuizSubmission.student),
-        )
-        .where(
-            QuizSubmission.quiz_id == quiz_id,
-            QuizSubmission.student_id == current_user.id,
-        )
-    )
-    submission = result.scalar_one_or_none()
-
-    if not submission:
-        raise HTTPException(
-            status_code=403,
-            detail="You have not submitted this quiz",
-        )
+    cached = quiz_result_cache.by_student(quiz, current_user.id)
+    if cached and etag_matches(request.headers.get("if-none-match"), cached.etag_header):
+        return snapshot_response(cached, request)
 
     # --------------------------
-    # Build question results
+    # Rendered result snapshot
     # --------------------------
-    question_map = {q.id: q for q in submission.quiz.questions}
-    answers_map = {a.question_id: a for a in submission.answers}
-
-    question_results = []
-
-    for q in submission.quiz.questions:
-        correct_option = next(
-            opt for opt in q.options if opt.is_correct
-        )
-
-        student_answer = answers_map.get(q.id)
-        selected_option = student_answer.selected_option if student_answer else None
-
-        is_correct = (
-            selected_option.id == correct_option.id
-            if selected_option
-            else False
-        )
+    snapshot = await load_result_snapshot(quiz, db, student_id=current_user.id)
 
-        question_results.append(
-            QuizQuestionResult(
-                id=q.id,
-                question_text=q.question_text,
-                marks=q.marks,
-                selected_option=(
-                    QuizOptionResult(
-                        id=selected_option.id,
-                        option_text=selected_option.option_text,
-                        is_correct=selected_option.is_correct,
-                    )
-                    if selected_option
-                    else None
-                ),
-                correct_option=QuizOptionResult(
-                    id=correct_option.id,
-                    option_text=correct_option.option_text,
-                    is_correct=True,
-                ),
-                is_correct=is_correct,
-            )
+    if not snapshot:
+        # Accepted in burst mode: not written yet, or lost to another submission
+        status = await staged_status(quiz.id, current_user.id, db)
+        if status == "pending":
+            raise HTTPException(409, "Your submission is still being processed")
+        if status == "rejected":
+            raise HTTPException(409, REJECTED_DETAIL)
+        raise HTTPException(
+            status_code=403,
+            detail="You have not submitted this quiz",
         )
+    # Keeps a snapshot rendered on first view
+    await db.commit()
 
-    # --------------------------
-    # Response
-    # --------------------------
-    return QuizSubmissionDetailView(
-        submission_id=submission.id,
-        quiz_id=submission.quiz_id,
-        quiz_title=submission.quiz.title,
-        student_id=current_user.id,
-        student_roll_number=current_user.roll_number,
-        submitted_at=submission.submitted_at,
-        total_score=submission.total_score,
-        questions=question_results,
-    )
+    return snapshot_response(snapshot, request)
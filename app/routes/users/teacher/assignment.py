@@ -9,6 +9,7 @@ from app.database import get_db
 from app.auth.dependencies import is_teacher
 from app.schemas.assignment import AssignmentCreate,AssignmentLite,AssignmentBulkDelete,AssignmentUpdate
 from app.helpers.file_paths import delete_assignment_file_safely
+from app.helpers.progress_tracker import refresh_course_totals, refresh_course
 
 router = APIRouter(
     prefix="/teacher/assignment",
@@ -73,6 +74,7 @@ async def create_assignment(
     )
 
     db.add(new_assignment)
+    await refresh_course_totals(course.id, db)
     await db.commit()
     await db.refresh(new_assignment)
 
@@ -177,6 +179,7 @@ async def delete_global_assignment(
         delete_assignment_file_safely(submission.file_url)
 
     await db.delete(assignment)
+    await refresh_course(assignment.course_id, db)
     await db.commit()
     return {"detail": "Assignment deleted successfully"}
 
@@ -206,6 +209,9 @@ async def bulk_delete_assignments(
         for submission in assignment.submissions:
             delete_assignment_file_safely(submission.file_url)
         await db.delete(assignment)
+
+    for course_id in {assignment.course_id for assignment in assignments}:
+        await refresh_course(course_id, db)
     await db.commit()
     return {"detail": f"{len(assignments)} assignments deleted successfully"}
 
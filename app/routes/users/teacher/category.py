@@ -3,14 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete,func
 from typing import List
 from uuid import UUID
-from datetime import datetime
 from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.auth.dependencies import is_teacher,get_current_user
+from app.auth.dependencies import is_teacher,get_current_principal
 from app.models import CourseCategory,CourseWeek,Course,User
 from app.schemas.course import CourseBasicItem,StudentCoursesCursorResponse
 from app.schemas.category import CategoryItem
+from app.helpers.pagination import apply_keyset, split_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(
     prefix="/teacher/categories", 
@@ -160,17 +160,11 @@ async def list_categories(
 )
 async def list_courses_by_category(
     category_id: UUID,
-    cursor: str | None = Query(None, description="Cursor timestamp"),
-    limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    cursor_time = None
-    if cursor:
-        try:
-            cursor_time = datetime.fromisoformat(cursor)
-        except Exception:
-            raise HTTPException(400, "Invalid cursor timestamp")
     query = (
         select(Course)
         .join(Course.categories)
@@ -178,21 +172,10 @@ async def list_courses_by_category(
         .options(selectinload(Course.categories))
     )
 
-    if cursor_time:
-        query = query.where(Course.created_at < cursor_time)
-
-    query = query.order_by(
-        Course.created_at.desc(),
-        Course.id.desc()
-    ).limit(limit + 1)
+    query = apply_keyset(query, Course.created_at, Course.id, cursor, limit)
 
     result = await db.execute(query)
-    courses = result.scalars().all()
-    if len(courses) > limit:
-        next_cursor = courses[limit-1].created_at.isoformat()
-        courses = courses[:limit]
-    else:
-        next_cursor = None
+    courses, next_cursor = split_page(result.scalars().all(), limit)
 
 
     course_ids = [c.id for c in courses]
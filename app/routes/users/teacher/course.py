@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException,Query,Form,UploadFile,File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from datetime import datetime
 import os
 from uuid import uuid4,UUID
 import aiofiles
@@ -11,10 +10,13 @@ from typing import Optional,List
 from app.database import get_db
 from app.models import Course, User,Media,Assignment,course_students,CourseCategory
 from app.helpers.file_paths import get_thumbnail_fs_path,get_media_fs_path,THUMBNAIL_UPLOAD_DIR,delete_assignment_file_safely
-from app.helpers.progress_calculator import get_assignment_performance,get_quiz_performance
+from app.helpers.progress_calculator import get_performance_bulk
+from app.helpers.course_finalizer import course_finalizer
 from app.schemas.course import CourseBulkDelete,MyCoursesCursorResponse,CourseItem
 from app.schemas.category import CategoryItem
 from app.auth.dependencies import is_teacher
+from app.auth.enrollment_index import enrollment_index
+from app.helpers.pagination import apply_keyset, split_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 router = APIRouter(
@@ -83,6 +85,7 @@ async def create_course(
     db.add(new_course)
     await db.commit()
     await db.refresh(new_course)
+    enrollment_index.record_course_created(current_user.id, new_course.id)
 
     return {
         "message": "Course created successfully",
@@ -139,6 +142,7 @@ async def update_course(
             )
             categories = result.scalars().all()
             course.categories = categories
+    course_just_ended = bool(is_course_ended) and not course.is_course_ended
     if is_course_ended is not None:
         course.is_course_ended = is_course_ended
 
@@ -172,11 +176,65 @@ async def update_course(
         await db.rollback()
         raise
 
-    return {
+    response = {
         "message": "Course updated successfully",
         "course_id": str(course.id)
     }
 
+    # Issue certificates in the background once the course ends
+    if course_just_ended:
+        job = course_finalizer.start(course.id)
+        response["finalization_job_id"] = str(job.job_id)
+
+    return response
+
+
+@router.post("/finalize/{course_id}", status_code=202)
+async def finalize_course(
+    course_id: UUID,
+    current_user: User = Depends(is_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Re-run certificate issuance for an ended course (e.g. after a restart).
+    """
+    result = await db.execute(select(Course).where(Course.id == course_id))
+    course = result.scalars().first()
+
+    if not course:
+        raise HTTPException(404, "Course not found")
+
+    if course.instructor_id != current_user.id:
+        raise HTTPException(403, "Not allowed to finalize this course")
+
+    if not course.is_course_ended:
+        raise HTTPException(400, "Course has not ended yet")
+
+    job = course_finalizer.start(course.id)
+    return job.to_dict()
+
+
+@router.get("/finalization-status/{course_id}")
+async def get_finalization_status(
+    course_id: UUID,
+    current_user: User = Depends(is_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(select(Course).where(Course.id == course_id))
+    course = result.scalars().first()
+
+    if not course:
+        raise HTTPException(404, "Course not found")
+
+    if course.instructor_id != current_user.id:
+        raise HTTPException(403, "Not allowed to view this course")
+
+    job = course_finalizer.latest_for_course(course.id)
+    if not job:
+        raise HTTPException(404, "No finalization job for this course")
+
+    return job.to_dict()
+
 @router.delete("/delete-course/{course_id}")
 async def delete_course(
     course_id: UUID,
@@ -226,7 +284,9 @@ async def delete_course(
             os.remove(fs_path)
 
     await db.delete(course)
+    await enrollment_index.publish_course_deleted(course.id, db)
     await db.commit()
+    enrollment_index.record_course_deleted(course_id)
 
     return {"message": "Course deleted successfully", "course_id": course_id}
 
@@ -281,9 +341,12 @@ async def bulk_delete_courses(
                 os.remove(fs_path)
 
         await db.delete(course)
+        await enrollment_index.publish_course_deleted(course.id, db)
         deleted.append(course.id)
 
     await db.commit()
+    for course_id in deleted:
+        enrollment_index.record_course_deleted(course_id)
 
     return {
         "message": "Bulk delete completed",
@@ -295,25 +358,15 @@ async def bulk_delete_courses(
 
 @router.get("/my-courses",response_model=MyCoursesCursorResponse)
 async def list_my_courses_cursor(
-    cursor: str | None = Query(None, description="Timestamp cursor for pagination"),
-    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(is_teacher),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Cursor-based pagination for teacher's courses.
-    Ultra-fast and efficient (no OFFSET).
+    Keyset on (created_at, id), so no OFFSET and no skipped rows on timestamp ties.
     """
-    print(f"{cursor} <-This is cursor")
-    # Convert cursor string to datetime if provided
-    cursor_time = None
-    if cursor:
-        try:
-            cursor_time = datetime.fromisoformat(cursor)
-            print("For Real")
-        except Exception:
-            raise HTTPException(400, "Invalid cursor timestamp")
-
     # Base query
     query = (
             select(Course)
@@ -321,22 +374,13 @@ async def list_my_courses_cursor(
             options(selectinload(Course.categories))
             )
 
-    # Add cursor condition (fetch older items only)
-    if cursor_time:
-        query = query.where(Course.created_at < cursor_time)
-
-    # Order + limit (fetch 1 extra to detect next cursor)
-    query = query.order_by(Course.created_at.desc()).limit(limit+1)
+    # Cursor condition + stable order + limit (fetch 1 extra to detect next cursor)
+    query = apply_keyset(query, Course.created_at, Course.id, cursor, limit)
 
     result = await db.execute(query)
-    courses = result.scalars().all()
 
     # Determine next cursor
-    if len(courses) > limit:
-        next_cursor = courses[limit-1].created_at.isoformat()
-        courses = courses[:limit]
-    else:
-        next_cursor = None
+    courses, next_cursor = split_page(result.scalars().all(), limit)
 
     return MyCoursesCursorResponse(
         teacher_id=str(current_user.id),
@@ -368,8 +412,8 @@ async def list_my_courses_cursor(
 @router.get("/students-performance/{course_id}")
 async def get_course_students_performance(
     course_id: UUID,
-    cursor: Optional[str] = Query(None, description="Use to fetch next batch after this created_at ISO timestamp"),
-    limit: int = Query(10, description="Number of students to fetch per request"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous batch"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of students to fetch per request"),
     current_user: User = Depends(is_teacher),
     db: AsyncSession = Depends(get_db),
 ):
@@ -384,32 +428,27 @@ async def get_course_students_performance(
         raise HTTPException(403, "You are not the instructor of this course")
 
     # --------------------------
-    # Fetch students with cursor using created_at
+    # Fetch students with keyset cursor on (created_at, id)
     # --------------------------
     query = select(User).join(course_students, course_students.c.student_id == User.id).where(
         course_students.c.course_id == course_id
     )
-    if cursor:
-        try:
-            cursor_dt = datetime.fromisoformat(cursor)
-        except ValueError:
-            raise HTTPException(400, "Invalid cursor format. Use ISO datetime string.")
-        query = query.where(User.created_at > cursor_dt)
-
-    query = query.order_by(User.created_at).limit(limit)
+    query = apply_keyset(query, User.created_at, User.id, cursor, limit, descending=False)
     result = await db.execute(query)
-    students = result.scalars().all()
+    students, next_cursor = split_page(result.scalars().all(), limit)
 
     if not students:
         return {"course_id": course.id, "course_name": course.name, "students_performance": [], "next_cursor": None}
 
     # --------------------------
-    # Calculate performance
+    # Calculate performance (one grouped query for the whole page)
     # --------------------------
+    performance = await get_performance_bulk(course_id, [student.id for student in students], db)
+
     students_data = []
     for student in students:
-        assignment_perf = await get_assignment_performance(course_id, student.id, db)
-        quiz_perf = await get_quiz_performance(course_id, student.id, db)
+        assignment_perf = performance[student.id]["assignment"]
+        quiz_perf = performance[student.id]["quiz"]
         students_data.append({
             "student_id": student.id,
             "student_name": student.name,
@@ -423,9 +462,6 @@ async def get_course_students_performance(
             "quiz_percentage": quiz_perf["percentage"],
         })
 
-    # Last student created_at for next cursor
-    next_cursor = students_data[-1]["created_at"].isoformat() if students_data else None
-
     return {
         "course_id": course.id,
         "course_name": course.name,
@@ -11,6 +11,7 @@ from typing import Optional
 from app.models import User, Course, CourseWeek, Media
 from app.database import get_db
 from app.helpers.file_paths import MEDIA_UPLOAD_DIR, get_media_fs_path
+from app.helpers.progress_tracker import refresh_course_totals, refresh_course
 from app.auth.dependencies import is_teacher
 from app.schemas.media import MediaBulkDelete
 
@@ -93,6 +94,7 @@ async def upload_media(
     )
 
     db.add(media)
+    await refresh_course_totals(course.id, db)
     await db.commit()
     await db.refresh(media)
 
@@ -186,6 +188,7 @@ async def update_media(
         media.file_url = f"/uploads/media/{new_filename}"
 
     db.add(media)
+    await refresh_course_totals(media.course_id, db)
     await db.commit()
     await db.refresh(media)
 
@@ -232,6 +235,7 @@ async def delete_media(
 
     # Delete from DB
     await db.delete(media)
+    await refresh_course(media.course_id, db)
     await db.commit()
 
     return {"message": "Media deleted successfully", "media_id": str(media.id)}
@@ -246,6 +250,7 @@ async def bulk_delete_media(
     db: AsyncSession = Depends(get_db),
 ):
     deleted_ids = []
+    affected_courses = set()
 
     for media_id in payload.media_ids:
         try:
@@ -270,7 +275,10 @@ async def bulk_delete_media(
         # Delete DB record
         await db.delete(media)
         deleted_ids.append(str(media.id))
+        affected_courses.add(media.course_id)
 
+    for course_id in affected_courses:
+        await refresh_course(course_id, db)
     await db.commit()
 
     return {
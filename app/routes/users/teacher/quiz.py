@@ -1,14 +1,28 @@
 # app/routes/users/teacher/quizzes.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+import uuid
 from uuid import UUID
 
 from app.database import get_db
 from app.auth.dependencies import is_teacher
-from app.models import Course, Quiz, CourseWeek, User,QuizQuestion,QuizOption
-from app.schemas.quiz import QuizCreate, QuizCreateResponse,QuizUpdate,QuizDetailView
+from app.models import Course, Quiz, CourseWeek, User
+from app.schemas.quiz import QuizCreate, QuizCreateResponse,QuizUpdate,QuizUpdateResponse,QuizDetailView
+from app.helpers.progress_tracker import refresh_course_totals
+from app.helpers.quiz_cache import get_quiz_definition, bump_quiz_version, quiz_cache
+from app.helpers.quiz_analytics import quiz_analytics_cache
+from app.helpers.quiz_results import discard_quiz_snapshots
+from app.helpers.quiz_authoring import (
+    validate_quiz_questions,
+    insert_quiz_questions,
+    load_quiz_structure,
+    diff_quiz_questions,
+    apply_quiz_question_diff,
+    count_lost_answers,
+    quiz_has_submissions,
+)
 
 router = APIRouter(
     prefix="/teacher/quiz",
@@ -40,6 +54,11 @@ async def create_quiz(
     if course.instructor_id != current_user.id:
         raise HTTPException(403, "Only course instructor can create quizzes")
 
+    # --------------------------
+    # Validate questions before any write
+    # --------------------------
+    validate_quiz_questions(quiz_in.questions)
+
     # --------------------------
     # Optional week validation
     # --------------------------
@@ -59,6 +78,7 @@ async def create_quiz(
     # Create quiz
     # --------------------------
     quiz = Quiz(
+        id=uuid.uuid4(),
         course_id=course.id,
         instructor_id=current_user.id,
         title=quiz_in.title,
@@ -69,38 +89,17 @@ async def create_quiz(
     )
 
     db.add(quiz)
-    await db.flush()  # ⬅ get quiz.id without commit
+    await db.flush()  # ⬅ quiz row must exist before its questions
 
     # --------------------------
-    # Create questions & options
+    # Create questions & options (two multi-row inserts)
     # --------------------------
-    for q in quiz_in.questions:
-        question = QuizQuestion(
-            quiz_id=quiz.id,
-            question_text=q.question_text,
-            marks=q.marks,
-        )
-        db.add(question)
-        await db.flush()
-
-        # Validation: at least one correct option
-        if not any(opt.is_correct for opt in q.options):
-            raise HTTPException(
-                400,
-                f"Question '{q.question_text}' must have at least one correct option"
-            )
-
-        for opt in q.options:
-            option = QuizOption(
-                question_id=question.id,
-                option_text=opt.option_text,
-                is_correct=opt.is_correct,
-            )
-            db.add(option)
+    await insert_quiz_questions(quiz.id, quiz_in.questions, db)
 
     # --------------------------
     # Commit transaction
     # --------------------------
+    await refresh_course_totals(course.id, db)
     await db.commit()
     await db.refresh(quiz)
 
@@ -113,11 +112,14 @@ async def create_quiz(
 
 @router.put(
     "/update-quiz/{quiz_id}",
-    response_model=QuizCreateResponse,
+    response_model=QuizUpdateResponse,
 )
 async def update_quiz(
     quiz_id: UUID,
     quiz_in: QuizUpdate,
+    allow_answer_loss: bool = Query(
+        False, description="Allow removing questions/options that students have answered"
+    ),
     current_user: User = Depends(is_teacher),
     db: AsyncSession = Depends(get_db),
 ):
@@ -125,12 +127,7 @@ async def update_quiz(
     # Fetch quiz
     # --------------------------
     result = await db.execute(
-        select(Quiz)
-        .options(
-            selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options)
-        )
-        .where(Quiz.id == quiz_id)
+        select(Quiz).where(Quiz.id == quiz_id)
     )
     quiz = result.scalar_one_or_none()
 
@@ -143,6 +140,35 @@ async def update_quiz(
     if quiz.instructor_id != current_user.id:
         raise HTTPException(403, "Only quiz instructor can update")
 
+    # --------------------------
+    # Validate questions and diff against stored ones before any write
+    # --------------------------
+    validate_quiz_questions(quiz_in.questions)
+    existing = await load_quiz_structure(quiz.id, db)
+    diff = diff_quiz_questions(quiz.id, existing, quiz_in.questions)
+
+    # --------------------------
+    # Refuse to discard students' answers unless explicitly allowed
+    # --------------------------
+    if not allow_answer_loss:
+        if (
+            existing
+            and all(q.id is None for q in quiz_in.questions)
+            and await quiz_has_submissions(quiz.id, db)
+        ):
+            raise HTTPException(
+                409,
+                "Quiz has submissions and no question carries an id, so every stored "
+                "question would be replaced; send question ids or pass allow_answer_loss=true",
+            )
+
+        lost = await count_lost_answers(diff, db)
+        if lost:
+            raise HTTPException(
+                409,
+                f"Update would discard {lost} stored answers; pass allow_answer_loss=true to proceed",
+            )
+
     # --------------------------
     # Optional week validation
     # --------------------------
@@ -166,42 +192,18 @@ async def update_quiz(
     quiz.total_marks = quiz_in.total_marks
     quiz.time_limit_minutes = quiz_in.time_limit_minutes
     quiz.week_id = quiz_in.week_id
-
-    # --------------------------
-    # Delete old questions (cascade deletes options)
-    # --------------------------
-    for question in quiz.questions:
-        await db.delete(question)
+    bump_quiz_version(quiz)
 
     await db.flush()
 
     # --------------------------
-    # Recreate questions & options
+    # Apply question/option diff (in place, bulk)
     # --------------------------
-    for q in quiz_in.questions:
-        # Validation
-        if not any(opt.is_correct for opt in q.options):
-            raise HTTPException(
-                400,
-                f"Question '{q.question_text}' must have at least one correct option"
-            )
+    await apply_quiz_question_diff(diff, db)
+    # Result views embed quiz content; re-rendered on next view or regrade
+    await discard_quiz_snapshots(quiz.id, db)
 
-        question = QuizQuestion(
-            quiz_id=quiz.id,
-            question_text=q.question_text,
-            marks=q.marks,
-        )
-        db.add(question)
-        await db.flush()
-
-        for opt in q.options:
-            db.add(
-                QuizOption(
-                    question_id=question.id,
-                    option_text=opt.option_text,
-                    is_correct=opt.is_correct,
-                )
-            )
+    requires_regrade = diff.grading_changed and await quiz_has_submissions(quiz.id, db)
 
     # --------------------------
     # Commit
@@ -214,6 +216,8 @@ async def update_quiz(
         "title": quiz.title,
         "total_marks": quiz.total_marks,
         "question_count": len(quiz_in.questions),
+        "version": quiz.version,
+        "changes": {**diff.summary(), "requires_regrade": requires_regrade},
     }
 
 @router.delete(
@@ -229,9 +233,7 @@ async def delete_quiz(
     # Fetch quiz
     # --------------------------
     result = await db.execute(
-        select(Quiz)
-        .options(selectinload(Quiz.submissions))
-        .where(Quiz.id == quiz_id)
+        select(Quiz).where(Quiz.id == quiz_id)
     )
     quiz = result.scalar_one_or_none()
 
@@ -247,7 +249,7 @@ async def delete_quiz(
     # --------------------------
     # Block deletion if submitted
     # --------------------------
-    if quiz.submissions:
+    if await quiz_has_submissions(quiz.id, db):
         raise HTTPException(
             400,
             "Cannot delete quiz after students have submitted"
@@ -257,7 +259,10 @@ async def delete_quiz(
     # Delete quiz (cascade)
     # --------------------------
     await db.delete(quiz)
+    await refresh_course_totals(quiz.course_id, db)
     await db.commit()
+    quiz_cache.invalidate(quiz.id)
+    quiz_analytics_cache.invalidate(quiz.id)
 
     return None
 
@@ -272,18 +277,9 @@ async def get_quiz_details_teacher(
     db: AsyncSession = Depends(get_db),
 ):
     # --------------------------
-    # Fetch quiz + questions + options + week
+    # Cached quiz definition (version-checked)
     # --------------------------
-    result = await db.execute(
-        select(Quiz)
-        .options(
-            selectinload(Quiz.week),
-            selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options)
-        )
-        .where(Quiz.id == quiz_id)
-    )
-    quiz = result.scalar_one_or_none()
+    quiz = await get_quiz_definition(quiz_id, db)
 
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -295,39 +291,6 @@ async def get_quiz_details_teacher(
         raise HTTPException(status_code=403, detail="You are not the instructor of this quiz")
 
     # --------------------------
-    # Week mapping
-    # --------------------------
-    week_data = None
-    if quiz.week:
-        week_data = {
-            "week_number": quiz.week.week_number,
-            "title": quiz.week.title,
-        }
-
-    # --------------------------
-    # Response
-    # --------------------------
-    return QuizDetailView(
-        id=quiz.id,
-        title=quiz.title,
-        description=quiz.description,
-        total_marks=quiz.total_marks,
-        time_limit_minutes=quiz.time_limit_minutes,
-        week=week_data,
-        questions=[
-            {
-                "id": q.id,
-                "question_text": q.question_text,
-                "marks": q.marks,
-                "options": [
-                    {
-                        "id": opt.id,
-                        "option_text": opt.option_text,
-                        "is_correct": opt.is_correct,  # original answer included
-                    }
-                    for opt in q.options
-                ],
-            }
-            for q in quiz.questions
-        ],
-    )
+    # Response (pre-serialized, correct answers included)
+    # --------------------------
+    return Response(content=quiz.teacher_payload, media_type="application/json")
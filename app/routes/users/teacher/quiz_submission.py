@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from uuid import UUID
 
 from app.database import get_db
-from app.models import Quiz, QuizSubmission, User,QuizAnswer,QuizQuestion
+from app.models import Quiz, QuizSubmission, User
 from app.auth.dependencies import is_teacher
-from app.schemas.quiz_submission import QuizSubmissionListItem,QuizOptionResult,QuizQuestionResult,QuizSubmissionDetailView
+from app.schemas.quiz_submission import QuizSubmissionListItem,QuizSubmissionDetailView,QuizAnalyticsView
+from app.helpers.quiz_cache import get_quiz_definition, bump_quiz_version_by_id
+from app.helpers.quiz_results import (
+    load_result_snapshot,
+    render_quiz_snapshots,
+    snapshot_response,
+    etag_matches,
+    quiz_result_cache,
+)
+from app.helpers.quiz_grader import regrade_quiz_submissions
+from app.helpers.quiz_analytics import quiz_analytics_cache
+from app.helpers.quiz_export import QUIZ_EXPORTERS, EXPORT_MEDIA_TYPES
 
 router = APIRouter(
     prefix="/teacher/quiz-submission",
@@ -75,30 +87,34 @@ async def list_quiz_submissions_for_teacher(
 )
 async def get_quiz_submission_details_for_teacher(
     submission_id: UUID,
+    request: Request,
     current_user: User = Depends(is_teacher),
     db: AsyncSession = Depends(get_db),
 ):
     # --------------------------
-    # Fetch submission + relations
+    # Revalidation of a result this process has rendered: no DB access
     # --------------------------
-    result = await db.execute(
-        select(QuizSubmission)
-        .options(
-            selectinload(QuizSubmission.quiz)
-            .selectinload(Quiz.questions)
-            .selectinload(QuizQuestion.options),
-            selectinload(QuizSubmission.answers)
-            .selectinload(QuizAnswer.selected_option),
-            selectinload(QuizSubmission.student),
-        )
-        .where(QuizSubmission.id == submission_id)
+    cached = quiz_result_cache.by_submission(submission_id)
+    if (
+        cached
+        and cached.instructor_id == current_user.id
+        and etag_matches(request.headers.get("if-none-match"), cached.etag_header)
+    ):
+        return snapshot_response(cached, request)
+
+    # --------------------------
+    # Fetch submission's quiz
+    # --------------------------
+    quiz_id = await db.scalar(
+        select(QuizSubmission.quiz_id).where(QuizSubmission.id == submission_id)
     )
-    submission = result.scalar_one_or_none()
 
-    if not submission:
+    if not quiz_id:
         raise HTTPException(404, "Submission not found")
 
-    quiz = submission.quiz
+    quiz = await get_quiz_definition(quiz_id, db)
+    if not quiz:
+        raise HTTPException(404, "Quiz not found")
 
     # --------------------------
     # Instructor ownership check
@@ -107,64 +123,114 @@ async def get_quiz_submission_details_for_teacher(
         raise HTTPException(403, "You are not allowed to view this submission")
 
     # --------------------------
-    # Build answer lookup
+    # Rendered result snapshot
+    # --------------------------
+    snapshot = await load_result_snapshot(quiz, db, submission_id=submission_id)
+    if not snapshot:
+        raise HTTPException(404, "Submission not found")
+    # Keeps a snapshot rendered on first view
+    await db.commit()
+
+    return snapshot_response(snapshot, request)
+
+
+@router.post("/regrade/{quiz_id}")
+async def regrade_quiz(
+    quiz_id: UUID,
+    current_user: User = Depends(is_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Re-score every submission of a quiz against its current answer key.
+    Stored answers are kept; only total scores change.
+    """
+    quiz = await get_quiz_definition(quiz_id, db)
+    if not quiz:
+        raise HTTPException(404, "Quiz not found")
+
+    # --------------------------
+    # Instructor ownership check
+    # --------------------------
+    if quiz.instructor_id != current_user.id:
+        raise HTTPException(403, "You are not the instructor of this quiz")
+
+    # --------------------------
+    # Vectorized regrade + bulk update
+    # --------------------------
+    summary = await regrade_quiz_submissions(quiz.answer_key, quiz.id, db)
+
     # --------------------------
-    answer_map = {
-        ans.question_id: ans
-        for ans in submission.answers
+    # Re-render every result view against the current definition;
+    # scores and snapshots commit together
+    # --------------------------
+    await render_quiz_snapshots(quiz, db)
+    # Result and analytics views cached by other processes are keyed on the version
+    quiz_version = await bump_quiz_version_by_id(quiz.id, db)
+    await db.commit()
+
+    if summary["changed"]:
+        quiz_analytics_cache.invalidate(quiz.id)
+
+    return {
+        "quiz_id": quiz.id,
+        "quiz_version": quiz_version,
+        "submissions": summary["submissions"],
+        "changed": summary["changed"],
     }
 
-    questions_response = []
 
-    for question in quiz.questions:
-        # Correct option
-        correct_option = next(
-            opt for opt in question.options if opt.is_correct
-        )
+@router.get(
+    "/analytics/{quiz_id}",
+    response_model=QuizAnalyticsView,
+)
+async def get_quiz_analytics(
+    quiz_id: UUID,
+    current_user: User = Depends(is_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Per-question correct rates and option distribution, score percentiles
+    and histogram, from one aggregate query (cached per quiz).
+    """
+    quiz = await get_quiz_definition(quiz_id, db)
+    if not quiz:
+        raise HTTPException(404, "Quiz not found")
 
-        answer = answer_map.get(question.id)
+    # --------------------------
+    # Instructor ownership check
+    # --------------------------
+    if quiz.instructor_id != current_user.id:
+        raise HTTPException(403, "You are not the instructor of this quiz")
 
-        selected_option = answer.selected_option if answer else None
+    return await quiz_analytics_cache.get(quiz, db)
 
-        is_correct = (
-            selected_option.id == correct_option.id
-            if selected_option
-            else False
-        )
 
-        questions_response.append(
-            QuizQuestionResult(
-                id=question.id,
-                question_text=question.question_text,
-                marks=question.marks,
-                selected_option=(
-                    QuizOptionResult(
-                        id=selected_option.id,
-                        option_text=selected_option.option_text,
-                        is_correct=selected_option.is_correct,
-                    )
-                    if selected_option
-                    else None
-                ),
-                correct_option=QuizOptionResult(
-                    id=correct_option.id,
-                    option_text=correct_option.option_text,
-                    is_correct=True,
-                ),
-                is_correct=is_correct,
-            )
-        )
+@router.get("/export/{quiz_id}")
+async def export_quiz_submissions(
+    quiz_id: UUID,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(is_teacher),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream every submission with its per-question answers as CSV or NDJSON.
+    Rows come from a server-side cursor, so memory does not grow with the
+    number of submissions.
+    """
+    quiz = await get_quiz_definition(quiz_id, db)
+    if not quiz:
+        raise HTTPException(404, "Quiz not found")
 
     # --------------------------
-    # Response
+    # Instructor ownership check
     # --------------------------
-    return QuizSubmissionDetailView(
-        submission_id=submission.id,
-        quiz_id=quiz.id,
-        quiz_title=quiz.title,
-        student_id=submission.student_id,
-        student_roll_number=submission.student.roll_number,
-        submitted_at=submission.submitted_at,
-        total_score=submission.total_score,
-        questions=questions_response,
+    if quiz.instructor_id != current_user.id:
+        raise HTTPException(403, "You are not the instructor of this quiz")
+
+    return StreamingResponse(
+        QUIZ_EXPORTERS[format](quiz),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="quiz-{quiz.id}-submissions.{format}"',
+        },
     )
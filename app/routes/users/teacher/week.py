@@ -11,6 +11,7 @@ from app.database import get_db
 from app.auth.dependencies import is_teacher
 from app.helpers.file_paths import get_media_fs_path,delete_assignment_file_safely
 from app.schemas.week import CreateWeeksRequest,UpdateWeeksRequest,WeekBulkDeleteRequest
+from app.helpers.quiz_cache import bump_week_quiz_versions
 
 
 router=APIRouter(
@@ -140,6 +141,8 @@ async def update_weeks(
             db.add(week)
             created.append(w.week_number)
 
+    # Week number/title are embedded in cached quiz payloads
+    await bump_week_quiz_versions(updated, db)
     await db.commit()
 
     return {
@@ -209,6 +212,7 @@ async def delete_single_week(
     # --------------------------
     # Delete week (DB cascade)
     # --------------------------
+    await bump_week_quiz_versions([week.id], db)
     await db.delete(week)
     await db.commit()
 
@@ -271,9 +275,12 @@ async def bulk_delete_weeks(
             for submission in assignment.submissions:
                 delete_assignment_file_safely(submission.file_url)
 
-        await db.delete(week)
         deleted_weeks.append(str(week.id))
 
+    await bump_week_quiz_versions([week.id for week in weeks], db)
+    for week in weeks:
+        await db.delete(week)
+
     await db.commit()
 
     return {
@@ -5,7 +5,7 @@ from sqlalchemy.future import select
 from app.database import get_db
 from app.models import User, UserRole
 from app.schemas.user import UserCreate
-from app.auth.password_security import hash_password
+from app.auth.password_security import hash_password_async
 
 router = APIRouter(prefix="/user", tags=["User Registration"])
 
@@ -36,7 +36,7 @@ async def register_user(data: UserCreate, db: AsyncSession = Depends(get_db)):
         name=data.name,
         email=data.email,
         roll_number=data.roll_number,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
 
         # Student fields
         department=data.department,
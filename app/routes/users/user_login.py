@@ -5,8 +5,10 @@ from datetime import datetime
 
 from app.database import get_db
 from app.models import User, UserRole
-from app.auth.password_security import verify_password
+from app.auth.password_security import verify_password_async
+from app.helpers.last_login_buffer import last_login_buffer
 from app.auth.jwt import create_access_token, create_refresh_token
+from app.auth.token_revocation import token_claims
 from app.schemas.user import TokenResponse,UserLoginRequest
 
 router = APIRouter(tags=["User Login"])
@@ -25,27 +27,26 @@ async def user_login(request: UserLoginRequest, db: AsyncSession = Depends(get_d
     result = await db.execute(select(User).where(User.roll_number == request.roll_number))
     user = result.scalars().first()
 
-    if not user or user.role not in [UserRole.STUDENT, UserRole.INSTRUCTOR]:
+    if not user or user.is_active is False or user.role not in [UserRole.STUDENT, UserRole.INSTRUCTOR]:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid roll number or password"
         )
 
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid roll number or password"
         )
 
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.add(user)
-    await db.commit()
+    # Update last login (flushed in batches by the write-behind buffer)
+    last_login_buffer.record(user.id, datetime.utcnow())
 
     # Generate tokens
-    access_token = create_access_token({"user_id": str(user.id), "role": user.role.value})
-    refresh_token = create_refresh_token({"user_id": str(user.id), "role": user.role.value})
+    claims = token_claims(user)
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token(claims)
 
     return TokenResponse(
         access_token=access_token, 
@@ -6,8 +6,8 @@ from sqlalchemy.orm import selectinload
 from uuid import UUID
 
 from app.models import CourseWeek, Quiz, User
-from app.database import get_db
-from app.auth.dependencies import get_current_user
+from app.database import get_read_db
+from app.auth.dependencies import get_current_principal
 from app.schemas.course import MediaLite, AssignmentLite, QuizLite, WeekLite
 from app.auth.course_access import check_course_access
 
@@ -16,10 +16,10 @@ router = APIRouter(
     tags=["User Week Endpoints"]
 )
 
-@router.get("/list-weeks-in-course/{course_id}", response_model=list[WeekLite],dependencies=[Depends(get_current_user)])
+@router.get("/list-weeks-in-course/{course_id}", response_model=list[WeekLite],dependencies=[Depends(get_current_principal)])
 async def list_course_weeks(
     course_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(CourseWeek.id).where(CourseWeek.course_id == course_id)
@@ -32,8 +32,8 @@ async def list_course_weeks(
 @router.get("/week-details/{week_id}", response_model=dict)
 async def get_week_detail(
     week_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # --------------------------
     # Fetch week with course
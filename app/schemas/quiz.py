@@ -54,8 +54,34 @@ class QuizCreateResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
+# Update payloads carry the ids of existing questions/options; items
+# without an id are created, existing ones left out are removed.
+class QuizOptionUpdate(QuizOptionCreate):
+    id: Optional[UUID] = None
+
+
+class QuizQuestionUpdate(QuizQuestionCreate):
+    id: Optional[UUID] = None
+    options: List[QuizOptionUpdate]
+
+
 class QuizUpdate(QuizCreate):
-    pass
+    questions: List[QuizQuestionUpdate]
+
+
+class QuizUpdateChanges(BaseModel):
+    questions_added: int
+    questions_updated: int
+    questions_removed: int
+    options_added: int
+    options_updated: int
+    options_removed: int
+    requires_regrade: bool
+
+
+class QuizUpdateResponse(QuizCreateResponse):
+    version: int
+    changes: QuizUpdateChanges
 
 
 #Listing Quiz and its questions to the users
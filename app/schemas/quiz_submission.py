@@ -55,3 +55,49 @@ class QuizSubmissionDetailView(BaseModel):
 
     model_config = {"from_attributes": True}
 
+
+
+#quiz analytics (teachers)
+class QuizOptionStat(BaseModel):
+    id: UUID
+    option_text: str
+    is_correct: bool
+    chosen: int
+
+
+class QuizQuestionStat(BaseModel):
+    id: UUID
+    question_text: str
+    marks: int
+    answered: int
+    unanswered: int
+    correct: int
+    correct_rate: float
+    options: list[QuizOptionStat]
+
+
+class QuizScoreStats(BaseModel):
+    mean: Optional[float]
+    min: Optional[int]
+    max: Optional[int]
+    p25: Optional[float]
+    median: Optional[float]
+    p75: Optional[float]
+    p90: Optional[float]
+
+
+class QuizScoreBucket(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class QuizAnalyticsView(BaseModel):
+    quiz_id: UUID
+    quiz_title: str
+    version: int
+    submissions: int
+    max_score: int
+    scores: QuizScoreStats
+    histogram: list[QuizScoreBucket]
+    questions: list[QuizQuestionStat]
@@ -0,0 +1,95 @@
+"""
+Login storm benchmark.
+
+Fires concurrent POST /user/login requests against a running server while a
+probe loop hits GET / and reports:
+  - logins/sec
+  - p50/p99 latency of the unrelated probe endpoint, idle vs. during the storm
+
+Usage:
+    uvicorn app.main:app --workers 1
+    python benchmarks/login_benchmark.py --roll-number S001 --password secret
+
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def login_worker(client: httpx.AsyncClient, stop: asyncio.Event, args, counters: dict):
+    payload = {"roll_number": args.roll_number, "password": args.password}
+    while not stop.is_set():
+        response = await client.post("/user/login", json=payload)
+        if response.status_code == 200:
+            counters["ok"] += 1
+        else:
+            counters["failed"] += 1
+
+
+async def measure_probe(client: httpx.AsyncClient, seconds: float) -> list:
+    stop = asyncio.Event()
+    latencies: list = []
+    task = asyncio.create_task(probe(client, stop, latencies))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+    return latencies
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        idle = await measure_probe(client, args.idle_seconds)
+
+        stop = asyncio.Event()
+        counters = {"ok": 0, "failed": 0}
+        under_load: list = []
+
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(login_worker(client, stop, args, counters))
+            for _ in range(args.concurrency)
+        ]
+        tasks.append(asyncio.create_task(probe(client, stop, under_load)))
+
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    print(f"logins ok:          {counters['ok']}")
+    print(f"logins failed:      {counters['failed']}")
+    print(f"logins/sec:         {counters['ok'] / elapsed:.1f}")
+    print(f"probe idle p50/p99: {statistics.median(idle or [0]):.1f} / {percentile(idle, 99):.1f} ms")
+    print(f"probe load p50/p99: {statistics.median(under_load or [0]):.1f} / {percentile(under_load, 99):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--roll-number", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--idle-seconds", type=float, default=3)
+    asyncio.run(main(parser.parse_args()))
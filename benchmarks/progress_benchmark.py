@@ -0,0 +1,113 @@
+"""
+Course progress benchmark.
+
+Compares the single-round-trip get_course_progress with the original
+six-query get_course_progress_sequential on real (course, student) pairs
+taken from course_students, and checks that both return identical results.
+
+Reports per call:
+  - mean/p50/p99 latency
+  - statements executed
+
+Usage:
+    python benchmarks/progress_benchmark.py --pairs 200 --rounds 5
+
+Run from the repository root so the app package and .env are picked up.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, select
+
+from app.database import AsyncSessionLocal, engine
+from app.helpers.progress_calculator import get_course_progress, get_course_progress_sequential
+from app.models import course_students
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def run(fn, pairs, rounds, counter: StatementCounter):
+    latencies = []
+    results = {}
+    counter.count = 0
+
+    async with AsyncSessionLocal() as db:
+        for _ in range(rounds):
+            for course_id, student_id in pairs:
+                started = time.perf_counter()
+                results[(course_id, student_id)] = await fn(course_id, student_id, db)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    return latencies, results, counter.count / max(len(latencies), 1)
+
+
+async def main(args):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(course_students.c.course_id, course_students.c.student_id).limit(args.pairs)
+        )
+        pairs = [tuple(row) for row in result.all()]
+
+    if not pairs:
+        print("No enrollments found; seed some data first.")
+        return 1
+
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "after_cursor_execute", counter)
+
+    report = {}
+    for name, fn in (
+        ("sequential", get_course_progress_sequential),
+        ("single query", get_course_progress),
+    ):
+        # One warm-up round so both variants run against a hot cache
+        await run(fn, pairs, 1, counter)
+        report[name] = await run(fn, pairs, args.rounds, counter)
+
+    await engine.dispose()
+
+    mismatches = [
+        pair for pair, expected in report["sequential"][1].items()
+        if report["single query"][1][pair] != expected
+    ]
+
+    print(f"pairs: {len(pairs)}  rounds: {args.rounds}")
+    for name, (latencies, _, statements) in report.items():
+        print(
+            f"{name:<13} mean {statistics.mean(latencies):6.2f} ms  "
+            f"p50 {statistics.median(latencies):6.2f} ms  "
+            f"p99 {percentile(latencies, 99):6.2f} ms  "
+            f"statements/call {statements:.1f}"
+        )
+    print(f"parity: {'OK' if not mismatches else f'{len(mismatches)} mismatches'}")
+    for pair in mismatches[:5]:
+        print(f"  {pair}: {report['sequential'][1][pair]} != {report['single query'][1][pair]}")
+
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    sys.exit(asyncio.run(main(parser.parse_args())))
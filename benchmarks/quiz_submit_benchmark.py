@@ -0,0 +1,164 @@
+"""
+Exam-burst quiz submission benchmark.
+
+Replays the end of a timed quiz: every student in --students submits the
+quiz once, with arrivals spread evenly at a fixed offered rate. The run is
+repeated for each rate in --rates and reports per step:
+  - accepted submissions/sec (201 or 202)
+  - p50/p99 latency
+The result is the highest rate whose p99 stays within --p99-ms.
+
+Between steps the quiz's submissions are deleted directly in the database
+(after --settle seconds, so burst-mode batches have been written) and the
+course's progress rows are recomputed.
+
+Usage:
+    QUIZ_BURST_MODE=true uvicorn app.main:app --workers 1
+    python benchmarks/quiz_submit_benchmark.py --quiz-id <uuid> --students students.csv
+
+students.csv holds one "roll_number,password" per line for students enrolled
+in the quiz's course. Run from the repository root so the app package and
+.env are picked up. Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import csv
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import UUID
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal
+from app.helpers.progress_tracker import refresh_course
+from app.models import Quiz, QuizAnswer, QuizSubmission, QuizSubmissionStaging
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_all(client: httpx.AsyncClient, students: list) -> list:
+    async def login(roll_number, password):
+        response = await client.post("/user/login", json={"roll_number": roll_number, "password": password})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    return await asyncio.gather(*(login(roll, password) for roll, password in students))
+
+
+def build_answers(quiz: dict) -> dict:
+    # First option of every question; grading cost is the same either way
+    return {
+        "answers": [
+            {"question_id": q["id"], "selected_option_id": q["options"][0]["id"] if q["options"] else None}
+            for q in quiz["questions"]
+        ]
+    }
+
+
+async def reset_submissions(quiz_id: UUID):
+    async with AsyncSessionLocal() as db:
+        course_id = await db.scalar(select(Quiz.course_id).where(Quiz.id == quiz_id))
+        submission_ids = select(QuizSubmission.id).where(QuizSubmission.quiz_id == quiz_id)
+        await db.execute(delete(QuizAnswer).where(QuizAnswer.submission_id.in_(submission_ids)))
+        await db.execute(delete(QuizSubmission).where(QuizSubmission.quiz_id == quiz_id))
+        await db.execute(delete(QuizSubmissionStaging).where(QuizSubmissionStaging.quiz_id == quiz_id))
+        await refresh_course(course_id, db)
+        await db.commit()
+
+
+async def run_step(client: httpx.AsyncClient, quiz_id: UUID, tokens: list, payload: dict, rate: float) -> dict:
+    latencies = []
+    counters = {"ok": 0, "failed": 0}
+
+    async def submit(token):
+        started = time.perf_counter()
+        response = await client.post(
+            f"/student/quiz-submission/submit-quiz/{quiz_id}",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        counters["ok" if response.status_code in (201, 202) else "failed"] += 1
+
+    started = time.perf_counter()
+    tasks = []
+    for i, token in enumerate(tokens):
+        # Open-loop arrivals: request i is sent at i / rate regardless of backlog
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(submit(token)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rate": rate,
+        "ok": counters["ok"],
+        "failed": counters["failed"],
+        "throughput": counters["ok"] / elapsed,
+        "p50": statistics.median(latencies or [0]),
+        "p99": percentile(latencies, 99),
+    }
+
+
+async def main(args):
+    with open(args.students, newline="") as f:
+        students = [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if row]
+
+    rates = [float(rate) for rate in args.rates.split(",")]
+    limits = httpx.Limits(max_connections=args.max_connections)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        tokens = await login_all(client, students)
+
+        response = await client.get(
+            f"/student/quiz/attend-quiz/{args.quiz_id}",
+            headers={"Authorization": f"Bearer {tokens[0]}"},
+        )
+        response.raise_for_status()
+        payload = build_answers(response.json())
+
+        await reset_submissions(args.quiz_id)
+        results = []
+        for rate in rates:
+            results.append(await run_step(client, args.quiz_id, tokens, payload, rate))
+            await asyncio.sleep(args.settle)
+            await reset_submissions(args.quiz_id)
+
+    print(f"{'offered/s':>10} {'ok':>6} {'failed':>6} {'accepted/s':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(
+            f"{r['rate']:>10.0f} {r['ok']:>6} {r['failed']:>6} {r['throughput']:>11.1f} "
+            f"{r['p50']:>8.1f} {r['p99']:>8.1f}"
+        )
+
+    within = [r for r in results if r["p99"] <= args.p99_ms and not r["failed"]]
+    if within:
+        best = max(within, key=lambda r: r["throughput"])
+        print(f"\nsustained: {best['throughput']:.1f} submissions/sec at p99 <= {args.p99_ms:.0f} ms")
+    else:
+        print(f"\nno step kept p99 <= {args.p99_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--quiz-id", type=UUID, required=True)
+    parser.add_argument("--students", required=True, help="CSV of roll_number,password")
+    parser.add_argument("--rates", default="50,100,200,400,800", help="Offered submissions/sec per step")
+    parser.add_argument("--p99-ms", type=float, default=250)
+    parser.add_argument("--settle", type=float, default=3, help="Seconds to wait for queued writes")
+    parser.add_argument("--max-connections", type=int, default=256)
+    asyncio.run(main(parser.parse_args()))
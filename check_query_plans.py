@@ -0,0 +1,95 @@
+import asyncio
+import json
+import sys
+import uuid
+
+from sqlalchemy import text
+
+from app.database import engine
+
+# ---------------------------
+# Hot queries and the index each must use
+# ---------------------------
+# Sequential scans are disabled for the check so small development tables
+# still prove the planner *can* answer each query from its index.
+HOT_QUERIES = [
+    (
+        "ix_course_students_student_id",
+        "SELECT course_id FROM course_students WHERE student_id = :id",
+    ),
+    (
+        "ix_media_course_id_week_id",
+        "SELECT * FROM media WHERE course_id = :id AND week_id IS NULL",
+    ),
+    (
+        "ix_assignments_course_id_week_id",
+        "SELECT * FROM assignments WHERE course_id = :id AND week_id IS NULL",
+    ),
+    (
+        "ix_quizzes_course_id_week_id",
+        "SELECT * FROM quizzes WHERE course_id = :id AND week_id IS NULL",
+    ),
+    (
+        "uq_quiz_submissions_quiz_id_student_id",
+        "SELECT * FROM quiz_submissions WHERE quiz_id = :id AND student_id = :id",
+    ),
+    (
+        "uq_assignment_submissions_assignment_id_student_id",
+        "SELECT * FROM assignment_submissions WHERE assignment_id = :id AND student_id = :id",
+    ),
+    (
+        "ix_media_progress_student_id",
+        "SELECT * FROM media_progress WHERE student_id = :id",
+    ),
+    (
+        "ix_courses_instructor_id_created_at_id",
+        "SELECT * FROM courses WHERE instructor_id = :id "
+        "AND (created_at, id) < (now()::timestamp, :id) ORDER BY created_at DESC, id DESC LIMIT 11",
+    ),
+    (
+        "ix_courses_created_at_id",
+        "SELECT * FROM courses WHERE (created_at, id) < (now()::timestamp, :id) "
+        "ORDER BY created_at DESC, id DESC LIMIT 11",
+    ),
+    (
+        "ix_course_category_map_category_id",
+        "SELECT course_id FROM course_category_map WHERE category_id = :id",
+    ),
+]
+
+
+def _index_names(plan: dict) -> set[str]:
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+async def check_query_plans() -> bool:
+    all_ok = True
+
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for index_name, sql in HOT_QUERIES:
+                result = await conn.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {sql}"),
+                    {"id": uuid.uuid4()},
+                )
+                raw_plan = result.scalar()
+                plan = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]["Plan"]
+                used = _index_names(plan)
+
+                ok = index_name in used
+                all_ok = all_ok and ok
+                print(f"{'✅' if ok else '❌'} {index_name:<55} used: {', '.join(sorted(used)) or 'none'}")
+
+    await engine.dispose()
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(check_query_plans()) else 1)
@@ -1,17 +1,17 @@
-import asyncio
-from app.database import engine, Base
+from alembic import command
+from alembic.config import Config
 
-# Import all models here so SQLAlchemy knows them
-from app.models import User,Course,Media,Assignment,AssignmentSubmission,Quiz,QuizAnswer,QuizOption,QuizQuestion,QuizSubmission,course_students  # add other models as you create them
 
-
-
-async def create_tables():
-    async with engine.begin() as conn:
-        print("🚀 Creating database tables...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("✅ All tables created successfully!")
+def create_tables():
+    """
+    Bring the database schema up to date by applying all Alembic migrations.
+    Databases created earlier with Base.metadata.create_all should first be
+    marked as the baseline with: alembic stamp 0001
+    """
+    print("🚀 Applying database migrations...")
+    command.upgrade(Config("alembic.ini"), "head")
+    print("✅ Database schema is up to date!")
 
 
 if __name__ == "__main__":
-    asyncio.run(create_tables())
+    create_tables()
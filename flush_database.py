@@ -1,18 +1,27 @@
 import asyncio
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
 from app.database import engine, Base
 
 # Import all models so SQLAlchemy knows them
-from app.models import User,Course,Media,Assignment,AssignmentSubmission,Quiz,QuizAnswer,QuizOption,QuizQuestion,QuizSubmission,course_students  # add other models as you create them
+import app.models  # noqa: F401
 
-async def flush_database():
+async def drop_all_tables():
     async with engine.begin() as conn:
         print("⚠️ Dropping all tables...")
         await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
         print("✅ All tables dropped successfully!")
+    await engine.dispose()
+
+def flush_database():
+    asyncio.run(drop_all_tables())
 
-        print("🚀 Recreating tables...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("✅ All tables recreated successfully!")
+    print("🚀 Recreating tables...")
+    command.upgrade(Config("alembic.ini"), "head")
+    print("✅ All tables recreated successfully!")
 
 if __name__ == "__main__":
-    asyncio.run(flush_database())
+    flush_database()
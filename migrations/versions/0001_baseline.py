@@ -0,0 +1,219 @@
+"""Baseline schema (tables as previously created by create_database.py)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+Existing databases created with Base.metadata.create_all should be marked
+with `alembic stamp 0001` instead of running this revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("role", sa.Enum("ADMIN", "STUDENT", "INSTRUCTOR", name="user_role_enum"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), unique=True, nullable=True),
+        sa.Column("roll_number", sa.String(50), unique=True, nullable=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_login", sa.DateTime(), nullable=True),
+        sa.Column("profile_pic", sa.String(255), nullable=True),
+        sa.Column("department", sa.String(100), nullable=True),
+        sa.Column("year", sa.String(10), nullable=True),
+        sa.Column("section", sa.String(10), nullable=True),
+        sa.Column("dob", sa.Date(), nullable=True),
+        sa.Column("mobile", sa.String(20), nullable=True),
+        sa.Column("qualification", sa.String(100), nullable=True),
+        sa.Column("experience_years", sa.Integer(), nullable=True),
+        sa.Column("super_admin", sa.Boolean(), nullable=True),
+    )
+
+    op.create_table(
+        "courses",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("code", sa.String(50), unique=True, nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("credits", sa.Integer(), nullable=True),
+        sa.Column("thumbnail", sa.String(500), nullable=True),
+        sa.Column("instructor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("is_course_ended", sa.Boolean(), nullable=True),
+    )
+
+    op.create_table(
+        "course_categories",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(100), unique=True, nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "course_category_map",
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("course_categories.id", ondelete="CASCADE"), primary_key=True),
+    )
+
+    op.create_table(
+        "course_students",
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id"), primary_key=True),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+    )
+
+    op.create_table(
+        "course_weeks",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("week_number", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "media",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("uploaded_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("week_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("course_weeks.id"), nullable=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("file_url", sa.Text(), nullable=False),
+        sa.Column("media_type", sa.String(50), nullable=False),
+        sa.Column("duration_seconds", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "media_progress",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("media_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("media.id"), nullable=False),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("watched_seconds", sa.Integer(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("media_id", "student_id", name="unique_media_progress"),
+    )
+
+    op.create_table(
+        "assignments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("instructor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("total_marks", sa.Integer(), nullable=True),
+        sa.Column("deadline", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("week_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("course_weeks.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "assignment_submissions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("assignment_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("assignments.id"), nullable=False),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("file_url", sa.Text(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.Column("marks_obtained", sa.Integer(), nullable=True),
+        sa.Column("feedback", sa.Text(), nullable=True),
+    )
+
+    op.create_table(
+        "quizzes",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("instructor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("total_marks", sa.Integer(), nullable=True),
+        sa.Column("time_limit_minutes", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("week_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("course_weeks.id"), nullable=True),
+    )
+
+    op.create_table(
+        "quiz_questions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quizzes.id"), nullable=False),
+        sa.Column("question_text", sa.Text(), nullable=False),
+        sa.Column("marks", sa.Integer(), nullable=True),
+    )
+
+    op.create_table(
+        "quiz_options",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quiz_questions.id"), nullable=False),
+        sa.Column("option_text", sa.Text(), nullable=False),
+        sa.Column("is_correct", sa.Boolean(), nullable=True),
+    )
+
+    op.create_table(
+        "quiz_submissions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quizzes.id"), nullable=False),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.Column("total_score", sa.Integer(), nullable=True),
+    )
+
+    op.create_table(
+        "quiz_answers",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("submission_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quiz_submissions.id"), nullable=False),
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quiz_questions.id"), nullable=False),
+        sa.Column("selected_option_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quiz_options.id"), nullable=True),
+    )
+
+    op.create_table(
+        "certificates",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("certificate_number", sa.String(100), unique=True, nullable=False),
+        sa.Column("issued_at", sa.DateTime(), nullable=True),
+        sa.Column("score", sa.Integer(), nullable=True),
+        sa.Column("grade", sa.String(10), nullable=True),
+        sa.Column("pdf_url", sa.Text(), nullable=True),
+        sa.UniqueConstraint("student_id", "course_id", name="unique_certificate_per_course"),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "certificates",
+        "quiz_answers",
+        "quiz_submissions",
+        "quiz_options",
+        "quiz_questions",
+        "quizzes",
+        "assignment_submissions",
+        "assignments",
+        "media_progress",
+        "media",
+        "course_weeks",
+        "course_students",
+        "course_category_map",
+        "course_categories",
+        "courses",
+        "users",
+    ):
+        op.drop_table(table)
+
+    sa.Enum(name="user_role_enum").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,41 @@
+"""Secondary indexes for hot query paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+Indexes are built with CREATE INDEX CONCURRENTLY so the tables stay
+writable during the migration; that requires running outside of a
+transaction, hence the autocommit block.
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+HOT_PATH_INDEXES = [
+    ("ix_course_students_student_id", "course_students", ["student_id"]),
+    ("ix_media_course_id_week_id", "media", ["course_id", "week_id"]),
+    ("ix_assignments_course_id_week_id", "assignments", ["course_id", "week_id"]),
+    ("ix_quizzes_course_id_week_id", "quizzes", ["course_id", "week_id"]),
+    ("ix_quiz_submissions_quiz_id_student_id", "quiz_submissions", ["quiz_id", "student_id"]),
+    ("ix_assignment_submissions_assignment_id_student_id", "assignment_submissions", ["assignment_id", "student_id"]),
+    ("ix_media_progress_student_id", "media_progress", ["student_id"]),
+    ("ix_courses_instructor_id_created_at", "courses", ["instructor_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in HOT_PATH_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(HOT_PATH_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""Composite (created_at, id) indexes for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+List endpoints page on the row value (created_at, id), so each listing
+needs an index whose trailing columns are exactly that pair. The
+instructor index from 0002 is replaced by one that also covers id.
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = [
+    ("ix_courses_created_at_id", "courses", ["created_at", "id"]),
+    ("ix_courses_instructor_id_created_at_id", "courses", ["instructor_id", "created_at", "id"]),
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+    ("ix_course_category_map_category_id", "course_category_map", ["category_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in KEYSET_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+        op.drop_index("ix_courses_instructor_id_created_at", table_name="courses", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_courses_instructor_id_created_at",
+            "courses",
+            ["instructor_id", "created_at"],
+            postgresql_concurrently=True,
+        )
+        for name, table, _ in reversed(KEYSET_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
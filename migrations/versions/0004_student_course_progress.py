@@ -0,0 +1,39 @@
+"""Denormalized student_course_progress table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+Rows are materialized lazily on first read (or by rebuild_progress.py),
+so the table starts empty.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "student_course_progress",
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("watched_seconds", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("submitted_assignments", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_quizzes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_duration", sa.BigInteger(), nullable=True),
+        sa.Column("total_assignments", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_quizzes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_student_course_progress_course_id", "student_course_progress", ["course_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_student_course_progress_course_id", table_name="student_course_progress")
+    op.drop_table("student_course_progress")
@@ -0,0 +1,28 @@
+"""Quiz definition version counter
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+The server default fills existing rows, so adding the column does not
+rewrite the table on PostgreSQL 11+.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "quizzes",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("quizzes", "version")
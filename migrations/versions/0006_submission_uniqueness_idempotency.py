@@ -0,0 +1,88 @@
+"""Unique submissions per student and idempotency keys
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+Existing duplicate submissions are removed first, keeping each student's
+earliest one (and its answers). The unique indexes are then built
+concurrently and attached as constraints, replacing the plain
+(parent, student) indexes from 0002. Run rebuild_progress.py afterwards
+if duplicates were removed, since progress counted them.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+# (constraint, old index, table, parent column)
+UNIQUE_SUBMISSIONS = [
+    (
+        "uq_quiz_submissions_quiz_id_student_id",
+        "ix_quiz_submissions_quiz_id_student_id",
+        "quiz_submissions",
+        "quiz_id",
+    ),
+    (
+        "uq_assignment_submissions_assignment_id_student_id",
+        "ix_assignment_submissions_assignment_id_student_id",
+        "assignment_submissions",
+        "assignment_id",
+    ),
+]
+
+
+def _duplicate_ids(table: str, parent: str) -> str:
+    return f"""
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY {parent}, student_id
+                ORDER BY submitted_at NULLS LAST, id
+            ) AS rn
+            FROM {table}
+        ) ranked
+        WHERE rn > 1
+    """
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM quiz_answers WHERE submission_id IN ("
+        + _duplicate_ids("quiz_submissions", "quiz_id") + ")"
+    )
+    for _, _, table, parent in UNIQUE_SUBMISSIONS:
+        op.execute(f"DELETE FROM {table} WHERE id IN ({_duplicate_ids(table, parent)})")
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("scope", sa.String(255), nullable=False),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("response_body", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+    with op.get_context().autocommit_block():
+        for name, old_index, table, parent in UNIQUE_SUBMISSIONS:
+            op.create_index(name, table, [parent, "student_id"], unique=True, postgresql_concurrently=True)
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}")
+            op.drop_index(old_index, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, old_index, table, parent in reversed(UNIQUE_SUBMISSIONS):
+            op.create_index(old_index, table, [parent, "student_id"], postgresql_concurrently=True)
+            op.drop_constraint(name, table)
+
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
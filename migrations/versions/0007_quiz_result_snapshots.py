@@ -0,0 +1,35 @@
+"""Rendered quiz result snapshots
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+
+Snapshots are written at submit/regrade time; submissions made before this
+migration are rendered lazily on first view, so the table starts empty.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_result_snapshots",
+        sa.Column("submission_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quiz_submissions.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("etag", sa.String(64), nullable=False),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("rendered_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("quiz_id", "student_id", name="uq_quiz_result_snapshots_quiz_id_student_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quiz_result_snapshots")
@@ -0,0 +1,28 @@
+"""Per-user token version for shared token revocation
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+
+The server default fills existing rows, so adding the column does not
+rewrite the table on PostgreSQL 11+.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
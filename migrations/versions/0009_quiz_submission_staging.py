@@ -0,0 +1,52 @@
+"""Durable staging table for burst-mode quiz submissions
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+
+Burst-mode submissions are inserted here before the 202 is sent, so an
+accepted submission survives a crash and is drained by any process.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_submission_staging",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("student_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=False),
+        sa.Column("total_score", sa.Integer(), nullable=False),
+        sa.Column("answers", postgresql.JSONB(), nullable=False),
+        sa.Column("idempotency_key", sa.String(255), nullable=True),
+        sa.Column("idempotency", postgresql.JSONB(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("written_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("quiz_id", "student_id", name="uq_quiz_submission_staging_quiz_id_student_id"),
+    )
+    op.create_index(
+        "ix_quiz_submission_staging_written_at_next_attempt_at",
+        "quiz_submission_staging",
+        ["written_at", "next_attempt_at"],
+    )
+    op.create_index(
+        "ix_quiz_submission_staging_student_id_idempotency_key",
+        "quiz_submission_staging",
+        ["student_id", "idempotency_key"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quiz_submission_staging")
@@ -0,0 +1,28 @@
+"""Mark staged quiz submissions that could not be written
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+
+A staged submission that loses to an existing quiz_submissions row is kept
+with rejected_at set instead of being dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "quiz_submission_staging",
+        sa.Column("rejected_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("quiz_submission_staging", "rejected_at")
@@ -0,0 +1,22 @@
+import asyncio
+
+from app.database import AsyncSessionLocal, engine
+from app.helpers.idempotency import purge_expired_idempotency_keys, IDEMPOTENCY_KEY_TTL_HOURS
+
+
+async def purge():
+    """
+    Delete stored idempotent responses older than IDEMPOTENCY_KEY_TTL_HOURS.
+    Safe to run from cron; expired keys are already ignored on read.
+    """
+    print(f"🧹 Purging idempotency keys older than {IDEMPOTENCY_KEY_TTL_HOURS}h...")
+    try:
+        async with AsyncSessionLocal() as session:
+            purged = await purge_expired_idempotency_keys(session)
+        print(f"✅ Purged {purged} idempotency keys")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(purge())
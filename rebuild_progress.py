@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import sys
+from uuid import UUID
+
+from app.database import AsyncSessionLocal, engine
+from app.helpers.progress_tracker import rebuild_progress, check_progress_consistency
+
+
+async def rebuild():
+    """
+    Recompute student_course_progress from the raw progress tables.
+    """
+    print("🔄 Rebuilding student course progress...")
+    async with AsyncSessionLocal() as session:
+        rebuilt = await rebuild_progress(session)
+    print(f"✅ Rebuilt {rebuilt} progress rows")
+    return True
+
+
+async def check(course_id: UUID | None):
+    """
+    Diff student_course_progress against progress computed from raw tables.
+    """
+    print("🔍 Checking student course progress...")
+    async with AsyncSessionLocal() as session:
+        mismatches = await check_progress_consistency(session, course_id)
+
+    for item in mismatches:
+        print(f"❌ course {item['course_id']} student {item['student_id']}")
+        print(f"   stored:   {item['stored']}")
+        print(f"   expected: {item['expected']}")
+
+    if mismatches:
+        print(f"❌ {len(mismatches)} inconsistent rows (run without --check to rebuild)")
+        return False
+
+    print("✅ Progress table is consistent")
+    return True
+
+
+async def main(args):
+    try:
+        if args.check:
+            return await check(args.course_id)
+        return await rebuild()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or verify the student_course_progress table.")
+    parser.add_argument("--check", action="store_true", help="only report rows that differ from the raw tables")
+    parser.add_argument("--course-id", type=UUID, default=None, help="limit --check to one course")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
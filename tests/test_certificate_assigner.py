@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+
+from app.helpers import certificate_assigner
+from app.helpers.certificate_assigner import issue_certificate_if_completed
+from conftest import FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+COURSE_ID, STUDENT_ID = uuid.uuid4(), uuid.uuid4()
+
+
+@pytest.fixture
+def progress(monkeypatch):
+    state = {"overall_progress": 95}
+
+    async def tracked(course_id, student_id, db):
+        return dict(state)
+
+    monkeypatch.setattr(certificate_assigner, "get_tracked_progress", tracked)
+    return state
+
+
+async def test_new_certificate_queues_its_pdf(progress):
+    certificate_id = uuid.uuid4()
+    db = FakeSession(lambda statement, params: certificate_id)
+
+    assert await issue_certificate_if_completed(COURSE_ID, STUDENT_ID, db) == certificate_id
+
+    [(statement, _)] = db.statements
+    assert "ON CONFLICT ON CONSTRAINT unique_certificate_per_course DO NOTHING" in compile_sql(statement)
+    [(_, fn, args)] = db.info["after_commit_tasks"]
+    assert fn is certificate_assigner.render_certificates_task
+    assert args == ([certificate_id],)
+    assert db.commits == 1
+
+
+async def test_certificate_issued_concurrently_is_not_an_error(progress):
+    db = FakeSession(lambda statement, params: None)
+
+    assert await issue_certificate_if_completed(COURSE_ID, STUDENT_ID, db) is None
+    assert "after_commit_tasks" not in db.info
+    assert db.commits == 1
+
+
+async def test_ineligible_student_gets_nothing(progress):
+    progress["overall_progress"] = 50
+    db = FakeSession()
+
+    assert await issue_certificate_if_completed(COURSE_ID, STUDENT_ID, db) is None
+    assert db.statements == []
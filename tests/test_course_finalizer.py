@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from app.helpers import certificate_pdf
+from app.helpers import course_finalizer as finalizer_module
+from app.helpers.course_finalizer import CourseFinalizer, FinalizationJob
+from conftest import FakeResult, FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+
+class _SessionContext:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+async def test_run_requeues_certificates_without_pdf(monkeypatch):
+    missing = [uuid.uuid4() for _ in range(3)]
+    pages = [missing[:2], missing[2:], []]
+
+    def respond(statement, params):
+        sql = compile_sql(statement)
+        if "count(*)" in sql:
+            return 0
+        if "certificates.pdf_url IS NULL" in sql:
+            return FakeResult(pages.pop(0))
+        return FakeResult()
+
+    db = FakeSession(respond)
+    queued = []
+    monkeypatch.setattr(finalizer_module, "AsyncSessionLocal", lambda: _SessionContext(db))
+    monkeypatch.setattr(
+        finalizer_module.task_queue, "enqueue",
+        lambda key, fn, *args: queued.append((fn, args)) or True,
+    )
+
+    job = await CourseFinalizer(batch_size=2, jobs_kept=10).run(FinalizationJob(course_id=uuid.uuid4()))
+
+    assert job.status == "completed"
+    assert job.pdfs_requeued == 3
+    assert queued == [
+        (finalizer_module.render_certificates_task, (missing[:2],)),
+        (finalizer_module.render_certificates_task, (missing[2:],)),
+    ]
+    # Later pages continue after the last id seen
+    missing_pdf_queries = [s for s, _ in db.statements if "pdf_url IS NULL" in compile_sql(s)]
+    assert "certificates.id > " in compile_sql(missing_pdf_queries[1])
+
+
+async def test_startup_sweep_renders_every_missing_pdf(monkeypatch):
+    missing = [uuid.uuid4() for _ in range(3)]
+    pages = [missing[:2], missing[2:], []]
+    db = FakeSession(lambda statement, params: FakeResult(pages.pop(0)))
+    rendered = []
+
+    async def render(certificate_ids, session):
+        rendered.append(certificate_ids)
+        return len(certificate_ids)
+
+    monkeypatch.setattr(certificate_pdf, "AsyncSessionLocal", lambda: _SessionContext(db))
+    monkeypatch.setattr(certificate_pdf, "render_certificates", render)
+
+    await certificate_pdf.render_missing_certificates_task()
+
+    assert rendered == [missing[:2], missing[2:]]
@@ -0,0 +1,28 @@
+import logging
+
+import pytest
+
+from app.auth import enrollment_index as enrollment_module
+from app.auth.enrollment_index import EnrollmentIndex
+
+
+class FakeDialect:
+    driver = "psycopg2"
+
+
+class FakeEngine:
+    dialect = FakeDialect()
+
+
+@pytest.mark.anyio
+async def test_listener_is_not_started_without_asyncpg(monkeypatch, caplog):
+    monkeypatch.setattr(enrollment_module, "engine", FakeEngine())
+    index = EnrollmentIndex(ttl_seconds=60, max_users=10)
+
+    with caplog.at_level(logging.WARNING, logger=enrollment_module.__name__):
+        index.start()
+
+    assert index._task is None
+    [record] = caplog.records
+    assert "needs asyncpg" in record.getMessage()
+    await index.stop()
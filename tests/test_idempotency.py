@@ -0,0 +1,183 @@
+import io
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.helpers.idempotency import (
+    find_idempotent_response,
+    request_fingerprint,
+    upload_digest,
+    store_idempotent_response,
+)
+from app.routes.users.student import assignment_submissions
+from conftest import FakeResult, FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = uuid.uuid4()
+
+
+def stored_key(scope: str, request_hash: str, body=None):
+    return SimpleNamespace(scope=scope, request_hash=request_hash, status_code=201, response_body=body or {"ok": True})
+
+
+async def test_no_key_means_no_lookup():
+    db = FakeSession()
+
+    assert await find_idempotent_response(db, USER_ID, None, "scope", "hash") is None
+    assert db.statements == []
+
+
+async def test_new_key_is_not_a_replay():
+    db = FakeSession(lambda statement, params: FakeResult())
+
+    assert await find_idempotent_response(db, USER_ID, "key-1", "scope", "hash") is None
+
+
+async def test_retry_replays_the_stored_response():
+    db = FakeSession(lambda statement, params: FakeResult([stored_key("scope", "hash", {"id": "42"})]))
+
+    response = await find_idempotent_response(db, USER_ID, "key-1", "scope", "hash")
+
+    assert response.status_code == 201
+    assert response.body == b'{"id":"42"}'
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.parametrize("scope, request_hash", [("other-scope", "hash"), ("scope", "other-hash")])
+async def test_key_reused_for_another_request_is_422(scope, request_hash):
+    db = FakeSession(lambda statement, params: FakeResult([stored_key("scope", "hash")]))
+
+    with pytest.raises(HTTPException) as exc:
+        await find_idempotent_response(db, USER_ID, "key-1", scope, request_hash)
+    assert exc.value.status_code == 422
+
+
+async def test_store_only_replaces_expired_keys():
+    db = FakeSession()
+
+    await store_idempotent_response(db, USER_ID, None, "scope", "hash", 201, {})
+    assert db.statements == []
+
+    await store_idempotent_response(db, USER_ID, "key-1", "scope", "hash", 201, {"id": 1})
+    sql = compile_sql(db.statements[0][0])
+    assert "ON CONFLICT (user_id, key) DO UPDATE" in sql
+    assert "WHERE idempotency_keys.created_at <" in sql
+
+
+async def test_upload_digest_hashes_content_and_rewinds():
+    first = UploadFile(file=io.BytesIO(b"answer A"), filename="work.pdf")
+    second = UploadFile(file=io.BytesIO(b"answer B"), filename="work.pdf")
+
+    digest = await upload_digest(first)
+
+    assert digest != await upload_digest(second)
+    assert digest == await upload_digest(UploadFile(file=io.BytesIO(b"answer A"), filename="other.pdf"))
+    assert await first.read() == b"answer A"
+
+
+# ---------------------------
+# Assignment submission
+# ---------------------------
+ASSIGNMENT = SimpleNamespace(
+    id=uuid.uuid4(),
+    course_id=uuid.uuid4(),
+    deadline=datetime.now(timezone.utc) + timedelta(days=1),
+)
+STUDENT = SimpleNamespace(id=USER_ID)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    async def allow(*args):
+        return None
+
+    monkeypatch.setattr(assignment_submissions, "ASSIGNMENT_SUBMISSION_DIR", str(tmp_path))
+    monkeypatch.setattr(assignment_submissions, "ensure_student_enrolled", allow)
+    monkeypatch.setattr(assignment_submissions, "record_assignment_submitted", allow)
+    return tmp_path
+
+
+def submission_session(stored=None) -> FakeSession:
+    """
+    Session for submit_assignment: finds ASSIGNMENT, answers the idempotency
+    lookup with `stored`, and inserts the submission row.
+    """
+    def respond(statement, params):
+        sql = compile_sql(statement)
+        if sql.startswith("SELECT") and "FROM assignments" in sql:
+            return FakeResult([ASSIGNMENT])
+        if sql.startswith("SELECT") and "FROM idempotency_keys" in sql:
+            return FakeResult([stored] if stored else [])
+        if sql.startswith("INSERT INTO assignment_submissions"):
+            return SimpleNamespace(
+                id=uuid.uuid4(),
+                assignment_id=ASSIGNMENT.id,
+                student_id=USER_ID,
+                file_url="/uploads/x",
+                submitted_at=datetime.utcnow(),
+                marks_obtained=None,
+                feedback=None,
+            )
+        return FakeResult()
+
+    return FakeSession(respond)
+
+
+async def submit(db, content: bytes = b"my work", key=None):
+    return await assignment_submissions.submit_assignment(
+        ASSIGNMENT.id,
+        file=UploadFile(file=io.BytesIO(content), filename="work.pdf"),
+        current_user=STUDENT,
+        idempotency_key=key,
+        db=db,
+    )
+
+
+async def test_submission_file_appears_only_after_commit(upload_dir):
+    db = submission_session()
+
+    await submit(db)
+
+    assert db.commits == 1
+    assert os.listdir(upload_dir) == [f"{ASSIGNMENT.id}_{USER_ID}_work.pdf"]
+    assert (upload_dir / os.listdir(upload_dir)[0]).read_bytes() == b"my work"
+
+
+async def test_failed_commit_leaves_no_file_behind(upload_dir):
+    db = submission_session()
+    db.fail_commit = RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        await submit(db)
+
+    assert os.listdir(upload_dir) == []
+
+
+async def test_retry_with_same_file_replays(upload_dir):
+    scope = f"submit-assignment:{ASSIGNMENT.id}"
+    request_hash = request_fingerprint(
+        scope, "work.pdf", await upload_digest(UploadFile(file=io.BytesIO(b"my work"), filename="work.pdf"))
+    )
+    db = submission_session(stored=stored_key(scope, request_hash))
+
+    response = await submit(db, b"my work", key="key-1")
+
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert os.listdir(upload_dir) == []
+
+
+async def test_key_reused_with_different_file_of_same_size_is_422(upload_dir):
+    scope = f"submit-assignment:{ASSIGNMENT.id}"
+    request_hash = request_fingerprint(
+        scope, "work.pdf", await upload_digest(UploadFile(file=io.BytesIO(b"my work"), filename="work.pdf"))
+    )
+    db = submission_session(stored=stored_key(scope, request_hash))
+
+    with pytest.raises(HTTPException) as exc:
+        await submit(db, b"my wOrk", key="key-1")
+    assert exc.value.status_code == 422
@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, Table, Column, MetaData, DateTime, Uuid, select, insert
+
+from app.helpers.pagination import encode_cursor, decode_cursor, apply_keyset, split_page, _b64decode, _b64encode
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    row_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("tamper", [
+    # Payload edited, signature kept
+    lambda payload, signature: (
+        _b64encode(_b64decode(payload).replace(b"2026", b"2025")), signature
+    ),
+    # Signature of another cursor
+    lambda payload, signature: (
+        payload, encode_cursor(datetime(2020, 1, 1), uuid.uuid4()).split(".")[1]
+    ),
+    lambda payload, signature: (payload, ""),
+    lambda payload, signature: ("not-base64!", signature),
+])
+def test_tampered_cursor_is_rejected(tamper):
+    payload, signature = encode_cursor(datetime(2026, 3, 1), uuid.uuid4()).split(".")
+    payload, signature = tamper(payload, signature)
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(f"{payload}.{signature}")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "no-dot", "a.b.c"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_never_skip_or_repeat_rows_with_equal_timestamps(descending):
+    metadata = MetaData()
+    items = Table(
+        "items", metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("created_at", DateTime, nullable=False),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+
+    # Most rows share one timestamp, so a created_at-only cursor would lose rows
+    base = datetime(2026, 1, 1)
+    rows = [
+        {"id": uuid.uuid4(), "created_at": base if i < 9 else base + timedelta(seconds=i)}
+        for i in range(23)
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(insert(items), rows)
+
+        seen = []
+        cursor = None
+        while True:
+            query = apply_keyset(
+                select(items.c.id, items.c.created_at),
+                items.c.created_at, items.c.id, cursor, 5, descending=descending,
+            )
+            page, cursor = split_page(conn.execute(query).all(), 5)
+            assert len(page) <= 5
+            seen.extend(row.id for row in page)
+            if cursor is None:
+                break
+
+    expected = sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=descending)
+    assert seen == [row["id"] for row in expected]
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import password_security
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_full_pool_rejects_logins_but_queues_imports(monkeypatch):
+    slots = asyncio.Semaphore(1)
+    monkeypatch.setattr(password_security, "_pending_slots", slots)
+    monkeypatch.setattr(password_security, "hash_password", lambda password: f"hashed:{password}")
+
+    await slots.acquire()  # pool is full
+
+    with pytest.raises(HTTPException) as exc:
+        await password_security.hash_password_async("pw")
+    assert exc.value.status_code == 503
+
+    imported = asyncio.ensure_future(password_security.hash_passwords_async(["a", "b"]))
+    await asyncio.sleep(0.05)
+    assert not imported.done()
+
+    slots.release()
+    assert await asyncio.wait_for(imported, 5) == ["hashed:a", "hashed:b"]
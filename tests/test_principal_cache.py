@@ -0,0 +1,41 @@
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.auth import principal_cache as principal_cache_module
+from app.auth.token_revocation import token_versions
+from app.models import User
+
+
+def _pending_user(session: Session) -> User:
+    user = User(id=uuid.uuid4())
+    session.add(user)
+    return user
+
+
+def test_updated_user_is_dropped_again_after_commit():
+    session = Session()
+    user = _pending_user(session)
+    token_versions.put(user.id, 1, True)
+
+    principal_cache_module._invalidate_on_user_update(None, None, user)
+    assert token_versions.get(user.id) is None
+
+    # A concurrent request reloads the old row between flush and commit
+    token_versions.put(user.id, 1, True)
+    session.dispatch.after_commit(session)
+
+    assert token_versions.get(user.id) is None
+    assert principal_cache_module._UPDATED_USER_IDS not in session.info
+
+
+def test_rolled_back_update_is_forgotten():
+    session = Session()
+    user = _pending_user(session)
+
+    principal_cache_module._invalidate_on_user_update(None, None, user)
+    session.dispatch.after_rollback(session)
+    token_versions.put(user.id, 1, True)
+    session.dispatch.after_commit(session)
+
+    assert token_versions.get(user.id) == (1, True)
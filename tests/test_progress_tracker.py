@@ -0,0 +1,39 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.helpers import progress_tracker
+from app.helpers.progress_tracker import check_progress_consistency, COUNT_COLUMNS
+from conftest import FakeResult, FakeSession
+
+COURSE_ID = uuid.uuid4()
+IN_SYNC, DRIFTED = sorted([uuid.uuid4(), uuid.uuid4()])
+# total_duration, watched, total_assignments, submitted, total_quizzes, completed
+COUNTS = (600, 300, 4, 2, 2, 1)
+
+
+def stored_row(student_id, counts):
+    return SimpleNamespace(course_id=COURSE_ID, student_id=student_id, **dict(zip(COUNT_COLUMNS, counts)))
+
+
+@pytest.mark.anyio
+async def test_consistency_check_diffs_against_the_shared_progress_query(monkeypatch):
+    requested = []
+
+    async def counts_bulk(course_id, student_ids, db):
+        requested.append((course_id, list(student_ids)))
+        return {student_id: COUNTS for student_id in student_ids}
+
+    monkeypatch.setattr(progress_tracker, "get_progress_counts_bulk", counts_bulk)
+    db = FakeSession(lambda statement, params: FakeResult([
+        stored_row(IN_SYNC, COUNTS),
+        stored_row(DRIFTED, (600, 300, 4, 2, 2, 2)),   # one quiz counted twice
+    ]))
+
+    mismatches = await check_progress_consistency(db)
+
+    assert requested == [(COURSE_ID, [IN_SYNC, DRIFTED])]
+    assert [(m["course_id"], m["student_id"]) for m in mismatches] == [(COURSE_ID, DRIFTED)]
+    assert mismatches[0]["stored"]["quiz_progress"] == 100
+    assert mismatches[0]["expected"]["quiz_progress"] == 50
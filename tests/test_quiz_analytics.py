@@ -0,0 +1,55 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.helpers.quiz_analytics import compute_quiz_analytics
+from app.helpers.quiz_cache import QuizDefinition
+from conftest import FakeResult, FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+Q1 = uuid.uuid4()
+RIGHT, WRONG = uuid.uuid4(), uuid.uuid4()
+
+
+def definition() -> QuizDefinition:
+    return QuizDefinition.from_quiz(SimpleNamespace(
+        id=uuid.uuid4(),
+        version=1,
+        course_id=uuid.uuid4(),
+        instructor_id=uuid.uuid4(),
+        title="Quiz",
+        description=None,
+        total_marks=1,
+        time_limit_minutes=None,
+        week=None,
+        questions=[SimpleNamespace(
+            id=Q1,
+            question_text="?",
+            marks=1,
+            options=[
+                SimpleNamespace(id=RIGHT, option_text="a", is_correct=True),
+                SimpleNamespace(id=WRONG, option_text="b", is_correct=False),
+            ],
+        )],
+    ))
+
+
+async def test_repeated_answer_rows_do_not_make_unanswered_negative():
+    # Two submissions, one of which stored an answer row for each option
+    row = SimpleNamespace(
+        submissions=2,
+        answer_counts=[[str(Q1), str(RIGHT), 2], [str(Q1), str(WRONG), 1]],
+        answered_counts=[[str(Q1), 2]],
+        scores={},
+        histogram=[],
+    )
+    db = FakeSession(lambda statement, params: FakeResult([row]))
+
+    view = await compute_quiz_analytics(definition(), db)
+
+    question = view.questions[0]
+    assert question.answered == 2
+    assert question.unanswered == 0
+    assert "count(DISTINCT quiz_answers.submission_id)" in compile_sql(db.statements[0][0])
@@ -0,0 +1,197 @@
+import re
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.helpers.quiz_authoring import diff_quiz_questions, apply_quiz_question_diff, count_lost_answers
+from app.routes.users.teacher.quiz import update_quiz
+from app.schemas.quiz import QuizQuestionUpdate, QuizUpdate
+from conftest import FakeResult, FakeSession, compile_sql
+
+QUIZ_ID = uuid.uuid4()
+Q1, Q2 = uuid.uuid4(), uuid.uuid4()
+Q1_A, Q1_B, Q2_A, Q2_B = (uuid.uuid4() for _ in range(4))
+
+# load_quiz_structure() shape
+EXISTING = {
+    Q1: ("2 + 2?", 1, {Q1_A: ("4", True), Q1_B: ("5", False)}),
+    Q2: ("Capital of France?", 2, {Q2_A: ("Paris", True), Q2_B: ("Rome", False)}),
+}
+
+
+def question(question_id, text, marks, options) -> QuizQuestionUpdate:
+    return QuizQuestionUpdate(
+        id=question_id,
+        question_text=text,
+        marks=marks,
+        options=[{"id": option_id, "option_text": t, "is_correct": c} for option_id, t, c in options],
+    )
+
+
+def unchanged() -> list[QuizQuestionUpdate]:
+    return [
+        question(Q1, "2 + 2?", 1, [(Q1_A, "4", True), (Q1_B, "5", False)]),
+        question(Q2, "Capital of France?", 2, [(Q2_A, "Paris", True), (Q2_B, "Rome", False)]),
+    ]
+
+
+def test_unchanged_payload_is_an_empty_diff():
+    diff = diff_quiz_questions(QUIZ_ID, EXISTING, unchanged())
+
+    assert set(diff.summary().values()) == {0}
+    assert not diff.grading_changed
+
+
+def test_text_edits_update_in_place_without_regrade():
+    questions = unchanged()
+    questions[0] = question(Q1, "What is 2 + 2?", 1, [(Q1_A, "four", True), (Q1_B, "5", False)])
+
+    diff = diff_quiz_questions(QUIZ_ID, EXISTING, questions)
+
+    assert diff.question_updates == [(Q1, "What is 2 + 2?", 1)]
+    assert diff.option_updates == [(Q1_A, "four", True)]
+    assert not diff.question_deletes and not diff.option_deletes
+    assert not diff.grading_changed
+
+
+@pytest.mark.parametrize("edit", [
+    # Marks change
+    lambda qs: qs.__setitem__(0, question(Q1, "2 + 2?", 3, [(Q1_A, "4", True), (Q1_B, "5", False)])),
+    # Correct option moves
+    lambda qs: qs.__setitem__(0, question(Q1, "2 + 2?", 1, [(Q1_A, "4", False), (Q1_B, "5", True)])),
+    # New correct option
+    lambda qs: qs[0].options.append(qs[0].options[0].model_copy(update={"id": None, "option_text": "four"})),
+])
+def test_grading_edits_are_flagged(edit):
+    questions = unchanged()
+    edit(questions)
+
+    assert diff_quiz_questions(QUIZ_ID, EXISTING, questions).grading_changed
+
+
+def test_removed_and_added_rows():
+    questions = [
+        question(Q1, "2 + 2?", 1, [(Q1_A, "4", True)]),
+        QuizQuestionUpdate(
+            question_text="3 + 3?",
+            marks=1,
+            options=[{"option_text": "6", "is_correct": True}, {"option_text": "7"}],
+        ),
+    ]
+
+    diff = diff_quiz_questions(QUIZ_ID, EXISTING, questions)
+
+    assert diff.question_deletes == [Q2]
+    assert set(diff.option_deletes) == {Q1_B, Q2_A, Q2_B}
+    assert len(diff.question_inserts) == 1
+    assert diff.question_inserts[0]["quiz_id"] == QUIZ_ID
+    # New options point at the new question's client-side id
+    assert [row["question_id"] for row in diff.option_inserts] == [diff.question_inserts[0]["id"]] * 2
+    assert diff.grading_changed
+
+
+@pytest.mark.parametrize("questions, message", [
+    (lambda: [question(uuid.uuid4(), "?", 1, [])], "does not belong to this quiz"),
+    (lambda: [unchanged()[0], unchanged()[0]], "appears more than once"),
+    (lambda: [question(Q1, "2 + 2?", 1, [(Q2_A, "Paris", True)])], "does not belong to question"),
+    (lambda: [question(Q1, "2 + 2?", 1, [(Q1_A, "4", True), (Q1_A, "4", True)])], "appears more than once"),
+])
+def test_foreign_or_repeated_ids_are_rejected(questions, message):
+    with pytest.raises(HTTPException) as exc:
+        diff_quiz_questions(QUIZ_ID, EXISTING, questions())
+    assert exc.value.status_code == 400
+    assert message in exc.value.detail
+
+
+@pytest.mark.anyio
+async def test_answers_are_detached_before_their_rows_are_deleted():
+    diff = diff_quiz_questions(QUIZ_ID, EXISTING, [question(Q1, "2 + 2?", 1, [(Q1_A, "4", True)])])
+    db = FakeSession()
+
+    await apply_quiz_question_diff(diff, db)
+
+    sql = [compile_sql(statement) for statement, _ in db.statements]
+    assert [re.match(r"(DELETE FROM|UPDATE) (\w+)", s).groups() for s in sql] == [
+        ("DELETE FROM", "quiz_answers"),
+        ("UPDATE", "quiz_answers"),
+        ("DELETE FROM", "quiz_options"),
+        ("DELETE FROM", "quiz_questions"),
+    ]
+    assert "SET selected_option_id" in sql[1]
+
+
+@pytest.mark.anyio
+async def test_count_lost_answers_skips_the_query_without_deletions():
+    db = FakeSession()
+    diff = diff_quiz_questions(QUIZ_ID, EXISTING, unchanged())
+
+    assert await count_lost_answers(diff, db) == 0
+    assert db.statements == []
+
+
+# ---------------------------
+# Route: refusing to lose answers
+# ---------------------------
+TEACHER = SimpleNamespace(id=uuid.uuid4())
+
+
+def update_session(lost_answers: int = 0, has_submissions: bool = False) -> FakeSession:
+    quiz = SimpleNamespace(id=QUIZ_ID, instructor_id=TEACHER.id, course_id=uuid.uuid4())
+    question_rows = [(question_id, text, marks) for question_id, (text, marks, _) in EXISTING.items()]
+    option_rows = [
+        (question_id, option_id, text, correct)
+        for question_id, (_, _, options) in EXISTING.items()
+        for option_id, (text, correct) in options.items()
+    ]
+    responses = iter([
+        FakeResult([quiz]),
+        FakeResult(question_rows),
+        FakeResult(option_rows),
+    ])
+
+    def respond(statement, params):
+        sql = compile_sql(statement)
+        if "count(*)" in sql:
+            return lost_answers
+        if "EXISTS" in sql:
+            return has_submissions
+        return next(responses)
+
+    return FakeSession(respond)
+
+
+def quiz_update(questions) -> QuizUpdate:
+    return QuizUpdate(title="Quiz", questions=questions)
+
+
+@pytest.mark.anyio
+async def test_update_refuses_to_discard_answers():
+    db = update_session(lost_answers=3)
+
+    with pytest.raises(HTTPException) as exc:
+        await update_quiz(
+            QUIZ_ID,
+            quiz_update([question(Q1, "2 + 2?", 1, [(Q1_A, "4", True)])]),
+            allow_answer_loss=False,
+            current_user=TEACHER,
+            db=db,
+        )
+
+    assert exc.value.status_code == 409
+    assert "discard 3 stored answers" in exc.value.detail
+    assert db.commits == 0
+    assert not any(compile_sql(s).startswith(("DELETE", "UPDATE")) for s, _ in db.statements)
+
+
+@pytest.mark.anyio
+async def test_update_without_ids_refuses_to_replace_answered_quiz():
+    db = update_session(has_submissions=True)
+    questions = [q.model_copy(update={"id": None}) for q in unchanged()]
+
+    with pytest.raises(HTTPException) as exc:
+        await update_quiz(QUIZ_ID, quiz_update(questions), allow_answer_loss=False, current_user=TEACHER, db=db)
+
+    assert exc.value.status_code == 409
+    assert "send question ids" in exc.value.detail
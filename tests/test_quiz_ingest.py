@@ -0,0 +1,288 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.helpers import quiz_ingest
+from app.helpers.quiz_cache import QuizDefinition
+from app.helpers.quiz_ingest import (
+    QuizSubmissionIngestor,
+    stage_quiz_submission,
+    find_staged_response,
+    REJECTED_DETAIL,
+)
+from conftest import FakeResult, FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+Q1, Q2 = uuid.uuid4(), uuid.uuid4()
+Q1_RIGHT, Q1_WRONG, Q2_RIGHT = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+QUIZ_ID = uuid.uuid4()
+COURSE_ID = uuid.uuid4()
+
+
+def definition(questions) -> QuizDefinition:
+    """
+    questions: [(question_id, [(option_id, is_correct), ...]), ...]
+    """
+    return QuizDefinition.from_quiz(SimpleNamespace(
+        id=QUIZ_ID,
+        version=1,
+        course_id=COURSE_ID,
+        instructor_id=uuid.uuid4(),
+        title="Quiz",
+        description=None,
+        total_marks=10,
+        time_limit_minutes=None,
+        week=None,
+        questions=[
+            SimpleNamespace(
+                id=question_id,
+                question_text="?",
+                marks=1,
+                options=[SimpleNamespace(id=o, option_text="o", is_correct=c) for o, c in options],
+            )
+            for question_id, options in questions
+        ],
+    ))
+
+
+def staged_row(student_id=None, answers=None, idempotency_key=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        quiz_id=QUIZ_ID,
+        course_id=COURSE_ID,
+        student_id=student_id or uuid.uuid4(),
+        submitted_at=datetime(2026, 5, 1),
+        total_score=1,
+        answers=answers if answers is not None else [
+            {"id": str(uuid.uuid4()), "question_id": str(Q1), "selected_option_id": str(Q1_RIGHT)},
+        ],
+        idempotency_key=idempotency_key,
+        idempotency={"scope": "s", "request_hash": "h", "response_body": {"status": "accepted"}} if idempotency_key else None,
+        attempts=0,
+    )
+
+
+# ---------------------------
+# Request side
+# ---------------------------
+@pytest.mark.parametrize("returned, accepted", [([(uuid.uuid4(),)], True), ([], False)])
+async def test_staging_is_one_conflict_tolerant_insert(returned, accepted):
+    db = FakeSession(lambda statement, params: FakeResult(returned))
+    quiz = definition([(Q1, [(Q1_RIGHT, True)])])
+
+    assert await stage_quiz_submission(db, quiz, uuid.uuid4(), uuid.uuid4(), 1, []) is accepted
+    sql = compile_sql(db.statements[0][0])
+    assert "ON CONFLICT ON CONSTRAINT uq_quiz_submission_staging_quiz_id_student_id DO NOTHING" in sql
+    assert db.commits == 0
+
+
+def staged_lookup(rejected_at=None):
+    return FakeSession(lambda statement, params: FakeResult([SimpleNamespace(
+        idempotency={"scope": "scope", "request_hash": "hash", "response_body": {"status": "accepted"}},
+        rejected_at=rejected_at,
+    )]))
+
+
+async def test_retry_of_staged_submission_replays_202():
+    response = await find_staged_response(staged_lookup(), uuid.uuid4(), "key-1", "scope", "hash")
+
+    assert response.status_code == 202
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+
+async def test_staged_key_reused_for_another_request_is_422():
+    with pytest.raises(HTTPException) as exc:
+        await find_staged_response(staged_lookup(), uuid.uuid4(), "key-1", "scope", "other-hash")
+    assert exc.value.status_code == 422
+
+
+async def test_retry_of_rejected_submission_is_409():
+    with pytest.raises(HTTPException) as exc:
+        await find_staged_response(staged_lookup(datetime.utcnow()), uuid.uuid4(), "key-1", "scope", "hash")
+    assert exc.value.status_code == 409
+    assert exc.value.detail == REJECTED_DETAIL
+
+
+# ---------------------------
+# Writer
+# ---------------------------
+@pytest.fixture
+def writer_hooks(monkeypatch):
+    calls = {}
+
+    async def record(name, *args):
+        calls.setdefault(name, []).append(args)
+
+    async def record_progress(counts, db):
+        await record("progress", counts)
+
+    async def store_responses(rows, db):
+        await record("idempotency", rows)
+
+    async def store_snapshots(snapshots, db):
+        await record("snapshots", snapshots)
+
+    monkeypatch.setattr(quiz_ingest, "record_quiz_submissions_bulk", record_progress)
+    monkeypatch.setattr(quiz_ingest, "store_idempotent_responses", store_responses)
+    monkeypatch.setattr(quiz_ingest, "store_result_snapshots", store_snapshots)
+    return calls
+
+
+def use_definition(monkeypatch, quiz):
+    async def get_definition(quiz_id, db):
+        return quiz if quiz_id == quiz.id else None
+
+    monkeypatch.setattr(quiz_ingest, "get_quiz_definition", get_definition)
+
+
+def writer_session(conflicting=()):
+    """
+    Session for _write: the quiz_submissions insert returns every staged
+    id except `conflicting` (rows that lost to an existing submission).
+    """
+    def respond(statement, params):
+        sql = compile_sql(statement)
+        if sql.startswith("INSERT INTO quiz_submissions"):
+            return FakeResult((row["id"],) for row in params if row["id"] not in conflicting)
+        return FakeResult()
+
+    return FakeSession(respond)
+
+
+def statements_on(db, prefix):
+    return [(compile_sql(s), p) for s, p in db.statements if compile_sql(s).startswith(prefix)]
+
+
+async def test_writer_keeps_conflicting_rows_as_rejected(monkeypatch, writer_hooks):
+    use_definition(monkeypatch, definition([(Q1, [(Q1_RIGHT, True), (Q1_WRONG, False)])]))
+    fresh, lost = staged_row(idempotency_key="key-1"), staged_row()
+    db = writer_session(conflicting={lost.id})
+    ingestor = QuizSubmissionIngestor(batch_size=10, flush_interval=1)
+
+    assert await ingestor._write([fresh, lost], db) == 1
+
+    rejected_update, written_update = [
+        statement for statement, _ in db.statements
+        if compile_sql(statement).startswith("UPDATE quiz_submission_staging")
+    ]
+    assert "rejected_at" in compile_sql(rejected_update)
+    assert [lost.id] in rejected_update.compile().params.values()
+    assert "written_at" in compile_sql(written_update)
+    assert [fresh.id] in written_update.compile().params.values()
+
+    [(_, answer_rows)] = statements_on(db, "INSERT INTO quiz_answers")
+    assert [row["submission_id"] for row in answer_rows] == [fresh.id]
+    assert writer_hooks["progress"] == [({(COURSE_ID, fresh.student_id): 1},)]
+    assert [row["key"] for row in writer_hooks["idempotency"][0][0]] == ["key-1"]
+    assert ingestor.rejected == 1
+    assert db.commits == 1
+    assert db.info["after_commit_tasks"][0][0] == ("certificate", COURSE_ID, fresh.student_id)
+
+
+async def test_writer_reconciles_answers_with_an_edited_quiz(monkeypatch, writer_hooks):
+    # Staged against Q1 (right/wrong) and Q2; since then Q2 and Q1_WRONG were removed
+    use_definition(monkeypatch, definition([(Q1, [(Q1_RIGHT, True)])]))
+    staged = staged_row(answers=[
+        {"id": str(uuid.uuid4()), "question_id": str(Q1), "selected_option_id": str(Q1_WRONG)},
+        {"id": str(uuid.uuid4()), "question_id": str(Q2), "selected_option_id": str(Q2_RIGHT)},
+    ])
+    db = writer_session()
+
+    assert await QuizSubmissionIngestor(10, 1)._write([staged], db) == 1
+
+    [(_, answer_rows)] = statements_on(db, "INSERT INTO quiz_answers")
+    assert [(row["question_id"], row["selected_option_id"]) for row in answer_rows] == [(Q1, None)]
+    # Staged with a score of 1 for Q2; nothing it keeps earns marks now
+    [(_, submission_rows)] = statements_on(db, "INSERT INTO quiz_submissions")
+    assert submission_rows[0]["total_score"] == 0
+    [(snapshots,)] = writer_hooks["snapshots"]
+    assert snapshots[0].body.count(b'"total_score":0') == 1
+
+
+async def test_writer_marks_rows_of_deleted_quizzes_written(monkeypatch, writer_hooks):
+    use_definition(monkeypatch, definition([]))
+    orphan = staged_row()
+    orphan.quiz_id = uuid.uuid4()
+    db = writer_session()
+
+    assert await QuizSubmissionIngestor(10, 1)._write([orphan], db) == 0
+
+    assert statements_on(db, "INSERT") == []
+    assert len(statements_on(db, "UPDATE quiz_submission_staging")) == 1
+    assert db.commits == 1
+
+
+async def test_failed_batch_is_retried_row_by_row_and_failures_deferred(monkeypatch):
+    good, bad = staged_row(), staged_row()
+    sessions = []
+
+    class SessionContext:
+        async def __aenter__(self):
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class Ingestor(QuizSubmissionIngestor):
+        async def _claim(self, db, limit, staged_id=None):
+            rows = [good, bad]
+            return rows if staged_id is None else [row for row in rows if row.id == staged_id]
+
+        async def _write(self, batch, db):
+            if any(row is bad for row in batch):
+                raise RuntimeError("foreign key violation")
+            return len(batch)
+
+    monkeypatch.setattr(quiz_ingest, "AsyncSessionLocal", SessionContext)
+    ingestor = Ingestor(batch_size=10, flush_interval=1)
+
+    assert await ingestor.flush() == 2
+
+    assert ingestor.written == 1
+    assert ingestor.failed_batches == 1
+    assert ingestor.failed_attempts == 1
+    assert "foreign key violation" in ingestor.last_error
+    [(defer_statement, _)] = sessions[-1].statements
+    sql = compile_sql(defer_statement)
+    assert sql.startswith("UPDATE quiz_submission_staging SET attempts=")
+    assert "next_attempt_at" in sql
+    assert sessions[-1].commits == 1
+
+
+async def test_without_burst_mode_only_leftovers_are_drained(monkeypatch):
+    pending = iter([2, 0])
+    sessions = []
+
+    class SessionContext:
+        async def __aenter__(self):
+            sessions.append(FakeSession(lambda statement, params: next(pending)))
+            return sessions[-1]
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class Ingestor(QuizSubmissionIngestor):
+        drains = 0
+
+        async def _drain(self):
+            self.drains += 1
+
+    monkeypatch.setattr(quiz_ingest, "QUIZ_BURST_MODE", False)
+    monkeypatch.setattr(quiz_ingest, "QUIZ_STAGING_CLEANUP_SECONDS", 0)
+    monkeypatch.setattr(quiz_ingest, "AsyncSessionLocal", SessionContext)
+    ingestor = Ingestor(batch_size=10, flush_interval=1)
+    assert ingestor.staging_active
+
+    ingestor.start()
+    await ingestor._task
+
+    assert ingestor.drains == 2
+    assert not ingestor.staging_active
+    await ingestor.stop()
+    # Nothing staged any more: shutdown does not query again
+    assert ingestor.drains == 2
@@ -0,0 +1,186 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.helpers.quiz_results import ResultSnapshot, QuizResultCache, etag_matches, snapshot_response
+from app.routes.users.student import quiz_submission
+from conftest import FakeSession
+
+QUIZ_ID = uuid.uuid4()
+STUDENT = SimpleNamespace(id=uuid.uuid4())
+
+
+def quiz(version: int = 1):
+    return SimpleNamespace(id=QUIZ_ID, version=version, course_id=uuid.uuid4(), instructor_id=uuid.uuid4())
+
+
+def snapshot(version: int = 1, body: bytes = b'{"total_score":3}', student_id=None) -> ResultSnapshot:
+    return ResultSnapshot(
+        submission_id=uuid.uuid4(),
+        quiz_id=QUIZ_ID,
+        quiz_version=version,
+        student_id=student_id or STUDENT.id,
+        instructor_id=uuid.uuid4(),
+        etag=f"etag-{version}-{len(body)}",
+        body=body,
+    )
+
+
+def request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('"other", "abc"', True),
+    ("*", True),
+    ('"ab"', False),
+    ('W/"abc"', False),
+])
+def test_etag_matching(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def test_matching_etag_is_304_without_body():
+    snap = snapshot()
+
+    fresh = snapshot_response(snap, request())
+    assert fresh.status_code == 200
+    assert fresh.body == snap.body
+    assert fresh.headers["ETag"] == snap.etag_header
+    assert fresh.headers["Cache-Control"] == "private, no-cache"
+
+    revalidated = snapshot_response(snap, request(snap.etag_header))
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert revalidated.headers["ETag"] == snap.etag_header
+
+
+def test_cache_only_answers_for_the_current_quiz_version():
+    cache = QuizResultCache(max_entries=10, ttl=60)
+    snap = snapshot(version=1)
+    cache.put(snap)
+
+    assert cache.by_student(quiz(version=1), STUDENT.id) is snap
+    assert cache.by_submission(snap.submission_id) is snap
+
+    # Edited or regraded elsewhere: the entry is dropped, not served
+    assert cache.by_student(quiz(version=2), STUDENT.id) is None
+    assert cache.by_submission(snap.submission_id) is None
+
+
+def test_cache_expiry_eviction_and_quiz_invalidation():
+    cache = QuizResultCache(max_entries=2, ttl=60)
+    first, second, third = (snapshot(student_id=uuid.uuid4()) for _ in range(3))
+    for snap in (first, second, third):
+        cache.put(snap)
+
+    assert cache.by_submission(first.submission_id) is None
+    assert cache.by_student(quiz(), first.student_id) is None
+    assert cache.by_student(quiz(), third.student_id) is third
+
+    cache.invalidate_quiz(QUIZ_ID)
+    assert cache.stats()["entries"] == 0
+
+    expired = QuizResultCache(max_entries=2, ttl=0)
+    expired.put(first)
+    assert expired.by_submission(first.submission_id) is None
+
+
+# ---------------------------
+# GET /my-quiz-result
+# ---------------------------
+@pytest.fixture
+def result_route(monkeypatch):
+    """
+    Route dependencies with the current quiz at state["quiz"]; records
+    which slow paths were taken.
+    """
+    state = {"quiz": quiz(version=1), "stored": None, "staged": None, "loads": 0, "staged_checks": 0}
+    cache = QuizResultCache(max_entries=10, ttl=60)
+
+    async def get_definition(quiz_id, db):
+        return state["quiz"]
+
+    async def enrolled(course_id, student_id, db):
+        return None
+
+    async def load(quiz, db, student_id=None):
+        state["loads"] += 1
+        return state["stored"]
+
+    async def staged_status(quiz_id, student_id, db):
+        state["staged_checks"] += 1
+        return state["staged"]
+
+    monkeypatch.setattr(quiz_submission, "get_quiz_definition", get_definition)
+    monkeypatch.setattr(quiz_submission, "ensure_student_enrolled", enrolled)
+    monkeypatch.setattr(quiz_submission, "load_result_snapshot", load)
+    monkeypatch.setattr(quiz_submission, "staged_status", staged_status)
+    monkeypatch.setattr(quiz_submission, "quiz_result_cache", cache)
+    state["cache"] = cache
+    return state
+
+
+async def get_result(if_none_match=None, db=None):
+    return await quiz_submission.get_my_quiz_result(
+        QUIZ_ID, request(if_none_match), current_user=STUDENT, db=db or FakeSession()
+    )
+
+
+@pytest.mark.anyio
+async def test_revalidation_is_answered_from_memory(result_route):
+    snap = snapshot(version=1)
+    result_route["cache"].put(snap)
+    db = FakeSession()
+
+    response = await get_result(snap.etag_header, db)
+
+    assert response.status_code == 304
+    assert result_route["loads"] == 0
+    assert result_route["staged_checks"] == 0
+    assert db.statements == [] and db.commits == 0
+
+
+@pytest.mark.anyio
+async def test_new_quiz_version_bypasses_cached_etag(result_route):
+    old = snapshot(version=1)
+    result_route["cache"].put(old)
+    result_route["quiz"] = quiz(version=2)
+    result_route["stored"] = new = snapshot(version=2, body=b'{"total_score":5}')
+
+    response = await get_result(old.etag_header)
+
+    assert response.status_code == 200
+    assert response.body == new.body
+    assert response.headers["ETag"] == new.etag_header
+    assert result_route["loads"] == 1
+    assert result_route["staged_checks"] == 0
+
+
+@pytest.mark.anyio
+async def test_stale_client_etag_gets_the_stored_body(result_route):
+    result_route["stored"] = stored = snapshot()
+
+    response = await get_result('"something-else"')
+
+    assert response.status_code == 200
+    assert response.body == stored.body
+    assert result_route["staged_checks"] == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("staged, status_code", [("pending", 409), ("rejected", 409), (None, 403)])
+async def test_missing_snapshot_reports_staging_state(result_route, staged, status_code):
+    result_route["staged"] = staged
+
+    with pytest.raises(HTTPException) as exc:
+        await get_result()
+
+    assert exc.value.status_code == status_code
+    assert result_route["staged_checks"] == 1
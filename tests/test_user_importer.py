@@ -0,0 +1,183 @@
+import io
+import json
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.dialects import postgresql
+
+from app.helpers import user_importer
+from app.helpers.user_importer import iter_import_records, import_user_batch, detect_import_format
+from app.routes.admin import user as admin_user_routes
+from conftest import FakeResult, FakeSession, compile_sql
+
+pytestmark = pytest.mark.anyio
+
+
+def upload(data: str, filename: str = "users.csv") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data.encode()), filename=filename)
+
+
+async def collect(file: UploadFile, fmt: str) -> list:
+    return [item async for item in iter_import_records(file, fmt)]
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    async def hash_passwords(passwords):
+        return [f"hashed:{password}" for password in passwords]
+
+    monkeypatch.setattr(user_importer, "hash_passwords_async", hash_passwords)
+
+
+def import_session(existing=(), conflicting=()):
+    """
+    Session whose uniqueness SELECT finds `existing` (roll_number, email)
+    pairs and whose INSERT ... ON CONFLICT skips the rows with a roll
+    number in `conflicting`, as if a concurrent import had just won.
+    """
+    def respond(statement, params):
+        if statement.is_insert:
+            values = statement.compile(dialect=postgresql.dialect()).params
+            return FakeResult(
+                (values[f"id_m{i}"],)
+                for i in range(len(values))
+                if f"id_m{i}" in values and values[f"roll_number_m{i}"] not in conflicting
+            )
+        return FakeResult(existing)
+
+    return FakeSession(respond)
+
+
+def student(row: int, roll_number: str, password: str = "secret") -> tuple:
+    return row, {"role": "student", "name": f"S{row}", "roll_number": roll_number, "password": password}, None
+
+
+def test_detect_import_format():
+    assert detect_import_format("users.CSV", None) == "csv"
+    assert detect_import_format("users.jsonl", None) == "ndjson"
+    assert detect_import_format("users.csv", "NDJSON") == "ndjson"
+    assert detect_import_format("users.txt", None) is None
+    assert detect_import_format("users.csv", "xml") is None
+
+
+async def test_csv_keeps_password_verbatim_and_trims_identifiers():
+    records = await collect(upload(
+        "role,name,roll_number,password,department\n"
+        "student , Ann ,  R1 , pw ,\n"
+        "student,Bob,R2,   ,CSE\n"
+    ), "csv")
+
+    assert records == [
+        (1, {"role": "student", "name": "Ann", "roll_number": "R1", "password": " pw ", "department": None}, None),
+        (2, {"role": "student", "name": "Bob", "roll_number": "R2", "password": "   ", "department": "CSE"}, None),
+    ]
+
+
+async def test_csv_quoted_multiline_fields_and_column_mismatch():
+    records = await collect(upload(
+        'role,name,roll_number,password\r\n'
+        'student,"Ann\nLee",R1,"p,w"\r\n'
+        '\r\n'
+        'student,Bob,R2\r\n'
+    ), "csv")
+
+    assert records[0] == (1, {"role": "student", "name": "Ann\nLee", "roll_number": "R1", "password": "p,w"}, None)
+    assert records[1] == (2, None, "Column count does not match header")
+
+
+async def test_ndjson_rows_report_invalid_lines():
+    records = await collect(upload(
+        '{"role": "student", "name": "Ann", "roll_number": "R1", "password": "pw"}\n'
+        'not json\n'
+        '\n'
+        '[1, 2]\n',
+        "users.ndjson",
+    ), "ndjson")
+
+    assert records[0][0] == 1 and records[0][2] is None
+    assert records[1] == (2, None, "Invalid JSON")
+    assert records[2] == (3, None, "Each line must be a JSON object")
+
+
+async def test_batch_reports_every_row_in_input_order():
+    db = import_session(existing=[("R3", None)], conflicting={"R5"})
+    batch = [
+        student(1, "R1", password=" pw "),
+        (2, None, "Invalid JSON"),
+        student(3, "R3"),                      # already in the database
+        student(4, "R1"),                      # repeated within the upload
+        student(5, "R5"),                      # lost to a concurrent insert
+        (6, {"role": "student", "name": "NoRoll", "password": "pw"}, None),
+        (7, {"role": "admin", "name": "Admin", "password": "pw"}, None),
+        (8, {"role": "student", "name": "D", "roll_number": "R8", "password": "pw", "dob": "01/02/2003"}, None),
+    ]
+
+    results = await import_user_batch(batch, db)
+
+    assert [(r["row"], r["status"]) for r in results] == [
+        (1, "created"),
+        (2, "error"),
+        (3, "duplicate"),
+        (4, "duplicate"),
+        (5, "duplicate"),
+        (6, "error"),
+        (7, "error"),
+        (8, "error"),
+    ]
+    assert results[2]["detail"] == "Roll number already exists"
+    assert results[3]["detail"] == "Duplicate within upload"
+    assert results[4]["detail"] == "Created concurrently by another request"
+    assert "roll_number is required" in results[5]["detail"]
+    assert "email is required" in results[6]["detail"]
+    assert "dob" in results[7]["detail"]
+    assert db.commits == 1
+
+    insert_statement = next(statement for statement, _ in db.statements if statement.is_insert)
+    sql = compile_sql(insert_statement)
+    assert "ON CONFLICT DO NOTHING" in sql
+    assert "RETURNING users.id" in sql
+    # The password is hashed exactly as uploaded
+    params = insert_statement.compile(dialect=postgresql.dialect()).params
+    assert params["password_hash_m0"] == "hashed: pw "
+
+
+async def test_batch_without_valid_rows_writes_nothing():
+    db = import_session()
+
+    results = await import_user_batch([(1, None, "Invalid JSON")], db)
+
+    assert results == [{"row": 1, "status": "error", "detail": "Invalid JSON"}]
+    assert db.statements == []
+    assert db.commits == 0
+
+
+async def test_bulk_import_streams_row_results_and_summary(monkeypatch):
+    db = import_session(conflicting={"R3"})
+
+    class SessionContext:
+        async def __aenter__(self):
+            return db
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(admin_user_routes, "AsyncSessionLocal", SessionContext)
+    monkeypatch.setattr(admin_user_routes, "IMPORT_BATCH_SIZE", 2)
+
+    response = await admin_user_routes.bulk_import_users(
+        file=upload(
+            "role,name,roll_number,password\n"
+            "student,Ann,R1,pw\n"
+            "student,Bob,R1,pw\n"
+            "student,Cid,R3,pw\n"
+            "student,Dee\n"
+        ),
+        format=None,
+    )
+    lines = [json.loads(chunk) async for chunk in response.body_iterator]
+
+    assert response.media_type == "application/x-ndjson"
+    assert [line.get("status") for line in lines[:-1]] == ["created", "duplicate", "duplicate", "error"]
+    assert lines[-1] == {"summary": {"created": 1, "duplicate": 2, "error": 1}}
+    # One commit per batch that inserted rows
+    assert db.commits == 2